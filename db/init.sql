@@ -7,3 +7,91 @@ CREATE TABLE IF NOT EXISTS funding_digest_runs (
 
 CREATE INDEX IF NOT EXISTS idx_funding_digest_runs_created_at
     ON funding_digest_runs (created_at DESC);
+
+-- researcher/src/db/normalized.py creates everything from here on (on databases
+-- initialized before it existed) too; keep both in sync.
+
+-- Runs are upserted on every partial result. created_at keeps the first write, so
+-- a running job keeps its place in keyset pages; updated_at tracks the latest one.
+ALTER TABLE funding_digest_runs
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+-- Keyset pagination over runs (newest first) and JSONB containment filters.
+CREATE INDEX IF NOT EXISTS idx_funding_digest_runs_keyset
+    ON funding_digest_runs (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_funding_digest_runs_data
+    ON funding_digest_runs USING GIN (data jsonb_path_ops);
+
+-- Normalized projection of each run's digest, written in the same transaction as
+-- funding_digest_runs. Rows are keyed by run_id plus their position in the digest.
+CREATE TABLE IF NOT EXISTS companies (
+    run_id TEXT NOT NULL REFERENCES funding_digest_runs (run_id) ON DELETE CASCADE,
+    company_idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    website TEXT,
+    domain TEXT,
+    country TEXT,
+    industry TEXT,
+    num_employees INTEGER,
+    brief TEXT,
+    satisfies_search_criteria TEXT NOT NULL,
+    PRIMARY KEY (run_id, company_idx)
+);
+
+-- Also serves keyset pagination over companies by name.
+CREATE INDEX IF NOT EXISTS idx_companies_normalized_name
+    ON companies (normalized_name, run_id, company_idx);
+CREATE INDEX IF NOT EXISTS idx_companies_domain ON companies (domain);
+
+CREATE TABLE IF NOT EXISTS funding_events (
+    run_id TEXT NOT NULL,
+    company_idx INTEGER NOT NULL,
+    event_idx INTEGER NOT NULL,
+    round TEXT NOT NULL,
+    announced_date DATE NOT NULL,
+    amount_as_reported TEXT NOT NULL,
+    amount_value NUMERIC,
+    amount_currency TEXT,
+    lead_investor TEXT,
+    lead_investor_normalized TEXT,
+    PRIMARY KEY (run_id, company_idx, event_idx),
+    FOREIGN KEY (run_id, company_idx) REFERENCES companies (run_id, company_idx) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_funding_events_round_date
+    ON funding_events (round, announced_date DESC);
+CREATE INDEX IF NOT EXISTS idx_funding_events_lead_round
+    ON funding_events (lead_investor_normalized, round);
+
+CREATE TABLE IF NOT EXISTS investors (
+    run_id TEXT NOT NULL,
+    company_idx INTEGER NOT NULL,
+    event_idx INTEGER NOT NULL,
+    investor_idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    website TEXT,
+    is_lead BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (run_id, company_idx, event_idx, investor_idx),
+    FOREIGN KEY (run_id, company_idx, event_idx)
+        REFERENCES funding_events (run_id, company_idx, event_idx) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_investors_normalized_name ON investors (normalized_name);
+
+CREATE TABLE IF NOT EXISTS source_documents (
+    run_id TEXT NOT NULL,
+    company_idx INTEGER NOT NULL,
+    doc_idx INTEGER NOT NULL,
+    event_idx INTEGER,  -- NULL for the company's related_links
+    url TEXT,
+    title TEXT,
+    publisher TEXT,
+    published_at TIMESTAMPTZ,
+    snippet TEXT,
+    PRIMARY KEY (run_id, company_idx, doc_idx),
+    FOREIGN KEY (run_id, company_idx) REFERENCES companies (run_id, company_idx) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_source_documents_url ON source_documents (url);
@@ -0,0 +1,207 @@
+"""Batch entry point: run many research queries concurrently in one process.
+
+Queries are read from a JSONL file, one object per line with a ``q`` field and
+an optional ``id``::
+
+    {"id": "dk-2025-08", "q": "danish startups getting funding in August 2025"}
+
+``query`` is read in place of ``q``, and request-style records
+(``request_id``, ``title``, ``body``) use their ``body``, or else ``title``, as
+the query. A line may also be a bare JSON string.
+
+All runs share the process-wide MCP sessions, model clients and database
+access, so imports, tracer setup and the MCP handshake are paid once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+import chz
+
+from src.logging_config import configure_logging
+from src.main import load_other_research, run_query, setup_tracing
+from src.metrics import serve_metrics, write_metrics_file
+
+if TYPE_CHECKING:
+    from src.flows.fanout import FanoutStrategy
+
+_LOGGER = logging.getLogger("startup_researcher.batch")
+
+
+# Fields read as the query, in order of preference.
+_QUERY_FIELDS = ("q", "query", "body", "title")
+
+
+@chz.chz
+class BatchInput:
+    path: str = chz.field(
+        doc="JSONL file with one {'q': ..., 'id': ...} object per line "
+        "(or 'query'; {'request_id', 'title', 'body'} records use the body)"
+    )
+    concurrency: int = chz.field(default=4, doc="Maximum number of queries in flight")
+    use_other_research: bool = chz.field(default=True)
+    fanout: Optional[str] = chz.field(default=None, doc="Fan-out strategy: auto, week or round")
+    fanout_concurrency: int = chz.field(default=4)
+    incremental: bool = chz.field(default=False, doc="Skip funding already stored by recent runs")
+
+
+@dataclass(slots=True)
+class BatchQuery:
+    query_id: str
+    q: str
+
+
+@dataclass(slots=True)
+class BatchResult:
+    query_id: str
+    status: str  # "ok" or "failed"
+    seconds: float
+    run_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+def load_queries(path: str) -> list[BatchQuery]:
+    queries: list[BatchQuery] = []
+    with open(path, "r") as f:
+        for lineno, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                msg = f"{path}:{lineno}: invalid JSON: {exc}"
+                raise ValueError(msg) from exc
+            if isinstance(record, str):
+                record = {"q": record}
+            if not isinstance(record, dict):
+                msg = f"{path}:{lineno}: expected a JSON object or string"
+                raise ValueError(msg)
+            q = next((record[k] for k in _QUERY_FIELDS if record.get(k)), None)
+            if not q:
+                msg = f"{path}:{lineno}: missing 'q' field (or {', '.join(_QUERY_FIELDS[1:])})"
+                raise ValueError(msg)
+            query_id = str(record.get("id") or record.get("request_id") or f"line-{lineno}")
+            queries.append(BatchQuery(query_id=query_id, q=str(q)))
+    return queries
+
+
+async def _run_one(
+    query: BatchQuery,
+    semaphore: asyncio.Semaphore,
+    run_kwargs: dict[str, Any],
+) -> BatchResult:
+    async with semaphore:
+        started = time.perf_counter()
+        _LOGGER.info("[%s] started", query.query_id)
+        try:
+            run_id = await run_query(query.q, **run_kwargs)
+        except Exception as exc:
+            elapsed = time.perf_counter() - started
+            _LOGGER.exception("[%s] failed after %.1fs: %s", query.query_id, elapsed, exc)
+            return BatchResult(query.query_id, "failed", elapsed, error=repr(exc))
+
+        elapsed = time.perf_counter() - started
+        _LOGGER.info("[%s] finished in %.1fs run_id=%s", query.query_id, elapsed, run_id)
+        return BatchResult(query.query_id, "ok", elapsed, run_id=run_id)
+
+
+async def run_batch(
+    queries: Sequence[BatchQuery],
+    *,
+    concurrency: int = 4,
+    other_research: Optional[str] = None,
+    fanout: Optional[FanoutStrategy] = None,
+    fanout_concurrency: int = 4,
+    incremental: bool = False,
+) -> list[BatchResult]:
+    """Run ``queries`` with at most ``concurrency`` research flows in flight."""
+
+    from src.db import close_pool
+    from src.mcp import mcp_registry
+    from src.models.model_register import model_registry
+    from src.setup import settings
+    from src.utils.cassette import close_cassette
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    run_kwargs: dict[str, Any] = {
+        "other_research": other_research,
+        "fanout": fanout,
+        "fanout_concurrency": fanout_concurrency,
+        "incremental": incremental,
+    }
+
+    # Warm the pooled MCP sessions once; each run leases them from the registry.
+    await mcp_registry.connect_enabled()
+    try:
+        return list(
+            await asyncio.gather(*(_run_one(q, semaphore, run_kwargs) for q in queries))
+        )
+    finally:
+        await mcp_registry.cleanup_all()
+        await close_pool()
+        await model_registry.aclose()
+        close_cassette()
+        if settings.METRICS_FILE:
+            write_metrics_file(settings.METRICS_FILE)
+
+
+def _report(results: Sequence[BatchResult], wall_seconds: float) -> None:
+    for r in results:
+        detail = r.run_id if r.status == "ok" else r.error
+        _LOGGER.info("%-24s %-6s %8.1fs %s", r.query_id, r.status, r.seconds, detail)
+
+    ok = sum(1 for r in results if r.status == "ok")
+    throughput = (len(results) / wall_seconds) * 3600 if wall_seconds > 0 else 0.0
+    _LOGGER.info(
+        "Batch finished: %d/%d ok, wall=%.1fs, throughput=%.1f queries/hour",
+        ok,
+        len(results),
+        wall_seconds,
+        throughput,
+    )
+
+
+async def _async_batch(batch_input: BatchInput) -> list[BatchResult]:
+    from src.mem.tokens import warm_tokenizers
+    from src.setup import settings
+
+    configure_logging()
+    if settings.METRICS_PORT:
+        serve_metrics(settings.METRICS_PORT)
+    warm = asyncio.create_task(asyncio.to_thread(warm_tokenizers))
+    queries = load_queries(batch_input.path)
+    other_research = load_other_research() if batch_input.use_other_research else None
+    _LOGGER.info(
+        "Running %d queries with concurrency=%d", len(queries), batch_input.concurrency
+    )
+
+    started = time.perf_counter()
+    results = await run_batch(
+        queries,
+        concurrency=batch_input.concurrency,
+        other_research=other_research,
+        fanout=batch_input.fanout,  # type: ignore[arg-type]
+        fanout_concurrency=batch_input.fanout_concurrency,
+        incremental=batch_input.incremental,
+    )
+    _report(results, time.perf_counter() - started)
+    await warm
+    return results
+
+
+def main(batch_input: BatchInput) -> None:
+    setup_tracing()
+    results = asyncio.run(_async_batch(batch_input))
+    if any(r.status != "ok" for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    chz.nested_entrypoint(main)
@@ -0,0 +1,230 @@
+"""Offline end-to-end benchmark of the research flow.
+
+Starts the local stand-ins from ``src.bench.fakes`` (Exa MCP and an
+OpenAI-compatible endpoint), points the researcher settings at them and runs
+``parse_input`` -> ``run_research_flow`` -> ``insert_digest`` under a set of
+scenarios that vary turns, payload sizes, latency and concurrency.
+
+Every scenario produces one JSON object (printed and, with ``out=``, appended
+to a JSONL file) with per-phase timings across runs::
+
+    python -m src.bench.e2e scenarios=baseline,concurrent out=data/bench/e2e.jsonl
+
+Phases: ``parse``, ``mcp_connect``, ``manager``, ``research`` (nested in
+manager, per research agent call), ``condense``, ``persist`` and ``flow``.
+Manager/research/condense timings come from the Agents SDK agent spans.
+``persist`` needs a reachable ``DATABASE_URL``; without one it is skipped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import chz
+
+from src.bench.fakes import FakeConfig, FakeLLM, FakeMCP
+from src.bench.timing import AGENT_PHASES, AgentSpanTimer, git_rev, summarize
+
+QUERY = "Hey. retrieve all danish startups getting funding in August 2025."
+# Passed as other_research so the condense agent runs, as it does in main.py.
+OTHER_RESEARCH = "## Other research\n" + "Fake Startup 1 raised a seed round in August 2025.\n" * 50
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    name: str
+    manager_turns: int = 2
+    search_turns: int = 3
+    companies_per_call: int = 3
+    payload_kb: int = 8
+    llm_latency_ms: float = 50.0
+    mcp_latency_ms: float = 100.0
+    concurrency: int = 1
+    stream: bool = False  # streamed manager with checkpoints (as main.py runs it)
+
+
+_BASELINE = Scenario("baseline")
+SCENARIOS: dict[str, Scenario] = {
+    s.name: s
+    for s in (
+        _BASELINE,
+        replace(_BASELINE, name="long", manager_turns=6, search_turns=6),
+        replace(_BASELINE, name="large_payload", payload_kb=128, companies_per_call=10),
+        replace(_BASELINE, name="concurrent", concurrency=8),
+        replace(_BASELINE, name="streamed", stream=True),
+        replace(_BASELINE, name="zero_latency", llm_latency_ms=0.0, mcp_latency_ms=0.0),
+    )
+}
+
+
+@chz.chz
+class BenchInput:
+    scenarios: str = chz.field(default="all", doc="Comma-separated scenario names, or 'all'")
+    out: Optional[str] = chz.field(default=None, doc="JSONL file to append results to")
+    research_lm: str = chz.field(default="azure.gpt-5-nano")
+    persist: bool = chz.field(default=True, doc="Time insert_digest when DATABASE_URL is set")
+
+
+def _configure_env(llm: FakeLLM, research_lm: str, cache_dir: str) -> None:
+    """Point the researcher settings at the fakes; must run before ``src.setup`` is imported."""
+
+    os.environ.update(
+        {
+            "OPENAI_BASE_URL": llm.base_url,
+            "LLAMACPP_BASE_URL": llm.base_url,
+            "OPENAI_API_KEY": "bench",
+            "PARSE_LM": research_lm,
+            "RESEARCH_LM": research_lm,
+            "ENABLE_EXA_MCP": "false",
+            "ENABLE_MCP_CACHE": "false",
+            "ENABLE_LM_CACHE": "false",
+            "CACHE_DIR": cache_dir,
+        }
+    )
+    for key in ("BRAINTRUST_PROJECT_NAME", "BRAINTRUST_API_KEY", "EXA_MCP_URL", "EXA_API_KEY"):
+        os.environ.setdefault(key, "")
+    os.environ.setdefault("DATABASE_URL", "")
+
+
+async def _run_scenario(
+    scenario: Scenario,
+    config: FakeConfig,
+    mcp: FakeMCP,
+    timer: AgentSpanTimer,
+    persist: bool,
+) -> dict[str, Any]:
+    from agents.mcp import MCPServerStreamableHttpParams
+
+    from src.db import insert_digest
+    from src.flows.research_flow import run_research_flow
+    from src.mcp.general import CachedMCPServerHttp
+    from src.oagents.input_parser import parse_input
+
+    config.llm_latency_ms = scenario.llm_latency_ms
+    config.mcp_latency_ms = scenario.mcp_latency_ms
+    config.manager_turns = scenario.manager_turns
+    config.search_turns = scenario.search_turns
+    config.companies_per_call = scenario.companies_per_call
+    config.payload_kb = scenario.payload_kb
+    config.stats.update(llm_requests=0, mcp_calls=0, prompt_tokens=0, cached_tokens=0)
+    timer.reset()
+
+    phases: dict[str, list[float]] = defaultdict(list)
+
+    server = CachedMCPServerHttp(
+        MCPServerStreamableHttpParams(url=mcp.url, headers={}),
+        name="Exa",
+        client_session_timeout_seconds=240,
+        cache_tools_list=True,
+    )
+    started = time.perf_counter()
+    await server.connect()
+    await server.list_tools()
+    phases["mcp_connect"].append(time.perf_counter() - started)
+
+    async def _one(index: int) -> None:
+        t0 = time.perf_counter()
+        search = await parse_input(QUERY, use_cache=False)
+        t1 = time.perf_counter()
+        run_id = f"bench-{scenario.name}-{index}-{int(time.time())}" if scenario.stream else None
+        result = await run_research_flow(
+            search, other_research=OTHER_RESEARCH, mcp_servers=[server], run_id=run_id
+        )
+        t2 = time.perf_counter()
+        phases["parse"].append(t1 - t0)
+        phases["flow"].append(t2 - t1)
+        if persist and not isinstance(result, str):
+            await insert_digest(result, run_id=run_id)
+            phases["persist"].append(time.perf_counter() - t2)
+
+    wall_started = time.perf_counter()
+    try:
+        outcomes = await asyncio.gather(
+            *(_one(i) for i in range(scenario.concurrency)), return_exceptions=True
+        )
+    finally:
+        await server.cleanup()
+    wall = time.perf_counter() - wall_started
+    failures = [repr(o) for o in outcomes if isinstance(o, BaseException)]
+
+    for agent_name, durations in timer.durations.items():
+        phases[AGENT_PHASES.get(agent_name, agent_name)].extend(durations)
+
+    return {
+        "scenario": scenario.name,
+        "params": asdict(scenario),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "git_rev": git_rev(),
+        "runs": scenario.concurrency,
+        "failed": len(failures),
+        "errors": failures[:3],
+        "wall_seconds": round(wall, 4),
+        "phases": {name: summarize(samples) for name, samples in sorted(phases.items())},
+        "llm_requests": config.stats["llm_requests"],
+        "mcp_calls": config.stats["mcp_calls"],
+        # Only llama.cpp backends (research_lm=gpt-oss:20b) report prefix reuse here.
+        "prompt_cache_hit_rate": round(
+            config.stats["cached_tokens"] / max(config.stats["prompt_tokens"], 1), 4
+        ),
+    }
+
+
+async def _async_bench(bench_input: BenchInput) -> list[dict[str, Any]]:
+    names = list(SCENARIOS) if bench_input.scenarios == "all" else bench_input.scenarios.split(",")
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        msg = f"Unknown scenarios {unknown}. Available: {list(SCENARIOS)}"
+        raise ValueError(msg)
+
+    config = FakeConfig()
+    llm, mcp = FakeLLM(config), FakeMCP(config)
+    await asyncio.gather(llm.start(), mcp.start())
+
+    cache_dir = tempfile.mkdtemp(prefix="researcher-bench-")
+    _configure_env(llm, bench_input.research_lm, cache_dir)
+
+    from agents import set_trace_processors
+
+    from src.db import close_pool
+    from src.models.model_register import model_registry
+    from src.setup import settings
+
+    timer = AgentSpanTimer()
+    set_trace_processors([timer])  # also keeps spans from being exported anywhere
+    persist = bench_input.persist and bool(settings.DATABASE_URL)
+
+    results: list[dict[str, Any]] = []
+    try:
+        for name in names:
+            result = await _run_scenario(SCENARIOS[name], config, mcp, timer, persist)
+            print(json.dumps(result), flush=True)
+            results.append(result)
+    finally:
+        await close_pool()
+        await model_registry.aclose()
+        await asyncio.gather(llm.stop(), mcp.stop())
+
+    if bench_input.out:
+        os.makedirs(os.path.dirname(bench_input.out) or ".", exist_ok=True)
+        with open(bench_input.out, "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    return results
+
+
+def main(bench_input: BenchInput) -> None:
+    results = asyncio.run(_async_bench(bench_input))
+    if any(r["failed"] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    chz.nested_entrypoint(main)
@@ -0,0 +1,296 @@
+"""Local stand-ins for the Exa MCP server and the OpenAI-compatible LLM endpoint.
+
+Both run in-process on 127.0.0.1 with configurable latency and canned,
+schema-valid responses, so the research flow can be exercised end to end
+without network access:
+
+- ``FakeMCP``: a FastMCP streamable-HTTP server exposing ``web_search_exa``.
+- ``FakeLLM``: a ``/v1/chat/completions`` endpoint (streaming and
+  non-streaming) that plays the input parser, manager, research and condense
+  agents. It recognises the caller from the tools offered in the request and
+  counts tool results in the conversation to decide whether to call a tool
+  again or return the final output.
+
+This module deliberately does not import ``src.setup`` so the fakes can be
+started before the researcher settings are configured to point at them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Optional
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+SEARCH_TOOL = "web_search_exa"
+MANAGER_TOOL = "research_agent"
+
+
+@dataclass(slots=True)
+class FakeConfig:
+    """Knobs shared by both fakes; mutable so one server pair can serve many scenarios."""
+
+    llm_latency_ms: float = 0.0
+    mcp_latency_ms: float = 0.0
+    manager_turns: int = 2
+    search_turns: int = 3
+    companies_per_call: int = 3
+    payload_kb: int = 8
+    stats: dict[str, int] = field(
+        default_factory=lambda: {
+            "llm_requests": 0,
+            "mcp_calls": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+        }
+    )
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def canned_digest(index: int) -> dict[str, Any]:
+    announced = date(2025, 8, 1) + timedelta(days=index % 28)
+    source = {
+        "url": f"https://news.example.com/funding/{index}",
+        "title": f"Fake Startup {index} raises seed round",
+        "publisher": "Example News",
+        "published_at": f"{announced.isoformat()}T09:00:00Z",
+        "snippet": "Copenhagen-based Fake Startup raised a seed round led by Example Ventures.",
+    }
+    investor = {"name": f"Example Ventures {index % 5}", "website": "https://vc.example.com"}
+    return {
+        "company": {
+            "name": f"Fake Startup {index}",
+            "website": f"https://fake-startup-{index}.example.com",
+            "location": {"country": "Denmark"},
+            "industry": "Software",
+            "owners": None,
+            "num_employees": None,
+            "brief": "Builds developer tooling for Nordic fintechs.",
+        },
+        "funding_events": [
+            {
+                "round": "seed",
+                "announced_date": announced.isoformat(),
+                "amount": {"as_reported": "€2M", "value": 2000000, "currency": "EUR"},
+                "investors": [investor],
+                "lead_investor": investor,
+                "source_documents": [source],
+            }
+        ],
+        "related_links": [],
+        "satisfies_search_criteria": "yes",
+    }
+
+
+# ** Fake MCP (Exa)
+class FakeMCP:
+    def __init__(self, config: FakeConfig) -> None:
+        self.config = config
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}/mcp"
+        self._server: Optional[uvicorn.Server] = None
+        self._task: Optional[asyncio.Task] = None
+
+        mcp = FastMCP("FakeExa")
+
+        @mcp.tool(name=SEARCH_TOOL, description="Search the web (fake Exa).")
+        async def web_search_exa(query: str, numResults: int = 5) -> str:
+            self.config.stats["mcp_calls"] += 1
+            await asyncio.sleep(self.config.mcp_latency_ms / 1000)
+            line = f"Result for {query}: https://news.example.com/funding/{numResults} "
+            body = line * max(1, (self.config.payload_kb * 1024) // len(line))
+            return body
+
+        self._app = mcp.streamable_http_app()
+
+    async def start(self) -> None:
+        self._server, self._task = await _serve(self._app, self.port)
+
+    async def stop(self) -> None:
+        await _shutdown(self._server, self._task)
+
+
+# ** Fake OpenAI-compatible endpoint
+def _tool_names(body: dict[str, Any]) -> set[str]:
+    return {t.get("function", {}).get("name", "") for t in body.get("tools") or []}
+
+
+def _tool_results(body: dict[str, Any]) -> int:
+    return sum(1 for m in body.get("messages", []) if m.get("role") == "tool")
+
+
+def _schema_name(body: dict[str, Any]) -> str:
+    response_format = body.get("response_format") or {}
+    return (response_format.get("json_schema") or {}).get("name", "")
+
+
+class FakeLLM:
+    def __init__(self, config: FakeConfig) -> None:
+        self.config = config
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}/v1"
+        self._server: Optional[uvicorn.Server] = None
+        self._task: Optional[asyncio.Task] = None
+        # Last prompt per llama.cpp slot, to report the reused prefix as cached tokens.
+        self._slot_prompts: dict[int, str] = {}
+        self._app = Starlette(
+            routes=[Route("/v1/chat/completions", self._chat_completions, methods=["POST"])]
+        )
+
+    async def start(self) -> None:
+        self._server, self._task = await _serve(self._app, self.port)
+
+    async def stop(self) -> None:
+        await _shutdown(self._server, self._task)
+
+    def _reply(self, body: dict[str, Any]) -> tuple[Optional[str], Optional[dict[str, Any]]]:
+        """Return (content, tool_call) for the agent that sent ``body``."""
+
+        cfg = self.config
+        tools = _tool_names(body)
+        done = _tool_results(body)
+
+        if MANAGER_TOOL in tools:
+            if done < cfg.manager_turns:
+                args = {"input": f"Research slice {done}"}
+                return None, {"name": MANAGER_TOOL, "arguments": args}
+            return json.dumps(self._results(cfg.manager_turns * cfg.companies_per_call)), None
+
+        if SEARCH_TOOL in tools:
+            if done < cfg.search_turns:
+                args = {"query": f"danish seed funding august 2025 #{done}", "numResults": 5}
+                return None, {"name": SEARCH_TOOL, "arguments": args}
+            start = done * cfg.companies_per_call
+            digests = [canned_digest(start + i) for i in range(cfg.companies_per_call)]
+            # Non-object output types are wrapped by the Agents SDK.
+            return json.dumps({"response": digests}), None
+
+        if _schema_name(body) == "SearchInput":
+            search = {
+                "query": "danish startups getting funding in August 2025",
+                "criteria": [{"description": "Headquartered in Denmark"}],
+                "max_count": 50,
+                "period_start": "2025-08-01",
+                "period_end": "2025-08-31",
+            }
+            return json.dumps(search), None
+
+        return json.dumps(self._results(cfg.manager_turns * cfg.companies_per_call)), None
+
+    @staticmethod
+    def _results(n: int) -> dict[str, Any]:
+        return {
+            "company_funding_digests": [canned_digest(i) for i in range(n)],
+            "summary": "## Fake summary\nA benchmark run with canned companies.",
+        }
+
+    async def _chat_completions(self, request: Request) -> Response:
+        body = await request.json()
+        self.config.stats["llm_requests"] += 1
+        await asyncio.sleep(self.config.llm_latency_ms / 1000)
+
+        content, tool_call = self._reply(body)
+        call_id = f"call_{self.config.stats['llm_requests']}"
+        prompt = json.dumps([body.get("tools"), body.get("messages", [])])
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content or json.dumps(tool_call)) // 4
+        cached_tokens = 0
+        slot = body.get("id_slot")
+        if body.get("cache_prompt") and isinstance(slot, int):
+            previous = self._slot_prompts.get(slot, "")
+            cached_tokens = len(os.path.commonprefix([previous, prompt])) // 4
+            self._slot_prompts[slot] = prompt
+        self.config.stats["prompt_tokens"] += prompt_tokens
+        self.config.stats["cached_tokens"] += cached_tokens
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        finish_reason = "tool_calls" if tool_call else "stop"
+        tool_calls = (
+            [
+                {
+                    "id": call_id,
+                    "type": "function",
+                    "function": {
+                        "name": tool_call["name"],
+                        "arguments": json.dumps(tool_call["arguments"]),
+                    },
+                }
+            ]
+            if tool_call
+            else None
+        )
+        base = {"id": f"chatcmpl-{call_id}", "created": int(time.time()), "model": body["model"]}
+
+        if not body.get("stream"):
+            message: dict[str, Any] = {"role": "assistant", "content": content}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            return JSONResponse(
+                {
+                    **base,
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                    "usage": usage,
+                }
+            )
+
+        async def _events() -> AsyncIterator[str]:
+            delta: dict[str, Any] = {"role": "assistant"}
+            if content is not None:
+                delta["content"] = content
+            if tool_calls:
+                delta["tool_calls"] = [{"index": 0, **tool_calls[0]}]
+            chunks = [
+                {"choices": [{"index": 0, "delta": delta, "finish_reason": None}]},
+                {"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]},
+                {"choices": [], "usage": usage},
+            ]
+            for chunk in chunks:
+                payload = {**base, "object": "chat.completion.chunk", **chunk}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_events(), media_type="text/event-stream")
+
+
+# ** uvicorn helpers
+async def _serve(app: Any, port: int) -> tuple[uvicorn.Server, asyncio.Task]:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+async def _shutdown(server: Optional[uvicorn.Server], task: Optional[asyncio.Task]) -> None:
+    if server is None or task is None:
+        return
+    server.should_exit = True
+    await task
+
+
+__all__ = ["FakeConfig", "FakeLLM", "FakeMCP", "canned_digest"]
@@ -0,0 +1,109 @@
+"""Startup benchmark: how long the researcher entry points take to import.
+
+Each target is imported in a fresh interpreter with ``python -X importtime``,
+repeated ``repeats`` times; the report has the wall-clock time of the whole
+process and the slowest modules by self time from the last run::
+
+    python -m src.bench.import_time out=data/bench/import_time.jsonl max_ms=500
+
+With ``max_ms`` the process exits non-zero when any target's median import
+time exceeds the budget, so a heavy import at module level is caught before
+it ships. ``--help`` of the CLI is measured as the ``src.main --help`` target.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import chz
+
+from src.bench.timing import git_rev, summarize
+
+_HELP_TARGET = "src.main --help"
+
+
+@chz.chz
+class ImportTimeInput:
+    targets: str = chz.field(
+        default=f"src.main,src.batch,{_HELP_TARGET}",
+        doc="Comma-separated modules to import; 'src.main --help' runs the CLI help",
+    )
+    repeats: int = chz.field(default=5)
+    top: int = chz.field(default=10, doc="Number of slowest modules to report per target")
+    max_ms: Optional[float] = chz.field(default=None, doc="Fail when a median exceeds this")
+    out: Optional[str] = chz.field(default=None, doc="JSONL file to append results to")
+
+
+def _command(target: str) -> list[str]:
+    if target == _HELP_TARGET:
+        return [sys.executable, "-X", "importtime", "-m", "src.main", "--help"]
+    return [sys.executable, "-X", "importtime", "-c", f"import {target}"]
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """``(module, self_us, cumulative_us)`` rows from ``-X importtime`` output."""
+
+    rows: list[tuple[str, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _measure(target: str, repeats: int, top: int) -> dict[str, Any]:
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    samples: list[float] = []
+    rows: list[tuple[str, int, int]] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        proc = subprocess.run(_command(target), capture_output=True, text=True, env=env)
+        samples.append(time.perf_counter() - started)
+        # chz exits with status 1 after printing --help.
+        if proc.returncode != 0 and target != _HELP_TARGET:
+            msg = f"{target} failed to import:\n{proc.stderr[-2000:]}"
+            raise RuntimeError(msg)
+        rows = _parse_importtime(proc.stderr)
+
+    slowest = sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+    return {
+        "target": target,
+        "seconds": summarize(samples),
+        "modules": len(rows),
+        "slowest_self_ms": {name: round(self_us / 1000, 1) for name, self_us, _ in slowest},
+    }
+
+
+def main(import_input: ImportTimeInput) -> None:
+    # Baseline for the numbers below: an interpreter that imports nothing.
+    results = [_measure("sys", import_input.repeats, 0)]
+    for target in import_input.targets.split(","):
+        results.append(_measure(target.strip(), import_input.repeats, import_input.top))
+
+    report = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "git_rev": git_rev(),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    print(json.dumps(report), flush=True)
+    if import_input.out:
+        with open(import_input.out, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+    if import_input.max_ms is not None:
+        slow = [r["target"] for r in results if r["seconds"]["p50"] * 1000 > import_input.max_ms]
+        if slow:
+            print(f"Import time above {import_input.max_ms:g}ms: {slow}", file=sys.stderr)
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    chz.nested_entrypoint(main)
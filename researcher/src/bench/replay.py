@@ -0,0 +1,116 @@
+"""Deterministic replay benchmark: re-run a recorded research flow from a cassette.
+
+Record a cassette from a real run first::
+
+    CASSETTE_MODE=record CASSETTE_PATH=data/cassettes/dk-2025-08.jsonl.gz python -m src.main
+
+then replay it without network access, by default with zero latency so the
+timings measure only the agent loop, validation and persistence::
+
+    python -m src.bench.replay path=data/cassettes/dk-2025-08.jsonl.gz repeats=5
+
+The flow must be called the way it was recorded (``stream`` and
+``other_research`` change the model requests). A ``CassetteMiss`` means a
+request changed since recording, e.g. after editing ``types.py`` or agent
+instructions. Output is one JSON object in the same shape as ``src.bench.e2e``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import chz
+
+from src.bench.timing import AGENT_PHASES, AgentSpanTimer, git_rev, summarize
+from src.utils.cassette import Cassette, set_cassette
+
+
+@chz.chz
+class ReplayInput:
+    path: str = chz.field(doc="Cassette recorded with CASSETTE_MODE=record")
+    repeats: int = chz.field(default=3)
+    latency: str = chz.field(default="zero", doc="Replay latency: zero or original")
+    q: Optional[str] = chz.field(default=None, doc="Query; defaults to the one recorded")
+    stream: bool = chz.field(default=True, doc="Must match how the run was recorded")
+    other_research: Optional[str] = chz.field(default="data/reports/oai_deep_research.md")
+    persist: bool = chz.field(default=True, doc="Time insert_digest when DATABASE_URL is set")
+    out: Optional[str] = chz.field(default=None, doc="JSONL file to append results to")
+
+
+async def _async_replay(replay_input: ReplayInput) -> dict[str, Any]:
+    latency = replay_input.latency
+    cassette = Cassette(replay_input.path, "replay", latency=latency)  # type: ignore[arg-type]
+    # Models are wrapped in the cassette when agents are built, so it is set first.
+    set_cassette(cassette)
+
+    from agents import set_trace_processors
+
+    from src.db import close_pool, insert_digest
+    from src.flows.research_flow import run_research_flow
+    from src.mcp import mcp_registry
+    from src.models.model_register import model_registry
+    from src.oagents.input_parser import parse_input
+    from src.setup import settings
+
+    q = replay_input.q or cassette.meta.get("q")
+    if not q:
+        msg = f"{replay_input.path} has no recorded query; pass q="
+        raise ValueError(msg)
+    other_research = None
+    if replay_input.other_research:
+        with open(replay_input.other_research, "r") as f:
+            other_research = f.read()
+
+    timer = AgentSpanTimer()
+    set_trace_processors([timer])
+    persist = replay_input.persist and bool(settings.DATABASE_URL)
+    phases: dict[str, list[float]] = defaultdict(list)
+
+    try:
+        for _ in range(replay_input.repeats):
+            cassette.rewind()
+            t0 = time.perf_counter()
+            search = await parse_input(q, use_cache=False)
+            t1 = time.perf_counter()
+            run_id = str(uuid.uuid4()) if replay_input.stream else None
+            result = await run_research_flow(search, other_research=other_research, run_id=run_id)
+            t2 = time.perf_counter()
+            phases["parse"].append(t1 - t0)
+            phases["flow"].append(t2 - t1)
+            if persist and not isinstance(result, str):
+                await insert_digest(result, run_id=run_id)
+                phases["persist"].append(time.perf_counter() - t2)
+    finally:
+        await mcp_registry.cleanup_all()
+        await close_pool()
+        await model_registry.aclose()
+
+    for agent_name, durations in timer.durations.items():
+        phases[AGENT_PHASES.get(agent_name, agent_name)].extend(durations)
+
+    return {
+        "cassette": replay_input.path,
+        "latency": replay_input.latency,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "git_rev": git_rev(),
+        "runs": replay_input.repeats,
+        "phases": {name: summarize(samples) for name, samples in sorted(phases.items())},
+    }
+
+
+def main(replay_input: ReplayInput) -> None:
+    result = asyncio.run(_async_replay(replay_input))
+    print(json.dumps(result), flush=True)
+    if replay_input.out:
+        with open(replay_input.out, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    chz.nested_entrypoint(main)
@@ -0,0 +1,63 @@
+"""Micro-benchmark: ResearchSession.add_items cost as the session grows.
+
+Each step appends one tool-output-sized item until the session reaches
+``max_items``, after which every call trims. With incremental token
+accounting the per-call cost should stay flat as the history grows; the
+``recount`` column shows what a full re-tokenisation of the history costs at
+the same size, i.e. the work the old ``_token_count`` loop repeated on every
+trim iteration.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from src.mem.short_ctx import ResearchSession, _item_to_serialisable
+from src.mem.tokens import get_encoder
+from src.models.model_register import model_registry
+
+_MAX_ITEMS = 64
+_REPEATS = 20
+
+
+def _make_item(i: int) -> dict[str, str]:
+    return {
+        "type": "function_call_output",
+        "call_id": f"call_{i}",
+        "output": f"result {i}: " + "Copenhagen startup raises seed round from Nordic VCs. " * 40,
+    }
+
+
+async def _bench(model_name: str) -> None:
+    spec = model_registry.get_model(model_name)
+    session = ResearchSession("bench", spec, max_items=_MAX_ITEMS)
+    encoder = get_encoder(spec)
+
+    print(f"model={model_name} tokenizer={spec.tokenizer_name} max_items={_MAX_ITEMS}")
+    print(f"{'items':>6} {'add_items us':>14} {'recount us':>12}")
+    for i in range(_MAX_ITEMS * 2):
+        items = [_make_item(i)]
+        start = time.perf_counter()
+        for _ in range(_REPEATS):
+            await session.add_items(items)
+            await session.pop_item()
+        await session.add_items(items)
+        add_us = (time.perf_counter() - start) / (_REPEATS + 1) * 1e6
+
+        history = await session.get_items()
+        if i % 8 == 7:
+            start = time.perf_counter()
+            for item in history:
+                len(encoder(_item_to_serialisable(item)))
+            recount_us = (time.perf_counter() - start) * 1e6
+            print(f"{len(history):>6} {add_us:>14.1f} {recount_us:>12.1f}")
+
+
+def main() -> None:
+    for model_name in model_registry.list_models():
+        asyncio.run(_bench(model_name))
+
+
+if __name__ == "__main__":
+    main()
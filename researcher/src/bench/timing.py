@@ -0,0 +1,68 @@
+"""Shared timing helpers for the end-to-end and replay benchmarks."""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Optional
+
+
+class AgentSpanTimer:
+    """Trace processor collecting agent span durations by agent name."""
+
+    def __init__(self) -> None:
+        self.durations: dict[str, list[float]] = defaultdict(list)
+
+    def reset(self) -> None:
+        self.durations.clear()
+
+    def on_trace_start(self, trace: Any) -> None:
+        pass
+
+    def on_trace_end(self, trace: Any) -> None:
+        pass
+
+    def on_span_start(self, span: Any) -> None:
+        pass
+
+    def on_span_end(self, span: Any) -> None:
+        data = span.span_data
+        if getattr(data, "type", None) != "agent" or not span.started_at or not span.ended_at:
+            return
+        started = datetime.fromisoformat(span.started_at)
+        ended = datetime.fromisoformat(span.ended_at)
+        self.durations[data.name].append((ended - started).total_seconds())
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+
+AGENT_PHASES = {
+    "ManagerAgent": "manager",
+    "StartupFundingResearcher": "research",
+    "CondenseAgent": "condense",
+}
+
+
+def summarize(samples: list[float]) -> dict[str, float | int]:
+    return {
+        "n": len(samples),
+        "mean": round(statistics.fmean(samples), 4),
+        "p50": round(statistics.median(samples), 4),
+        "max": round(max(samples), 4),
+    }
+
+
+def git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
@@ -1,5 +1,16 @@
 """Database utilities for startup researcher."""
 
-from .digests import insert_digest
+from .digests import RunStatus, insert_digest, search_key
+from .pool import close_pool
+from .reads import Page, get_run, list_companies, list_runs
 
-__all__ = ["insert_digest"]
+__all__ = [
+    "RunStatus",
+    "insert_digest",
+    "search_key",
+    "close_pool",
+    "Page",
+    "get_run",
+    "list_companies",
+    "list_runs",
+]
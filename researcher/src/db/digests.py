@@ -1,63 +1,107 @@
 from __future__ import annotations
 
-import asyncio
+import hashlib
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Literal, Optional
 
-import psycopg
-from psycopg.rows import dict_row
 from psycopg.types.json import Json
 
-from src.setup import settings
-from src.types import StartupFundingSearchEngineOutput
+from src.db.normalized import replace_normalized_rows
+from src.db.pool import connection
+from src.metrics import timed
+from src.types import (
+    CompanyFundingDigest,
+    CompanyFundingSearchResults,
+    SearchInput,
+    StartupFundingSearchEngineOutput,
+)
 
 _LOGGER = logging.getLogger("startup_researcher.db.digests")
 
+# "partial" while streaming, "stopped" when the run budget ran out, else "complete".
+RunStatus = Literal["partial", "stopped", "complete"]
 
-def _get_connection() -> psycopg.Connection:
-    if not settings.DATABASE_URL:
-        msg = "DATABASE_URL is not configured."
-        raise RuntimeError(msg)
-    return psycopg.connect(settings.DATABASE_URL, row_factory=dict_row)
+# created_at keeps the run's first write so its keyset position (see reads.py) is stable.
+_UPSERT_DIGEST_SQL = """
+INSERT INTO funding_digest_runs (run_id, created_at, updated_at, data)
+VALUES (%s, %s, %s, %s::jsonb)
+ON CONFLICT (run_id) DO UPDATE
+SET updated_at = EXCLUDED.updated_at,
+    data = EXCLUDED.data
+RETURNING run_id
+"""
 
 
-def _insert_digest(
-    result: StartupFundingSearchEngineOutput,
+def _company_digests(
+    result: CompanyFundingSearchResults | StartupFundingSearchEngineOutput,
+) -> list[CompanyFundingDigest]:
+    if isinstance(result, StartupFundingSearchEngineOutput):
+        return result.output.company_funding_digests
+    return result.company_funding_digests
+
+
+def search_key(search: SearchInput) -> str:
+    """Identify searches for the same thing, whatever their period or size.
+
+    The query and criteria are compared case- and whitespace-insensitively, and
+    the criteria in any order.
+    """
+
+    def _norm(text: str) -> str:
+        return " ".join(text.split()).casefold()
+
+    parts = [_norm(search.query), *sorted(_norm(c.description) for c in search.criteria)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _run_info(
+    result: CompanyFundingSearchResults | StartupFundingSearchEngineOutput,
+    search: Optional[SearchInput],
+    status: RunStatus,
+) -> dict[str, str]:
+    if search is None and isinstance(result, StartupFundingSearchEngineOutput):
+        search = result.search
+    info = {"status": status}
+    if search is not None:
+        info["search_key"] = search_key(search)
+    return info
+
+
+async def insert_digest(
+    result: CompanyFundingSearchResults | StartupFundingSearchEngineOutput,
     run_id: Optional[str] = None,
     recorded_at: Optional[datetime] = None,
+    *,
+    search: Optional[SearchInput] = None,
+    status: RunStatus = "complete",
 ) -> str:
+    """Upsert a run's digest; ``search`` and ``status`` are stored under ``data.run``.
+
+    Incremental runs only build on ``complete`` runs with the same ``search_key``.
+    ``recorded_at`` becomes the run's ``created_at`` on its first write and its
+    ``updated_at`` on every write.
+    """
+
     payload = result.model_dump(mode="json")
+    payload["run"] = _run_info(result, search, status)
     run_identifier = run_id or str(uuid.uuid4())
     recorded_ts = recorded_at.astimezone(timezone.utc) if recorded_at else datetime.now(timezone.utc)
 
-    with _get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO funding_digest_runs (run_id, created_at, data)
-                VALUES (%s, %s, %s::jsonb)
-                ON CONFLICT (run_id) DO UPDATE
-                SET created_at = EXCLUDED.created_at,
-                    data = EXCLUDED.data
-                RETURNING run_id
-                """,
-                (run_identifier, recorded_ts, Json(payload)),
+    with timed("db_write_seconds", op="insert_digest"):
+        async with connection() as conn, conn.transaction(), conn.cursor() as cur:
+            # The upsert runs for every partial and final result, so keep it prepared.
+            await cur.execute(
+                _UPSERT_DIGEST_SQL,
+                (run_identifier, recorded_ts, recorded_ts, Json(payload)),
+                prepare=True,
             )
-            returned = cur.fetchone()
-        conn.commit()
+            returned = await cur.fetchone()
+            counts = await replace_normalized_rows(cur, run_identifier, _company_digests(result))
 
-    _LOGGER.info("Stored digest run %s", run_identifier)
+    _LOGGER.info("Stored digest run %s (%s)", run_identifier, counts)
     return returned["run_id"] if isinstance(returned, dict) else run_identifier
 
 
-async def insert_digest(
-    result: StartupFundingSearchEngineOutput,
-    run_id: Optional[str] = None,
-    recorded_at: Optional[datetime] = None,
-) -> str:
-    return await asyncio.to_thread(_insert_digest, result, run_id, recorded_at)
-
-
-__all__ = ["insert_digest"]
+__all__ = ["RunStatus", "insert_digest", "search_key"]
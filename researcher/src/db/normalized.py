@@ -0,0 +1,282 @@
+"""Normalized relational projection of a digest run.
+
+Alongside the JSONB blob in ``funding_digest_runs`` each run is written to the
+``companies``, ``funding_events``, ``investors`` and ``source_documents``
+tables so queries such as "all seed rounds led by X" hit indexes instead of
+unpacking every stored document. Rows are bulk loaded with ``COPY`` in a
+savepoint of the caller's transaction, so a failure only loses the projection.
+
+``db/init.sql`` only runs on a fresh database volume, so ``ensure_schema``
+creates the tables, the ``updated_at`` column and the read API's run indexes
+(idempotently) when the pool opens on older deployments.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Sequence
+
+from psycopg import AsyncConnection, AsyncCursor
+
+from src.types import CompanyFundingDigest, SourceDocument
+from src.utils.digest_merge import normalize_company_name, normalize_domain
+
+_LOGGER = logging.getLogger("startup_researcher.db.normalized")
+
+# Same DDL as db/init.sql (runs, then the normalized tables); keep them in sync.
+_RUNS_SQL = """
+-- Runs are upserted on every partial result. created_at keeps the first write, so
+-- a running job keeps its place in keyset pages; updated_at tracks the latest one.
+ALTER TABLE funding_digest_runs
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+-- Keyset pagination over runs (newest first) and JSONB containment filters.
+CREATE INDEX IF NOT EXISTS idx_funding_digest_runs_keyset
+    ON funding_digest_runs (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_funding_digest_runs_data
+    ON funding_digest_runs USING GIN (data jsonb_path_ops);
+"""
+
+_NORMALIZED_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS companies (
+    run_id TEXT NOT NULL REFERENCES funding_digest_runs (run_id) ON DELETE CASCADE,
+    company_idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    website TEXT,
+    domain TEXT,
+    country TEXT,
+    industry TEXT,
+    num_employees INTEGER,
+    brief TEXT,
+    satisfies_search_criteria TEXT NOT NULL,
+    PRIMARY KEY (run_id, company_idx)
+);
+
+-- Also serves keyset pagination over companies by name.
+CREATE INDEX IF NOT EXISTS idx_companies_normalized_name
+    ON companies (normalized_name, run_id, company_idx);
+CREATE INDEX IF NOT EXISTS idx_companies_domain ON companies (domain);
+
+CREATE TABLE IF NOT EXISTS funding_events (
+    run_id TEXT NOT NULL,
+    company_idx INTEGER NOT NULL,
+    event_idx INTEGER NOT NULL,
+    round TEXT NOT NULL,
+    announced_date DATE NOT NULL,
+    amount_as_reported TEXT NOT NULL,
+    amount_value NUMERIC,
+    amount_currency TEXT,
+    lead_investor TEXT,
+    lead_investor_normalized TEXT,
+    PRIMARY KEY (run_id, company_idx, event_idx),
+    FOREIGN KEY (run_id, company_idx) REFERENCES companies (run_id, company_idx) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_funding_events_round_date
+    ON funding_events (round, announced_date DESC);
+CREATE INDEX IF NOT EXISTS idx_funding_events_lead_round
+    ON funding_events (lead_investor_normalized, round);
+
+CREATE TABLE IF NOT EXISTS investors (
+    run_id TEXT NOT NULL,
+    company_idx INTEGER NOT NULL,
+    event_idx INTEGER NOT NULL,
+    investor_idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    website TEXT,
+    is_lead BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (run_id, company_idx, event_idx, investor_idx),
+    FOREIGN KEY (run_id, company_idx, event_idx)
+        REFERENCES funding_events (run_id, company_idx, event_idx) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_investors_normalized_name ON investors (normalized_name);
+
+CREATE TABLE IF NOT EXISTS source_documents (
+    run_id TEXT NOT NULL,
+    company_idx INTEGER NOT NULL,
+    doc_idx INTEGER NOT NULL,
+    event_idx INTEGER,  -- NULL for the company's related_links
+    url TEXT,
+    title TEXT,
+    publisher TEXT,
+    published_at TIMESTAMPTZ,
+    snippet TEXT,
+    PRIMARY KEY (run_id, company_idx, doc_idx),
+    FOREIGN KEY (run_id, company_idx) REFERENCES companies (run_id, company_idx) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_source_documents_url ON source_documents (url);
+"""
+
+_SCHEMA_SQL = _RUNS_SQL + _NORMALIZED_TABLES_SQL
+
+_COLUMNS: dict[str, tuple[str, ...]] = {
+    "companies": (
+        "run_id",
+        "company_idx",
+        "name",
+        "normalized_name",
+        "website",
+        "domain",
+        "country",
+        "industry",
+        "num_employees",
+        "brief",
+        "satisfies_search_criteria",
+    ),
+    "funding_events": (
+        "run_id",
+        "company_idx",
+        "event_idx",
+        "round",
+        "announced_date",
+        "amount_as_reported",
+        "amount_value",
+        "amount_currency",
+        "lead_investor",
+        "lead_investor_normalized",
+    ),
+    "investors": (
+        "run_id",
+        "company_idx",
+        "event_idx",
+        "investor_idx",
+        "name",
+        "normalized_name",
+        "website",
+        "is_lead",
+    ),
+    "source_documents": (
+        "run_id",
+        "company_idx",
+        "doc_idx",
+        "event_idx",
+        "url",
+        "title",
+        "publisher",
+        "published_at",
+        "snippet",
+    ),
+}
+
+
+def _doc_fields(doc: SourceDocument) -> tuple[Any, ...]:
+    return (doc.url, doc.title, doc.publisher, doc.published_at, doc.snippet)
+
+
+def digest_rows(
+    run_id: str, digests: Sequence[CompanyFundingDigest]
+) -> dict[str, list[tuple[Any, ...]]]:
+    """Flatten ``digests`` into rows for each normalized table (in ``_COLUMNS`` order)."""
+
+    rows: dict[str, list[tuple[Any, ...]]] = {table: [] for table in _COLUMNS}
+    for c_idx, digest in enumerate(digests):
+        company = digest.company
+        rows["companies"].append(
+            (
+                run_id,
+                c_idx,
+                company.name,
+                normalize_company_name(company.name),
+                company.website,
+                normalize_domain(company.website),
+                company.location.country,
+                company.industry,
+                company.num_employees,
+                company.brief,
+                digest.satisfies_search_criteria,
+            )
+        )
+
+        doc_idx = 0
+        for e_idx, event in enumerate(digest.funding_events):
+            lead = event.lead_investor
+            lead_key = normalize_company_name(lead.name) if lead else None
+            rows["funding_events"].append(
+                (
+                    run_id,
+                    c_idx,
+                    e_idx,
+                    event.round,
+                    event.announced_date,
+                    event.amount.as_reported,
+                    event.amount.value,
+                    event.amount.currency,
+                    lead.name if lead else None,
+                    lead_key,
+                )
+            )
+
+            investors = list(event.investors)
+            if lead and all(normalize_company_name(i.name) != lead_key for i in investors):
+                investors.insert(0, lead)
+            for i_idx, investor in enumerate(investors):
+                key = normalize_company_name(investor.name)
+                rows["investors"].append(
+                    (
+                        run_id,
+                        c_idx,
+                        e_idx,
+                        i_idx,
+                        investor.name,
+                        key,
+                        investor.website,
+                        key == lead_key,
+                    )
+                )
+
+            for doc in event.source_documents:
+                rows["source_documents"].append((run_id, c_idx, doc_idx, e_idx, *_doc_fields(doc)))
+                doc_idx += 1
+
+        for doc in digest.related_links:
+            rows["source_documents"].append((run_id, c_idx, doc_idx, None, *_doc_fields(doc)))
+            doc_idx += 1
+
+    return rows
+
+
+async def ensure_schema(conn: AsyncConnection) -> None:
+    """Add the run column and indexes and create the normalized tables if missing.
+
+    On a large existing table the first call builds the indexes, which blocks
+    digest writes until it finishes; later calls are no-ops.
+    """
+
+    async with conn.transaction():
+        await conn.execute(_SCHEMA_SQL)
+
+
+async def replace_normalized_rows(
+    cur: AsyncCursor, run_id: str, digests: Sequence[CompanyFundingDigest]
+) -> dict[str, int]:
+    """Replace the run's normalized rows using one COPY per table; returns row counts.
+
+    Runs in a savepoint inside the ``funding_digest_runs`` upsert's transaction.
+    If it fails, the error is logged, the savepoint is rolled back and the
+    upsert still commits; the counts are then empty.
+    """
+
+    counts: dict[str, int] = {}
+    try:
+        async with cur.connection.transaction():
+            # Child tables cascade from companies.
+            await cur.execute("DELETE FROM companies WHERE run_id = %s", (run_id,), prepare=True)
+            for table, rows in digest_rows(run_id, digests).items():
+                counts[table] = len(rows)
+                if not rows:
+                    continue
+                columns = ", ".join(_COLUMNS[table])
+                async with cur.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+    except Exception as exc:
+        _LOGGER.warning("Skipped normalized rows for run %s: %s", run_id, exc)
+        return {}
+    return counts
+
+
+__all__ = ["digest_rows", "ensure_schema", "replace_normalized_rows"]
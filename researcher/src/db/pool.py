@@ -0,0 +1,112 @@
+"""Shared async connection pool for the persistence layer.
+
+The pool is opened lazily on first use and shared by every coroutine in the
+process (single runs, batch mode and workers). Connections are health-checked
+when they are handed out, broken ones are replaced in the background. The
+time callers wait for a connection and the pool's size are exported as the
+``db_pool_*`` metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from src.db.normalized import ensure_schema
+from src.metrics import metrics
+from src.setup import settings
+
+_LOGGER = logging.getLogger("startup_researcher.db.pool")
+
+metrics.describe("db_pool_wait_seconds", "histogram", "Time spent waiting for a pooled connection")
+metrics.describe("db_pool_connections", "gauge", "Pooled database connections by state")
+
+
+_pool: Optional[AsyncConnectionPool] = None
+_pool_lock = asyncio.Lock()
+
+
+def _on_reconnect_failed(pool: AsyncConnectionPool) -> None:
+    _LOGGER.error("Database pool %s could not reconnect; will keep retrying on demand", pool.name)
+
+
+async def _ensure_schema(pool: AsyncConnectionPool) -> None:
+    try:
+        async with pool.connection(timeout=settings.DB_POOL_TIMEOUT_SECONDS) as conn:
+            await ensure_schema(conn)
+    except Exception as exc:
+        # Digests are still stored without the normalized tables; see replace_normalized_rows.
+        _LOGGER.warning("Could not apply the database schema: %s", exc)
+
+
+async def get_pool() -> AsyncConnectionPool:
+    global _pool
+
+    if _pool is not None:
+        return _pool
+
+    async with _pool_lock:
+        if _pool is None:
+            if not settings.DATABASE_URL:
+                msg = "DATABASE_URL is not configured."
+                raise RuntimeError(msg)
+            pool = AsyncConnectionPool(
+                settings.DATABASE_URL,
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                kwargs={"row_factory": dict_row},
+                check=AsyncConnectionPool.check_connection,
+                max_idle=300,
+                reconnect_timeout=60,
+                reconnect_failed=_on_reconnect_failed,
+                name="startup_researcher",
+                open=False,
+            )
+            await pool.open(wait=True, timeout=settings.DB_POOL_TIMEOUT_SECONDS)
+            await _ensure_schema(pool)
+            _LOGGER.info(
+                "Opened database pool (min=%d, max=%d)",
+                settings.DB_POOL_MIN_SIZE,
+                settings.DB_POOL_MAX_SIZE,
+            )
+            _pool = pool
+    return _pool
+
+
+async def close_pool() -> None:
+    global _pool
+
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+
+
+def _publish_pool_stats(pool: AsyncConnectionPool) -> None:
+    stats = pool.get_stats()
+    size, available = stats.get("pool_size", 0), stats.get("pool_available", 0)
+    metrics.set_gauge("db_pool_connections", size - available, state="in_use")
+    metrics.set_gauge("db_pool_connections", available, state="idle")
+    metrics.set_gauge("db_pool_connections", stats.get("requests_waiting", 0), state="waiting")
+
+
+@asynccontextmanager
+async def connection() -> AsyncIterator[AsyncConnection]:
+    """Borrow a pooled connection, recording how long the caller waited for it."""
+
+    pool = await get_pool()
+    started = time.perf_counter()
+    async with pool.connection(timeout=settings.DB_POOL_TIMEOUT_SECONDS) as conn:
+        metrics.observe("db_pool_wait_seconds", time.perf_counter() - started)
+        _publish_pool_stats(pool)
+        yield conn
+
+
+__all__ = ["close_pool", "connection", "get_pool"]
@@ -0,0 +1,202 @@
+"""Paginated, index-backed reads over stored digests.
+
+Runs are paged newest first with keyset pagination on ``(created_at, id)``.
+``created_at`` is a run's first write and never changes (``updated_at`` follows
+the partial upserts), so a running job keeps its place between page fetches;
+companies are paged by ``(normalized_name, run_id, company_idx)``. Cursors are
+opaque strings returned in ``Page.next_cursor``. Run queries can filter with
+JSONB containment (served by the GIN index on ``data``) and project only the
+JSON paths a view needs instead of shipping the whole document.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+
+from psycopg import sql
+
+from src.db.pool import connection
+from src.metrics import timed
+from src.utils.digest_merge import normalize_company_name
+
+MAX_PAGE_SIZE = 200
+
+_PATH_SEGMENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$|^\d+$")
+
+
+@dataclass(slots=True)
+class Page:
+    items: list[dict[str, Any]] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> list[Any]:
+    """Decode ``cursor`` into one value per parser; malformed cursors raise ``ValueError``."""
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError
+        return [parse(value) for parse, value in zip(parsers, values, strict=True)]
+    except (TypeError, ValueError) as exc:
+        msg = f"Invalid cursor: {cursor!r}"
+        raise ValueError(msg) from exc
+
+
+def _page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _projection(fields: Optional[Sequence[str]]) -> sql.Composable:
+    """``data`` itself, or one column per dotted JSON path (e.g. ``summary``)."""
+
+    if not fields:
+        return sql.SQL("data")
+    columns = []
+    for path in fields:
+        segments = path.split(".")
+        if not all(_PATH_SEGMENT_RE.match(s) for s in segments):
+            msg = f"Invalid projection path: {path!r}"
+            raise ValueError(msg)
+        columns.append(
+            sql.SQL("data #> {} AS {}").format(sql.Literal(segments), sql.Identifier(path))
+        )
+    return sql.SQL(", ").join(columns)
+
+
+async def list_runs(
+    *,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    contains: Optional[dict[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+) -> Page:
+    """Page through digest runs, newest first (optionally only those created after ``since``).
+
+    ``contains`` is a JSONB containment filter on ``data``, e.g.
+    ``{"company_funding_digests": [{"company": {"name": "Acme"}}]}``.
+    """
+
+    size = _page_size(limit)
+    conditions: list[sql.Composable] = []
+    params: list[Any] = []
+    if cursor:
+        conditions.append(sql.SQL("(created_at, id) < (%s, %s)"))
+        params.extend(_decode_cursor(cursor, datetime.fromisoformat, int))
+    if contains:
+        conditions.append(sql.SQL("data @> %s::jsonb"))
+        params.append(json.dumps(contains))
+    if since:
+        conditions.append(sql.SQL("created_at >= %s"))
+        params.append(since)
+
+    where = sql.SQL("WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("")
+    query = sql.SQL(
+        "SELECT id, run_id, created_at, updated_at, {projection} FROM funding_digest_runs {where} "
+        "ORDER BY created_at DESC, id DESC LIMIT %s"
+    ).format(projection=_projection(fields), where=where)
+    params.append(size + 1)
+
+    with timed("db_read_seconds", op="list_runs"):
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(query, params)
+            rows = await cur.fetchall()
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = _encode_cursor([last["created_at"].isoformat(), last["id"]])
+    for row in rows:
+        row.pop("id", None)
+    return Page(items=rows, next_cursor=next_cursor)
+
+
+async def get_run(run_id: str, *, fields: Optional[Sequence[str]] = None) -> Optional[dict[str, Any]]:
+    query = sql.SQL(
+        "SELECT run_id, created_at, updated_at, {projection} FROM funding_digest_runs "
+        "WHERE run_id = %s"
+    ).format(projection=_projection(fields))
+    with timed("db_read_seconds", op="get_run"):
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(query, (run_id,))
+            return await cur.fetchone()
+
+
+async def list_companies(
+    *,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    round: Optional[str] = None,
+    lead_investor: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> Page:
+    """Page through companies across runs, ordered by normalised name.
+
+    ``round`` and ``lead_investor`` restrict to companies with a matching
+    funding event (e.g. all seed rounds led by a given investor).
+    """
+
+    size = _page_size(limit)
+    conditions: list[sql.Composable] = []
+    params: list[Any] = []
+    if cursor:
+        conditions.append(sql.SQL("(c.normalized_name, c.run_id, c.company_idx) > (%s, %s, %s)"))
+        params.extend(_decode_cursor(cursor, str, str, int))
+    if name_prefix:
+        conditions.append(sql.SQL("c.normalized_name LIKE %s"))
+        prefix = normalize_company_name(name_prefix).replace("\\", "\\\\")
+        params.append(prefix.replace("%", "\\%").replace("_", "\\_") + "%")
+    if run_id:
+        conditions.append(sql.SQL("c.run_id = %s"))
+        params.append(run_id)
+    if round or lead_investor:
+        event_conditions = [sql.SQL("e.run_id = c.run_id AND e.company_idx = c.company_idx")]
+        if round:
+            event_conditions.append(sql.SQL("e.round = %s"))
+            params.append(round)
+        if lead_investor:
+            event_conditions.append(sql.SQL("e.lead_investor_normalized = %s"))
+            params.append(normalize_company_name(lead_investor))
+        conditions.append(
+            sql.SQL("EXISTS (SELECT 1 FROM funding_events e WHERE {})").format(
+                sql.SQL(" AND ").join(event_conditions)
+            )
+        )
+
+    where = sql.SQL("WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("")
+    query = sql.SQL(
+        "SELECT c.run_id, c.company_idx, c.name, c.normalized_name, c.website, c.country, "
+        "c.industry, c.satisfies_search_criteria FROM companies c {where} "
+        "ORDER BY c.normalized_name, c.run_id, c.company_idx LIMIT %s"
+    ).format(where=where)
+    params.append(size + 1)
+
+    with timed("db_read_seconds", op="list_companies"):
+        async with connection() as conn, conn.cursor() as cur:
+            await cur.execute(query, params)
+            rows = await cur.fetchall()
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = _encode_cursor(
+            [last["normalized_name"], last["run_id"], last["company_idx"]]
+        )
+    return Page(items=rows, next_cursor=next_cursor)
+
+
+__all__ = ["Page", "get_run", "list_companies", "list_runs"]
@@ -0,0 +1,177 @@
+"""Per-run token, turn and wall-clock budget for the research flow.
+
+A ``RunBudget`` lives on the ``ResearchContext`` and is charged by
+``BudgetHooks`` after every model response of every agent in the run,
+including the research agent running as the manager's tool and the fan-out
+shards, since they all share the context object.
+
+- Soft limit (``soft_fraction`` of any limit): agents get an instruction to
+  stop researching and return their final answer, and the manager's research
+  tool is hidden.
+- Hard limit: the next model call raises ``BudgetExceeded``; the flow catches
+  it and returns the digests verified so far.
+
+Limits are only checked between model calls, so a tool call in flight when
+the wall-clock limit passes is allowed to finish.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from agents import Agent, AgentHooks, RunContextWrapper
+from agents.items import ModelResponse
+
+from src.metrics import metrics
+from src.setup import settings
+
+_LOGGER = logging.getLogger("startup_researcher.flows.budget")
+
+FINALIZE_NOTICE = """
+<budget>
+The research budget for this run is nearly spent. Do not start new searches or call tools.
+Return your final answer now, using only what you have already found.
+</budget>
+"""
+
+metrics.describe("budget_stops_total", "counter", "Runs stopped at a hard budget limit")
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised before a model call once the run's hard budget is spent."""
+
+
+@dataclass(slots=True)
+class RunBudget:
+    max_tokens: Optional[int] = None
+    max_turns: Optional[int] = None  # model calls across all agents
+    max_seconds: Optional[float] = None
+    soft_fraction: float = 0.8
+
+    tokens: int = 0
+    turns: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    soft_logged: bool = False
+    stopped: Optional[str] = None
+
+    @classmethod
+    def from_settings(cls) -> Optional[RunBudget]:
+        if not (settings.RUN_MAX_TOKENS or settings.RUN_MAX_TURNS or settings.RUN_MAX_SECONDS):
+            return None
+        return cls(
+            max_tokens=settings.RUN_MAX_TOKENS,
+            max_turns=settings.RUN_MAX_TURNS,
+            max_seconds=settings.RUN_MAX_SECONDS,
+            soft_fraction=settings.RUN_BUDGET_SOFT_FRACTION,
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def _usage(self) -> dict[str, float]:
+        """Fraction of each configured limit that is spent."""
+
+        usage: dict[str, float] = {}
+        if self.max_tokens:
+            usage["tokens"] = self.tokens / self.max_tokens
+        if self.max_turns:
+            usage["turns"] = self.turns / self.max_turns
+        if self.max_seconds:
+            usage["seconds"] = self.elapsed / self.max_seconds
+        return usage
+
+    @property
+    def soft_exceeded(self) -> bool:
+        exceeded = any(f >= self.soft_fraction for f in self._usage().values())
+        if exceeded and not self.soft_logged:
+            self.soft_logged = True
+            _LOGGER.warning("Run budget soft limit reached; asking agents to finalize: %s", self)
+        return exceeded
+
+    @property
+    def hard_exceeded(self) -> bool:
+        return any(f >= 1.0 for f in self._usage().values())
+
+    def charge(self, response: ModelResponse) -> None:
+        self.turns += 1
+        self.tokens += response.usage.input_tokens + response.usage.output_tokens
+
+    def check(self) -> None:
+        if self.stopped is None:
+            spent = [name for name, f in self._usage().items() if f >= 1.0]
+            if not spent:
+                return
+            self.stopped = ",".join(spent)
+            metrics.inc("budget_stops_total", reason=self.stopped)
+            _LOGGER.warning("Run budget hard limit reached (%s): %s", self.stopped, self)
+        msg = f"Run budget exhausted ({self.stopped})"
+        raise BudgetExceeded(msg)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "turns": self.turns,
+            "seconds": round(self.elapsed, 1),
+            "max_tokens": self.max_tokens,
+            "max_turns": self.max_turns,
+            "max_seconds": self.max_seconds,
+            "stopped": self.stopped,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"tokens={self.tokens}/{self.max_tokens} turns={self.turns}/{self.max_turns} "
+            f"seconds={self.elapsed:.0f}/{self.max_seconds}"
+        )
+
+
+def _budget(context: RunContextWrapper[Any]) -> Optional[RunBudget]:
+    return getattr(context.context, "budget", None)
+
+
+class BudgetHooks(AgentHooks[Any]):
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        budget = _budget(context)
+        if budget is not None:
+            budget.check()
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        budget = _budget(context)
+        if budget is not None:
+            budget.charge(response)
+
+
+def within_soft_budget(context: RunContextWrapper[Any], agent: Any) -> bool:
+    """``is_enabled`` predicate that hides a tool once the soft limit is reached."""
+
+    budget = _budget(context)
+    return budget is None or not budget.soft_exceeded
+
+
+def with_budget(agent: Agent) -> Agent:
+    """Clone ``agent`` so it charges the run budget and finalizes at the soft limit."""
+
+    base = agent.instructions
+    if not isinstance(base, str):
+        return agent.clone(hooks=BudgetHooks())
+
+    def _instructions(context: RunContextWrapper[Any], _agent: Agent) -> str:
+        budget = _budget(context)
+        if budget is not None and budget.soft_exceeded:
+            return base + FINALIZE_NOTICE
+        return base
+
+    return agent.clone(hooks=BudgetHooks(), instructions=_instructions)
+
+
+__all__ = [
+    "BudgetExceeded",
+    "BudgetHooks",
+    "RunBudget",
+    "with_budget",
+    "within_soft_budget",
+]
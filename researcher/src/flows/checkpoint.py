@@ -0,0 +1,92 @@
+"""Local checkpoints for long research runs.
+
+A ``RunCheckpoint`` records how far a run got: the phase it is in, the exact
+manager input, the conversation items generated so far (after each completed
+turn), and the partial and final outputs. Checkpoints are stored in the local
+SQLite store keyed by run id, so ``main`` can resume with ``resume=<run_id>``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+from src.setup import settings
+from src.types import CompanyFundingDigest, CompanyFundingSearchResults, SearchInput
+from src.utils.disk_cache import SQLiteCache
+
+logger = logging.getLogger("startup_researcher.checkpoint")
+
+RunPhase = Literal["start", "manager", "condense", "done"]
+
+
+class RunCheckpoint(BaseModel):
+    run_id: str
+    search: SearchInput
+    phase: RunPhase = "start"
+    agent_input: str = ""
+    items: list[dict[str, Any]] = Field(default_factory=list)
+    turns: int = 0
+    previous: list[CompanyFundingDigest] = Field(default_factory=list)
+    digests: list[CompanyFundingDigest] = Field(default_factory=list)
+    output: Optional[CompanyFundingSearchResults] = None
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def manager_input(self) -> str | list[dict[str, Any]]:
+        """The manager input to continue from: the original prompt plus completed turns."""
+
+        if not self.items:
+            return self.agent_input
+        return [{"role": "user", "content": self.agent_input}, *self.items]
+
+
+class CheckpointStore:
+    def __init__(self, store: SQLiteCache) -> None:
+        self._store = store
+
+    async def save(self, checkpoint: RunCheckpoint) -> None:
+        checkpoint.updated_at = datetime.now(timezone.utc)
+        await self._store.aset(checkpoint.run_id, checkpoint.model_dump_json().encode("utf-8"))
+        logger.debug(
+            "Checkpointed run %s phase=%s turns=%d",
+            checkpoint.run_id,
+            checkpoint.phase,
+            checkpoint.turns,
+        )
+
+    async def load(self, run_id: str) -> Optional[RunCheckpoint]:
+        raw = await self._store.aget(run_id)
+        if raw is None:
+            return None
+        try:
+            return RunCheckpoint.model_validate_json(raw)
+        except ValidationError as exc:
+            logger.warning("Checkpoint for run %s is unreadable: %s", run_id, exc)
+            return None
+
+    async def delete(self, run_id: str) -> None:
+        await self._store.adelete(run_id)
+
+
+_checkpoint_store: Optional[CheckpointStore] = None
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    global _checkpoint_store
+
+    if _checkpoint_store is None:
+        _checkpoint_store = CheckpointStore(
+            SQLiteCache(
+                os.path.join(settings.CACHE_DIR, "run_checkpoints.sqlite3"),
+                namespace="run_checkpoints",
+                ttl_seconds=settings.CHECKPOINT_TTL_SECONDS,
+            )
+        )
+    return _checkpoint_store
+
+
+__all__ = ["CheckpointStore", "RunCheckpoint", "get_checkpoint_store"]
@@ -0,0 +1,131 @@
+"""Parallel fan-out of the research agent over a partitioned search space.
+
+A ``SearchInput`` is split into independent shards (weeks of the reporting
+period, or groups of funding rounds) and one ``StartupFundingResearcher`` run
+is started per shard under a concurrency cap. Periods longer than
+``FANOUT_MAX_SHARDS`` weeks are split into that many longer slices instead.
+The shard outputs are merged before the manager agent summarizes them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from datetime import timedelta
+from typing import Any, Callable, Literal, Optional, Sequence
+
+from agents import Agent, Runner
+
+from src.setup import settings
+from src.types import CompanyFundingDigest, Criterion, SearchInput
+from src.utils.digest_merge import merge_digests
+
+logger = logging.getLogger("startup_researcher.fanout")
+
+FanoutStrategy = Literal["auto", "week", "round"]
+
+_ROUND_GROUPS: list[tuple[str, ...]] = [
+    ("pre-seed", "seed"),
+    ("series-a", "series-b"),
+    ("series-c", "series-d", "series-e", "series-f"),
+]
+
+
+def _with_criterion(search: SearchInput, description: str) -> SearchInput:
+    return search.model_copy(
+        update={"criteria": [*search.criteria, Criterion(description=description)]}
+    )
+
+
+def _partition_by_week(search: SearchInput, max_shards: int) -> list[SearchInput]:
+    assert search.period_start is not None and search.period_end is not None
+    days = (search.period_end - search.period_start).days + 1
+    shard_days = max(7, math.ceil(days / max(1, max_shards)))
+    if shard_days > 7:
+        logger.info(
+            "Splitting %d days into %d-day shards (at most %d)", days, shard_days, max_shards
+        )
+    shards: list[SearchInput] = []
+    start = search.period_start
+    while start <= search.period_end:
+        end = min(start + timedelta(days=shard_days - 1), search.period_end)
+        shard = _with_criterion(
+            search,
+            f"Only report funding announced between {start.isoformat()} and {end.isoformat()} "
+            "(inclusive); other research agents cover the rest of the period.",
+        )
+        shards.append(shard.model_copy(update={"period_start": start, "period_end": end}))
+        start = end + timedelta(days=1)
+    return shards
+
+
+def _partition_by_round(search: SearchInput) -> list[SearchInput]:
+    return [
+        _with_criterion(
+            search,
+            f"Only report {', '.join(group)} rounds; other research agents cover the other rounds.",
+        )
+        for group in _ROUND_GROUPS
+    ]
+
+
+def partition_search(
+    search: SearchInput,
+    strategy: FanoutStrategy = "auto",
+    max_shards: Optional[int] = None,
+) -> list[SearchInput]:
+    """Split ``search`` into independent shards.
+
+    ``auto`` shards by week when the reporting period is known and by funding
+    round otherwise. Week shards are widened so there are at most
+    ``max_shards`` (default: ``FANOUT_MAX_SHARDS``).
+    """
+
+    has_period = search.period_start is not None and search.period_end is not None
+    if strategy == "week" or (strategy == "auto" and has_period):
+        if not has_period:
+            logger.warning("Week fan-out requested without a reporting period; using rounds")
+            return _partition_by_round(search)
+        return _partition_by_week(search, max_shards or settings.FANOUT_MAX_SHARDS)
+    return _partition_by_round(search)
+
+
+async def run_fanout(
+    research_agent: Agent,
+    shards: Sequence[SearchInput],
+    *,
+    context: Any = None,
+    concurrency: int = 4,
+    max_turns: int = 30,
+    to_agent_input: Optional[Callable[[SearchInput], str]] = None,
+) -> list[CompanyFundingDigest]:
+    """Run ``research_agent`` once per shard (at most ``concurrency`` at a time) and merge."""
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run_shard(index: int, shard: SearchInput) -> list[CompanyFundingDigest]:
+        agent_input = to_agent_input(shard) if to_agent_input else shard.model_dump_json()
+        async with semaphore:
+            logger.info("Fan-out shard %d/%d started", index + 1, len(shards))
+            try:
+                result = await Runner.run(
+                    starting_agent=research_agent,
+                    input=agent_input,
+                    context=context,
+                    max_turns=max_turns,
+                )
+            except Exception as exc:
+                logger.warning("Fan-out shard %d/%d failed: %s", index + 1, len(shards), exc)
+                return []
+        digests = list(result.final_output or [])
+        logger.info(
+            "Fan-out shard %d/%d finished with %d digest(s)", index + 1, len(shards), len(digests)
+        )
+        return digests
+
+    results = await asyncio.gather(*(_run_shard(i, s) for i, s in enumerate(shards)))
+    return merge_digests([d for shard_digests in results for d in shard_digests])
+
+
+__all__ = ["FanoutStrategy", "partition_search", "run_fanout"]
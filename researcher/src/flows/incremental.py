@@ -0,0 +1,97 @@
+"""Incremental (delta) runs that build on earlier digests.
+
+Recent complete runs of the same search (same ``search_key``: query and
+criteria) are loaded from ``funding_digest_runs`` and merged. The funding
+events they already verified for the reporting period are given to the
+agents as a compact exclusion list, and new findings are merged back into
+the previous digest. Partial, budget-stopped and unrelated runs are ignored.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from pydantic import ValidationError
+
+from src.db.digests import search_key
+from src.db.reads import list_runs
+from src.types import CompanyFundingDigest, SearchInput
+from src.utils.digest_merge import merge_digests
+
+logger = logging.getLogger("startup_researcher.incremental")
+
+# Keep the exclusion list compact; beyond this the prompt cost outweighs the savings.
+MAX_EXCLUSIONS = 300
+
+
+def _in_period(search: SearchInput, digest: CompanyFundingDigest) -> CompanyFundingDigest | None:
+    if search.period_start is None or search.period_end is None:
+        return digest
+    events = [
+        e
+        for e in digest.funding_events
+        if search.period_start <= e.announced_date <= search.period_end
+    ]
+    if not events:
+        return None
+    return digest.model_copy(update={"funding_events": events})
+
+
+async def load_previous_digests(
+    search: SearchInput, *, lookback_days: int = 45, max_runs: int = 10
+) -> list[CompanyFundingDigest]:
+    """Merged digests from recent runs of ``search``, restricted to its reporting period."""
+
+    since = datetime.now(timezone.utc) - timedelta(days=lookback_days)
+    page = await list_runs(
+        limit=max_runs,
+        since=since,
+        contains={"run": {"status": "complete", "search_key": search_key(search)}},
+        fields=["company_funding_digests"],
+    )
+    if not page.items:
+        logger.info("No previous complete run of this search; researching from scratch")
+        return []
+
+    digests: list[CompanyFundingDigest] = []
+    # Oldest run first so the newest run's fields win ties inside merge_digests.
+    for run in reversed(page.items):
+        for raw in run.get("company_funding_digests") or []:
+            try:
+                digest = _in_period(search, CompanyFundingDigest.model_validate(raw))
+            except ValidationError as exc:
+                logger.debug("Skipping invalid stored digest in run %s: %s", run["run_id"], exc)
+                continue
+            if digest is not None:
+                digests.append(digest)
+
+    merged = merge_digests(digests)
+    logger.info("Loaded %d known companies from %d previous run(s)", len(merged), len(page.items))
+    return merged
+
+
+def exclusion_list(digests: list[CompanyFundingDigest]) -> str:
+    """One ``company | round | date`` line per already-verified funding event."""
+
+    lines = [
+        f"{d.company.name} | {e.round} | {e.announced_date.isoformat()}"
+        for d in digests
+        for e in d.funding_events
+    ]
+    return "\n".join(lines[:MAX_EXCLUSIONS])
+
+
+def with_exclusions(agent_input: str, digests: list[CompanyFundingDigest]) -> str:
+    if not digests:
+        return agent_input
+    return f"""{agent_input}
+<already_known>
+{exclusion_list(digests)}
+</already_known>
+The funding events above (company | round | date) are already verified in earlier digests.
+Do not research them again; only report companies or rounds that are not on this list.
+"""
+
+
+__all__ = ["exclusion_list", "load_previous_digests", "with_exclusions"]
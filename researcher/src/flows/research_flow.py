@@ -1,20 +1,33 @@
 from __future__ import annotations
 
+import contextlib
+import json
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional, Sequence
 
-from agents import Runner
+from agents import Agent, Runner
+from agents.mcp import MCPServer
+from agents.result import RunResultStreaming
+from pydantic import BaseModel, TypeAdapter, ValidationError
 import logging
 
+from src.db.digests import RunStatus
+from src.flows.budget import BudgetExceeded, RunBudget
+from src.flows.checkpoint import RunCheckpoint, get_checkpoint_store
+from src.flows.fanout import FanoutStrategy, partition_search, run_fanout
+from src.flows.incremental import load_previous_digests, with_exclusions
 from src.oagents import get_agents
-from src.mcp import mcp_registry
-from src.types import SearchInput
+from src.mcp import get_tool_call_cache, mcp_registry
+from src.metrics import timed_phase
+from src.types import CompanyFundingDigest, CompanyFundingSearchResults, SearchInput
+from src.utils.digest_merge import merge_digests
 
 
 @dataclass(slots=True)
 class ResearchContext:
     search: SearchInput
     metadata: dict[str, Any] = field(default_factory=dict)
+    budget: Optional[RunBudget] = None
 
 
 def _search_to_agent_input(search: SearchInput) -> str:
@@ -24,65 +37,307 @@ def _search_to_agent_input(search: SearchInput) -> str:
     return f"{search.query}\n{criteria_string}"
 
 
+def _with_prior_findings(agent_input: str, digests: list[CompanyFundingDigest]) -> str:
+    findings = json.dumps([d.model_dump(mode="json") for d in digests], ensure_ascii=False)
+    return f"""{agent_input}
+<prior_findings>
+{findings}
+</prior_findings>
+The findings above were gathered by parallel research agents over disjoint slices of the search.
+Use them as your starting point; only call the research agent to fill gaps or verify doubtful entries.
+"""
+
+
+_MANAGER_MAX_TURNS = 50
+_MIN_RESUME_TURNS = 10
+
+PartialResultsCallback = Callable[[CompanyFundingSearchResults], Awaitable[None]]
+
+PARTIAL_SUMMARY = "Research in progress; the summary is written once all companies are verified."
+BUDGET_SUMMARY = "Research stopped at the run budget; these are the companies verified so far."
+
+_DIGESTS_ADAPTER: TypeAdapter[list[CompanyFundingDigest]] = TypeAdapter(list[CompanyFundingDigest])
+
+
+def result_status(result: CompanyFundingSearchResults | str) -> RunStatus:
+    """How far the run that produced ``result`` got, for ``insert_digest``."""
+
+    summary = getattr(result, "summary", None)
+    if summary == PARTIAL_SUMMARY:
+        return "partial"
+    if summary == BUDGET_SUMMARY:
+        return "stopped"
+    return "complete"
+
+
+def _partial_results(
+    digests: list[CompanyFundingDigest], summary: str = PARTIAL_SUMMARY
+) -> CompanyFundingSearchResults:
+    return CompanyFundingSearchResults(company_funding_digests=digests, summary=summary)
+
+
+def _digests_from_tool_output(output: Any) -> list[CompanyFundingDigest]:
+    """Validate a research agent tool result; anything else yields no digests.
+
+    ``Agent.as_tool`` returns the research agent's final message, in which the
+    SDK wraps non-model output types as ``{"response": [...]}``.
+    """
+
+    try:
+        if isinstance(output, str):
+            output = json.loads(output)
+        if isinstance(output, dict):
+            output = output.get("response")
+        if isinstance(output, list):
+            return _DIGESTS_ADAPTER.validate_python(
+                [d.model_dump() if isinstance(d, BaseModel) else d for d in output]
+            )
+    except (ValueError, ValidationError):
+        pass
+    return []
+
+
+def _pending_tool_calls(items: list[dict[str, Any]]) -> bool:
+    calls = {i.get("call_id") for i in items if i.get("type") == "function_call"}
+    outputs = {i.get("call_id") for i in items if i.get("type") == "function_call_output"}
+    return bool(calls - outputs)
+
+
+async def _run_manager_streamed(
+    manager_agent: Agent,
+    context: ResearchContext,
+    checkpoint: RunCheckpoint,
+    on_partial: Optional[PartialResultsCallback],
+    save_checkpoint: Callable[[], Awaitable[None]],
+) -> RunResultStreaming:
+    """Run the manager streamed, checkpointing after every completed turn.
+
+    Starts from ``checkpoint.manager_input()``, so a resumed run continues after
+    the last turn whose tool calls all returned.
+    """
+
+    logger = logging.getLogger("startup_researcher.research_flow")
+    result = Runner.run_streamed(
+        starting_agent=manager_agent,
+        input=checkpoint.manager_input(),  # type: ignore[arg-type]
+        context=context,
+        max_turns=max(_MIN_RESUME_TURNS, _MANAGER_MAX_TURNS - checkpoint.turns),
+    )
+    async for event in result.stream_events():
+        if event.type != "run_item_stream_event":
+            continue
+        checkpoint.items.append(event.item.to_input_item())  # type: ignore[arg-type]
+        if event.name != "tool_output":
+            continue
+
+        digests = _digests_from_tool_output(getattr(event.item, "output", None))
+        if digests:
+            checkpoint.digests = merge_digests([*checkpoint.digests, *digests])
+            logger.info(
+                "Streaming %d new digest(s), %d total", len(digests), len(checkpoint.digests)
+            )
+            if on_partial is not None:
+                await on_partial(_partial_results(list(checkpoint.digests)))
+
+        if not _pending_tool_calls(checkpoint.items):
+            checkpoint.turns += 1
+            await save_checkpoint()
+    return result
+
+
+def _merge_results(
+    results: CompanyFundingSearchResults,
+    previous: Sequence[CompanyFundingDigest] = (),
+) -> CompanyFundingSearchResults:
+    """Deterministically collapse duplicate companies before anything downstream sees them.
+
+    ``previous`` digests (incremental runs) are merged in first, so new findings
+    extend rather than replace what earlier runs already verified.
+    """
+
+    if not results:
+        return results
+    merged = merge_digests([*previous, *results.company_funding_digests])
+    return results.model_copy(update={"company_funding_digests": merged})
+
+
 async def run_research_flow(
     search: SearchInput,
     other_research: Optional[str] = None,
-) -> str:
+    mcp_servers: Optional[Sequence[MCPServer]] = None,
+    fanout: Optional[FanoutStrategy] = None,
+    fanout_concurrency: int = 4,
+    on_partial: Optional[PartialResultsCallback] = None,
+    incremental: bool = False,
+    run_id: Optional[str] = None,
+    resume: Optional[RunCheckpoint] = None,
+    budget: Optional[RunBudget] = None,
+) -> CompanyFundingSearchResults | str:
     """
     Responsible for the research flow primarily via the manager agent,
     if the user has provided additional context, we also feed this and
     triangulate different knowledge sources
+
+    MCP sessions are leased from the pooled ``mcp_registry`` and stay open
+    after the run; pass ``mcp_servers`` to use an explicit set instead.
+
+    With ``fanout`` the search is first split into shards that are researched
+    concurrently; the manager then starts from the merged findings.
+
+    With ``on_partial`` the manager runs streamed and the callback receives the
+    merged digests found so far each time the research agent returns, so they
+    can be persisted long before the final summary exists.
+
+    With ``incremental`` the funding events already stored by recent runs for
+    the same period are excluded from the research and merged into the result.
+
+    With ``run_id`` the run is checkpointed locally after every phase and every
+    completed manager turn; pass the loaded checkpoint as ``resume`` to continue
+    a crashed run from where it stopped.
+
+    ``budget`` (default: from the ``RUN_MAX_*`` settings) caps tokens, model
+    calls and wall-clock time across all agents. At its soft limit the agents
+    are told to finalize; at the hard limit the run stops and returns the
+    digests verified so far, skipping the condense step.
     """
 
     logger = logging.getLogger("startup_researcher.research_flow")
-    context = ResearchContext(search=search)
+    checkpoint = resume or RunCheckpoint(run_id=run_id or "", search=search)
+    search = checkpoint.search
+    context = ResearchContext(search=search, budget=budget or RunBudget.from_settings())
+    checkpoints = get_checkpoint_store() if checkpoint.run_id else None
 
-    agent_input = _search_to_agent_input(search)
-    logger.debug("Agent input generated (len=%d)", len(agent_input))
+    async def _save_checkpoint() -> None:
+        if checkpoints is not None:
+            await checkpoints.save(checkpoint)
 
-    logger.info("Connecting enabled MCP servers via registry ...")
+    if resume is not None:
+        logger.info(
+            "Resuming run %s from phase=%s after %d manager turn(s)",
+            resume.run_id,
+            resume.phase,
+            resume.turns,
+        )
+    if checkpoint.phase == "done" and checkpoint.output is not None:
+        return checkpoint.output
 
-    await mcp_registry.connect_enabled()
-    mcp_servers = list(mcp_registry.get_available_servers())
-    logger.info(
-        "MCP servers available: %s",
-        ", ".join(getattr(s, "name", "?") for s in mcp_servers) or "none",
-    )
+    async with contextlib.AsyncExitStack() as stack:
+        if mcp_servers is None:
+            logger.info("Leasing MCP servers from registry ...")
+            with timed_phase("mcp_lease"):
+                mcp_servers = await stack.enter_async_context(mcp_registry.lease())
+        mcp_servers = list(mcp_servers)
+        logger.info(
+            "MCP servers available: %s",
+            ", ".join(getattr(s, "name", "?") for s in mcp_servers) or "none",
+        )
 
-    try:
         logger.info("Running agent with %d MCP server(s)", len(mcp_servers))
 
-        _, manager_agent, condense_agent = get_agents(mcp_servers=mcp_servers)
+        research_agent, manager_agent, condense_agent = get_agents(mcp_servers=mcp_servers)
 
-        response = await Runner.run(
-            starting_agent=manager_agent,
-            input=agent_input,
-            context=context,
-            max_turns=50,
-        )
+        if checkpoint.phase == "start":
+            if incremental:
+                with timed_phase("incremental"):
+                    checkpoint.previous = await load_previous_digests(search)
+                context.metadata["previous_digests"] = len(checkpoint.previous)
+
+            def _to_agent_input(s: SearchInput) -> str:
+                return with_exclusions(_search_to_agent_input(s), checkpoint.previous)
+
+            agent_input = _to_agent_input(search)
+            checkpoint.digests = list(checkpoint.previous)
+
+            if fanout:
+                shards = partition_search(search, fanout)
+                logger.info("Fanning out research over %d shard(s) (%s)", len(shards), fanout)
+                with timed_phase("fanout"):
+                    digests = await run_fanout(
+                        research_agent,
+                        shards,
+                        context=context,
+                        concurrency=fanout_concurrency,
+                        to_agent_input=_to_agent_input,
+                    )
+                context.metadata["fanout_digests"] = len(digests)
+                agent_input = _with_prior_findings(agent_input, digests)
+                checkpoint.digests = merge_digests([*checkpoint.digests, *digests])
+
+            logger.debug("Agent input generated (len=%d)", len(agent_input))
+            checkpoint.agent_input = agent_input
+            checkpoint.phase = "manager"
+            await _save_checkpoint()
+
+        if checkpoint.phase == "manager":
+            # The streamed path collects digests as they arrive, which a budget stop returns.
+            streamed = (
+                on_partial is not None or checkpoints is not None or context.budget is not None
+            )
+            try:
+                with timed_phase("manager"):
+                    if not streamed:
+                        response = await Runner.run(
+                            starting_agent=manager_agent,
+                            input=checkpoint.agent_input,
+                            context=context,
+                            max_turns=_MANAGER_MAX_TURNS,
+                        )
+                    else:
+                        if on_partial is not None and checkpoint.digests:
+                            await on_partial(_partial_results(list(checkpoint.digests)))
+                        response = await _run_manager_streamed(
+                            manager_agent, context, checkpoint, on_partial, _save_checkpoint
+                        )
+                final_output = response.final_output
+            except BudgetExceeded as exc:
+                logger.warning("%s during the manager phase; returning partial results", exc)
+                final_output = _partial_results(list(checkpoint.digests), BUDGET_SUMMARY)
+
+            checkpoint.output = _merge_results(final_output, checkpoint.previous)
+            checkpoint.phase = "condense"
+            await _save_checkpoint()
 
-        if other_research:
+        output = checkpoint.output
+
+        budget_spent = context.budget is not None and context.budget.stopped is not None
+        if other_research and output and not budget_spent:
+            # The other research is the same for every run, so it goes first and
+            # stays in the cached prompt prefix.
             response_str = f"""
-            <present research>
-            {response.final_output.model_dump_json()}
-            </present_research>
             <other_research>
             {other_research}
             </other_research>
+            <present_research>
+            {output.model_dump_json(exclude_none=True)}
+            </present_research>
             """
-            response = await Runner.run(
-                starting_agent=condense_agent,
-                input=response_str,
-                context=context,
-                max_turns=10,
-            )
+            try:
+                with timed_phase("condense"):
+                    response = await Runner.run(
+                        starting_agent=condense_agent,
+                        input=response_str,
+                        context=context,
+                        max_turns=10,
+                    )
+                output = _merge_results(response.final_output)
+            except BudgetExceeded as exc:
+                logger.warning("%s during the condense phase; keeping the manager output", exc)
+
+        checkpoint.output = output
+        checkpoint.phase = "done"
+        await _save_checkpoint()
 
         logger.debug("Agent run completed")
-    finally:
-        await mcp_registry.cleanup_all()
 
-    output = response.final_output or ""
-    return output
+    if context.budget is not None:
+        context.metadata["budget"] = context.budget.summary()
+        logger.info("Run budget: %s", context.budget)
+
+    tool_call_cache = get_tool_call_cache()
+    if tool_call_cache is not None:
+        logger.info("MCP tool call cache: %s", tool_call_cache.stats())
+
+    return output or ""
 
 
-__all__ = ["run_research_flow", "ResearchContext"]
+__all__ = ["run_research_flow", "ResearchContext", "PartialResultsCallback", "RunCheckpoint"]
@@ -3,47 +3,159 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import uuid
+from typing import TYPE_CHECKING, Awaitable, Optional, Sequence, TypeVar
 
 import chz
-from braintrust import init_logger
-from braintrust.wrappers.openai import BraintrustTracingProcessor
-from agents import set_trace_processors
-
-from src.setup import settings
-from src.flows.research_flow import run_research_flow
-from src.oagents.input_parser import parse_input
-from src.types import SearchInput
-from src.db.digests import insert_digest
+
 from src.logging_config import configure_logging
+from src.metrics import (
+    bind_run,
+    metrics,
+    prompt_cache_hit_rate,
+    serve_metrics,
+    timed_phase,
+    write_metrics_file,
+)
 
-_LOGGER = logging.getLogger("startup_researcher.main")
+if TYPE_CHECKING:
+    from agents.mcp import MCPServer
 
+    from src.flows.fanout import FanoutStrategy
 
-@chz.chz
-class UserInput:
-    q: str = chz.field(default="Hey. retrieve all danish startups getting funding in August 2025.")
+# The agents SDK, Braintrust, the MCP registry and the database layer take
+# seconds to import, so they are imported where they are used. ``--help`` and
+# processes that only need ``run_query``'s signature start in milliseconds.
 
+_LOGGER = logging.getLogger("startup_researcher.main")
 
-os.environ["BRAINTRUST_API_KEY"] = settings.BRAINTRUST_API_KEY
+T = TypeVar("T")
 
-set_trace_processors([BraintrustTracingProcessor(init_logger(settings.BRAINTRUST_PROJECT_NAME))])
 
+DEFAULT_QUERY = "Hey. retrieve all danish startups getting funding in August 2025."
 
-async def _async_main(q: str) -> None:
-    configure_logging()
-    _LOGGER.info("Parsing input")
-    _LOGGER.info(f"User input: {q}")
-    search_input: SearchInput = parse_input(q)
-    _LOGGER.info(f"Parsed input: {search_input}")
-    _LOGGER.info(f"Max count: {search_input.max_count}")
-    _LOGGER.info("Starting research flow")
 
-    with open("data/reports/oai_deep_research.md", "r") as f:
-        oai_deep_research = f.read()
+@chz.chz
+class UserInput:
+    q: Optional[str] = chz.field(
+        default=None,
+        doc=f"Query (default: {DEFAULT_QUERY!r}); with resume, must match the checkpointed one",
+    )
+    fanout: Optional[str] = chz.field(default=None, doc="Fan-out strategy: auto, week or round")
+    fanout_concurrency: int = chz.field(default=4)
+    incremental: bool = chz.field(default=False, doc="Skip funding already stored by recent runs")
+    resume: Optional[str] = chz.field(default=None, doc="Run id of a checkpointed run to resume")
+    stream: bool = chz.field(default=True, doc="Persist digests as soon as they are found")
+
+
+def setup_tracing() -> None:
+    """Export agent traces to Braintrust; call once per process before the first run."""
+
+    from agents import set_trace_processors
+    from braintrust import init_logger
+    from braintrust.wrappers.openai import BraintrustTracingProcessor
+
+    from src.setup import settings
+
+    os.environ["BRAINTRUST_API_KEY"] = settings.BRAINTRUST_API_KEY
+    set_trace_processors(
+        [BraintrustTracingProcessor(init_logger(settings.BRAINTRUST_PROJECT_NAME))]
+    )
+
+
+async def _in_phase(phase: str, awaitable: Awaitable[T]) -> T:
+    with timed_phase(phase):
+        return await awaitable
+
+
+def load_other_research(path: str = "data/reports/oai_deep_research.md") -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+
+async def run_query(
+    q: Optional[str],
+    *,
+    other_research: Optional[str] = None,
+    mcp_servers: Optional[Sequence[MCPServer]] = None,
+    fanout: Optional[FanoutStrategy] = None,
+    fanout_concurrency: int = 4,
+    stream: bool = True,
+    incremental: bool = False,
+    resume: Optional[str] = None,
+) -> str:
+    """Parse, research and persist a single query; returns the stored run id.
+
+    With ``stream`` partial digests are upserted under the run id while the
+    research is still going, and replaced by the final result at the end.
+    With ``resume`` the checkpointed run continues; a ``q`` given alongside must
+    be the same search, so a run id cannot resume some other query's checkpoint.
+    The checkpoint is deleted once the run's result is stored.
+    """
+
+    from src.db import insert_digest, search_key
+    from src.flows.checkpoint import RunCheckpoint, get_checkpoint_store
+    from src.flows.research_flow import result_status, run_research_flow
+    from src.mcp import mcp_registry
+    from src.oagents.input_parser import parse_input
+    from src.types import CompanyFundingSearchResults
+
+    run_id = resume or str(uuid.uuid4())
+    with bind_run(run_id):
+        checkpoint: Optional[RunCheckpoint] = None
+        if resume:
+            checkpoint = await get_checkpoint_store().load(resume)
+            if checkpoint is None:
+                msg = f"No checkpoint found for run_id={resume}"
+                raise ValueError(msg)
+            search_input = checkpoint.search
+            if q:
+                parsed = await _in_phase("parse", parse_input(q))
+                if search_key(parsed) != search_key(search_input):
+                    msg = f"Checkpoint run_id={resume} is for another query: {search_input.query!r}"
+                    raise ValueError(msg)
+        else:
+            q = q or DEFAULT_QUERY
+            _LOGGER.info("Parsing input")
+            _LOGGER.info(f"User input: {q}")
+            if mcp_servers is None:
+                # Parse while the pooled MCP sessions connect (a no-op once they are warm).
+                search_input, _ = await asyncio.gather(
+                    _in_phase("parse", parse_input(q)),
+                    _in_phase("mcp_connect", mcp_registry.connect_enabled()),
+                )
+            else:
+                search_input = await _in_phase("parse", parse_input(q))
+        _LOGGER.info(f"Parsed input: {search_input}")
+        _LOGGER.info(f"Max count: {search_input.max_count}")
+        _LOGGER.info("Starting research flow run_id=%s", run_id)
+
+        async def _persist_partial(partial: CompanyFundingSearchResults) -> None:
+            try:
+                await insert_digest(partial, run_id=run_id, search=search_input, status="partial")
+            except Exception as exc:
+                # Partial results are best effort; the final insert still runs.
+                _LOGGER.warning(
+                    "Failed to persist partial results for run_id=%s: %s", run_id, exc
+                )
 
-    try:
         _LOGGER.info("Running research flow")
-        result = await run_research_flow(search_input, other_research=oai_deep_research)
+        try:
+            with timed_phase("research"):
+                result = await run_research_flow(
+                    search_input,
+                    other_research=other_research,
+                    mcp_servers=mcp_servers,
+                    fanout=fanout,
+                    fanout_concurrency=fanout_concurrency,
+                    on_partial=_persist_partial if stream else None,
+                    incremental=incremental,
+                    run_id=run_id,
+                    resume=checkpoint,
+                )
+        except Exception:
+            _LOGGER.error("Research run %s failed; resume it with resume=%s", run_id, run_id)
+            raise
         if not result or (isinstance(result, str) and result.strip() == ""):
             _LOGGER.warning("Research flow returned empty output")
         else:
@@ -58,22 +170,73 @@ async def _async_main(q: str) -> None:
         else:
             _LOGGER.info("Research flow output type=%s", type(result))
             _LOGGER.debug("Research flow output repr=%r", result)
-    except Exception as exc:
-        _LOGGER.exception("Research flow failed: %s", exc)
-        raise SystemExit(1) from exc
 
-    _LOGGER.info("Persisting research output to database")
+        _LOGGER.info("Persisting research output to database")
+        try:
+            with timed_phase("persist"):
+                run_id = await insert_digest(
+                    result, run_id=run_id, search=search_input, status=result_status(result)
+                )
+        except Exception as exc:
+            _LOGGER.exception("Failed to persist research output: %s", exc)
+            raise
+        _LOGGER.info("Saved research output with run_id=%s", run_id)
+        # The stored result supersedes the checkpoint; a later resume of this id must not reuse it.
+        await get_checkpoint_store().delete(run_id)
+        _LOGGER.info(
+            "Token usage run_id=%s input=%d (%.0f%% from prompt cache) output=%d reasoning=%d",
+            run_id,
+            metrics.counter_value("lm_input_tokens_total", run_id=run_id),
+            100 * prompt_cache_hit_rate(run_id=run_id),
+            metrics.counter_value("lm_output_tokens_total", run_id=run_id),
+            metrics.counter_value("lm_reasoning_tokens_total", run_id=run_id),
+        )
+        return run_id
+
+
+async def _async_main(user_input: UserInput) -> None:
+    from src.db import close_pool
+    from src.mcp import mcp_registry
+    from src.mem.tokens import warm_tokenizers
+    from src.models.model_register import model_registry
+    from src.setup import settings
+    from src.utils.cassette import close_cassette, get_cassette
+
+    configure_logging()
+    warm = asyncio.create_task(asyncio.to_thread(warm_tokenizers))
+    oai_deep_research = load_other_research()
+    cassette = get_cassette()
+    if cassette is not None:
+        cassette.meta.setdefault("q", user_input.q or DEFAULT_QUERY)
+    if settings.METRICS_PORT:
+        serve_metrics(settings.METRICS_PORT)
 
     try:
-        run_id = await insert_digest(result)
-        _LOGGER.info("Saved research output with run_id=%s", run_id)
+        await run_query(
+            user_input.q,
+            other_research=oai_deep_research,
+            fanout=user_input.fanout,  # type: ignore[arg-type]
+            fanout_concurrency=user_input.fanout_concurrency,
+            stream=user_input.stream,
+            incremental=user_input.incremental,
+            resume=user_input.resume,
+        )
     except Exception as exc:
-        _LOGGER.exception("Failed to persist research output: %s", exc)
-        raise
+        _LOGGER.exception("Research run failed: %s", exc)
+        raise SystemExit(1) from exc
+    finally:
+        await mcp_registry.cleanup_all()
+        await close_pool()
+        await model_registry.aclose()
+        close_cassette()
+        if settings.METRICS_FILE:
+            write_metrics_file(settings.METRICS_FILE)
+        await warm
 
 
 def main(user_input: UserInput) -> None:
-    asyncio.run(_async_main(user_input.q))
+    setup_tracing()
+    asyncio.run(_async_main(user_input))
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+from .cache import get_tool_call_cache
 from .general import mcp_registry
 
-__all__ = ["mcp_registry"]
+__all__ = ["mcp_registry", "get_tool_call_cache"]
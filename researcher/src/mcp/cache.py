@@ -0,0 +1,174 @@
+"""Persistent cache for MCP ``call_tool`` results.
+
+Calls are keyed on server, tool name, normalised arguments and the server's
+tool catalog fingerprint (so results are refetched once the tools change),
+stored in a local SQLite file with a TTL and LRU size limits, and identical
+calls that are in flight at the same time share a single request to the remote
+server.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+from mcp.types import CallToolResult
+
+from src.setup import settings
+from src.utils.disk_cache import SQLiteCache
+
+logger = logging.getLogger("startup_researcher.mcp.cache")
+
+# Argument names whose values are compared case-insensitively (search queries).
+_CASE_INSENSITIVE_ARGS = frozenset({"query"})
+
+
+def _normalize(value: Any, key: Optional[str] = None) -> Any:
+    if isinstance(value, str):
+        text = " ".join(value.split())
+        return text.casefold() if key in _CASE_INSENSITIVE_ARGS else text
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _normalize(v, k) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, key) for v in value]
+    return value
+
+
+def make_tool_call_key(
+    server_name: str,
+    tool_name: str,
+    arguments: dict[str, Any] | None,
+    catalog: Optional[str] = None,
+) -> str:
+    parts = [server_name, tool_name, _normalize(arguments or {})]
+    if catalog:
+        parts.append(catalog)
+    payload = json.dumps(
+        parts,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolCallCache:
+    """Content-addressed ``call_tool`` cache with in-flight request coalescing."""
+
+    def __init__(self, store: SQLiteCache) -> None:
+        self._store = store
+        self._inflight: dict[str, asyncio.Future[CallToolResult]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.uncached_errors = 0
+
+    async def call(
+        self,
+        server_name: str,
+        tool_name: str,
+        arguments: dict[str, Any] | None,
+        fetch: Callable[[], Awaitable[CallToolResult]],
+        *,
+        catalog: Optional[str] = None,
+    ) -> CallToolResult:
+        """Return the cached result of the call, or ``fetch()`` it and cache it unless an error.
+
+        ``catalog`` is the fingerprint of the server's tool list when the call was made.
+        """
+
+        key = make_tool_call_key(server_name, tool_name, arguments, catalog)
+
+        while (pending := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            logger.debug("MCP cache coalesced: %s.%s", server_name, tool_name)
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                return pending.result()
+            # The leading call was cancelled; retry (possibly becoming the leader).
+
+        future: asyncio.Future[CallToolResult] = asyncio.get_running_loop().create_future()
+        # Mark the exception retrieved even when nobody else is waiting on it.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await self._lookup_or_fetch(key, server_name, tool_name, fetch)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _lookup_or_fetch(
+        self,
+        key: str,
+        server_name: str,
+        tool_name: str,
+        fetch: Callable[[], Awaitable[CallToolResult]],
+    ) -> CallToolResult:
+        cached = await self._store.aget(key)
+        if cached is not None:
+            try:
+                result = CallToolResult.model_validate_json(cached)
+            except Exception as exc:
+                logger.warning("MCP cache entry unreadable, refetching: %s", exc)
+            else:
+                self.hits += 1
+                logger.debug("MCP cache hit: %s.%s", server_name, tool_name)
+                return result
+
+        self.misses += 1
+        result = await fetch()
+        if result.isError:
+            self.uncached_errors += 1
+            return result
+        await self._store.aset(key, result.model_dump_json(by_alias=True).encode("utf-8"))
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "uncached_errors": self.uncached_errors,
+            "evictions": self._store.evictions,
+        }
+
+
+_tool_call_cache: Optional[ToolCallCache] = None
+
+
+def get_tool_call_cache() -> Optional[ToolCallCache]:
+    """Return the process-wide tool call cache, or None when disabled."""
+
+    global _tool_call_cache
+
+    if not settings.ENABLE_MCP_CACHE:
+        return None
+    if _tool_call_cache is None:
+        _tool_call_cache = ToolCallCache(
+            SQLiteCache(
+                os.path.join(settings.CACHE_DIR, "mcp_tool_calls.sqlite3"),
+                namespace="mcp_call_tool",
+                ttl_seconds=settings.MCP_CACHE_TTL_SECONDS,
+                max_entries=settings.MCP_CACHE_MAX_ENTRIES,
+                max_bytes=settings.MCP_CACHE_MAX_BYTES,
+            )
+        )
+    return _tool_call_cache
+
+
+__all__ = ["ToolCallCache", "get_tool_call_cache", "make_tool_call_key"]
@@ -1,5 +1,10 @@
-from dataclasses import dataclass
-from typing import Sequence
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional, Sequence
 
 from agents.mcp import (
     MCPServerSse,
@@ -7,28 +12,107 @@ from agents.mcp import (
     MCPServerStreamableHttp,
     MCPServerStreamableHttpParams,
 )
+from mcp.types import CallToolResult, Tool
+
+from src.metrics import metrics, timed
+from src.mcp.cache import ToolCallCache, get_tool_call_cache, make_tool_call_key
 from src.setup import settings
+from src.utils.cassette import get_cassette
 import logging
 
 
 logger = logging.getLogger("startup_researcher.mcp")
 
 
-class ConstrainedMCPServerSse(MCPServerSse):
+class _CachedToolCallsMixin:
+    """Route ``call_tool`` through the shared on-disk tool call cache when set.
+
+    With an active cassette, ``list_tools`` and ``call_tool`` are also recorded
+    or replayed; a replaying server never opens a connection.
+    """
+
+    tool_call_cache: Optional[ToolCallCache] = None
+    # Set by the registry from list_tools; part of the cache key.
+    tools_fingerprint: Optional[str] = None
+
+    async def connect(self):
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            return
+        await super().connect()  # type: ignore[misc]
+
+    async def list_tools(self, *args, **kwargs):
+        fetch = super().list_tools  # type: ignore[misc]
+        cassette = get_cassette()
+        if cassette is None:
+            return await fetch(*args, **kwargs)
+        return await cassette.exchange(
+            "mcp_list_tools",
+            self.name,  # type: ignore[attr-defined]
+            lambda: fetch(*args, **kwargs),
+            lambda tools: [t.model_dump(mode="json", exclude_unset=True) for t in tools],
+            lambda tools: [Tool.model_validate(t) for t in tools],
+        )
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any] | None):
+        labels = {"server": self.name, "tool": tool_name}  # type: ignore[attr-defined]
+        status = "error"
+        try:
+            with timed("mcp_call_seconds", **labels):
+                result = await self._record_or_call(tool_name, arguments)
+            status = "error" if getattr(result, "isError", False) else "ok"
+            return result
+        finally:
+            metrics.inc("mcp_calls_total", status=status, **labels)
+
+    async def _record_or_call(self, tool_name: str, arguments: dict[str, Any] | None):
+        cassette = get_cassette()
+        if cassette is None:
+            return await self._call_tool(tool_name, arguments)
+        return await cassette.exchange(
+            "mcp_call_tool",
+            make_tool_call_key(self.name, tool_name, arguments),  # type: ignore[attr-defined]
+            lambda: self._call_tool(tool_name, arguments),
+            lambda result: result.model_dump(mode="json", exclude_unset=True),
+            CallToolResult.model_validate,
+        )
+
+    async def _call_tool(self, tool_name: str, arguments: dict[str, Any] | None):
+        fetch = super().call_tool  # type: ignore[misc]
+        if self.tool_call_cache is None:
+            return await fetch(tool_name, arguments)
+        return await self.tool_call_cache.call(
+            self.name,  # type: ignore[attr-defined]
+            tool_name,
+            arguments,
+            lambda: fetch(tool_name, arguments),
+            catalog=self.tools_fingerprint,
+        )
+
+
+class CachedMCPServerSse(_CachedToolCallsMixin, MCPServerSse):
+    pass
+
+
+class CachedMCPServerHttp(_CachedToolCallsMixin, MCPServerStreamableHttp):
+    pass
+
+
+class ConstrainedMCPServerSse(CachedMCPServerSse):
     def __init__(
         self, params: MCPServerSseParams, name: str, allowed_prefixes: Sequence[str], **kwargs
     ):
         super().__init__(params=params, name=name, **kwargs)
         self.allowed_prefixes = tuple(allowed_prefixes)
 
-    async def list_tools(self):
-        tools = await super().list_tools()
+    async def list_tools(self, *args, **kwargs):
+        tools = await super().list_tools(*args, **kwargs)
         return [
             tool for tool in tools if any(tool.name.startswith(p) for p in self.allowed_prefixes)
         ]
 
 
-class ConstrainedMCPServerHttp(MCPServerStreamableHttp):
+class ConstrainedMCPServerHttp(CachedMCPServerHttp):
     def __init__(
         self,
         params: MCPServerStreamableHttpParams,
@@ -39,8 +123,8 @@ class ConstrainedMCPServerHttp(MCPServerStreamableHttp):
         super().__init__(params=params, name=name, **kwargs)
         self.allowed_prefixes = tuple(allowed_prefixes)
 
-    async def list_tools(self):
-        tools = await super().list_tools()
+    async def list_tools(self, *args, **kwargs):
+        tools = await super().list_tools(*args, **kwargs)
         return [
             tool for tool in tools if any(tool.name.startswith(p) for p in self.allowed_prefixes)
         ]
@@ -55,6 +139,7 @@ class MCPDefinition:
     allowed_tool_prefixes: Sequence[str] | None = None
     server_type: str = "sse"  # "sse" or "http"
     remote_url: str | None = None
+    cache_tool_calls: bool = True  # only for servers whose tools are read-only
 
 
 MCP_DEFINITIONS: list[MCPDefinition] = [
@@ -78,18 +163,63 @@ MCP_DEFINITIONS: list[MCPDefinition] = [
 ]
 
 
+def _tools_fingerprint(tools: Sequence[object]) -> str:
+    catalog = sorted(
+        (
+            getattr(t, "name", ""),
+            getattr(t, "description", "") or "",
+            json.dumps(getattr(t, "inputSchema", None), sort_keys=True, default=str),
+        )
+        for t in tools
+    )
+    return hashlib.sha256(json.dumps(catalog).encode("utf-8")).hexdigest()
+
+
+@dataclass(slots=True)
+class _PooledServer:
+    """Pool slot for one MCP server.
+
+    The connection is owned by a dedicated task: the streamable-HTTP and SSE
+    transports are anyio context managers that must be exited by the task that
+    entered them, so connect and cleanup both happen inside ``_owner``.
+    """
+
+    key: str
+    server: MCPServerSse | MCPServerStreamableHttp
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    task: Optional[asyncio.Task] = None
+    ready: Optional[asyncio.Event] = None
+    stop: Optional[asyncio.Event] = None
+    leases: int = 0
+    last_used: float = 0.0
+    tools_fingerprint: Optional[str] = None
+    tool_count: int = 0
+
+
 class MCPRegistry:
-    """Lightweight registry to manage optional MCP servers.
+    """Pooled registry to manage optional MCP servers.
 
     - Respects ENABLE_* flags from settings
-    - Connects only enabled servers
-    - Tracks availability and cleans up gracefully
+    - Connects only enabled servers, concurrently
+    - Keeps sessions open across research runs; runs ``lease()`` them
+    - Pings idle sessions before reuse and reconnects dead ones
+    - Caches the tool catalog and logs when it changes between connects
     """
 
-    def __init__(self) -> None:
-        self._servers: dict[str, MCPServerSse | MCPServerStreamableHttp] = {}
+    def __init__(self, idle_ping_seconds: float = 60.0, ping_timeout_seconds: float = 10.0) -> None:
+        self._servers: dict[str, CachedMCPServerSse | CachedMCPServerHttp] = {}
         self._available: dict[str, bool] = {}
+        self._slots: dict[str, _PooledServer] = {}
+        self._idle_ping_seconds = idle_ping_seconds
+        self._ping_timeout_seconds = ping_timeout_seconds
+        self._built = False
 
+    def _build(self) -> None:
+        """Create the enabled servers from settings on first use, not at import."""
+
+        if self._built:
+            return
+        self._built = True
         for d in MCP_DEFINITIONS:
             enabled = bool(getattr(settings, d.enabled_setting, False))
             if not enabled:
@@ -108,7 +238,8 @@ class MCPRegistry:
                 logger.warning(f"MCP definition missing URL: {d.key}")
                 continue
 
-            # Create server based on type
+            # Create server based on type. Tool lists are cached by the SDK and
+            # invalidated by the registry on (re)connect.
             if d.server_type == "http":
                 # HTTP-based remote MCP (Exa searches can take 30-60s)
                 if d.allowed_tool_prefixes:
@@ -117,12 +248,14 @@ class MCPRegistry:
                         name=d.display_name,
                         allowed_prefixes=d.allowed_tool_prefixes,
                         client_session_timeout_seconds=240,
+                        cache_tools_list=True,
                     )
                 else:
-                    self._servers[d.key] = MCPServerStreamableHttp(
+                    self._servers[d.key] = CachedMCPServerHttp(
                         MCPServerStreamableHttpParams(url=url, headers={}),
                         name=d.display_name,
                         client_session_timeout_seconds=240,
+                        cache_tools_list=True,
                     )
             else:
                 # SSE-based local MCP
@@ -132,49 +265,180 @@ class MCPRegistry:
                         name=d.display_name,
                         allowed_prefixes=d.allowed_tool_prefixes,
                         client_session_timeout_seconds=240,
+                        cache_tools_list=True,
                     )
                 else:
-                    self._servers[d.key] = MCPServerSse(
+                    self._servers[d.key] = CachedMCPServerSse(
                         MCPServerSseParams(url=url, headers={}),
                         name=d.display_name,
                         client_session_timeout_seconds=240,
+                        cache_tools_list=True,
                     )
 
+            if d.cache_tool_calls:
+                self._servers[d.key].tool_call_cache = get_tool_call_cache()
+
             self._available[d.key] = False
+            self._slots[d.key] = _PooledServer(key=d.key, server=self._servers[d.key])
 
     def enabled_names(self) -> list[str]:
+        self._build()
         return list(self._servers.keys())
 
     def get(self, name: str) -> MCPServerSse | MCPServerStreamableHttp | None:
+        self._build()
         return self._servers.get(name)
 
     def is_available(self, name: str) -> bool:
         return bool(self._available.get(name, False))
 
-    async def connect_enabled(self) -> None:
-        """Attempt to connect all enabled servers; do not raise if some fail."""
-        for name in self.enabled_names():
-            server = self._servers.get(name)
-            if not server:
-                continue
-            try:
-                logger.info(f"MCP connecting: {name} ...")
-                await server.connect()
-                self._available[name] = True
-                logger.info(f"MCP connected: {name}")
-            except Exception as e:
-                self._available[name] = False
-                logger.warning(f"MCP unavailable: {name} error={e}")
+    async def _owner(self, slot: _PooledServer, ready: asyncio.Event, stop: asyncio.Event) -> None:
+        name = slot.key
+        try:
+            logger.info(f"MCP connecting: {name} ...")
+            await slot.server.connect()
+        except Exception as e:
+            self._available[name] = False
+            logger.warning(f"MCP unavailable: {name} error={e}")
+            ready.set()
+            return
 
-    async def cleanup_all(self) -> None:
-        """Cleanup all servers that were attempted; ignore errors."""
-        for name, server in self._servers.items():
+        self._available[name] = True
+        logger.info(f"MCP connected: {name}")
+        ready.set()
+        try:
+            await stop.wait()
+        finally:
+            self._available[name] = False
             try:
-                await server.cleanup()
+                await slot.server.cleanup()
                 logger.info(f"MCP disconnected: {name}")
             except Exception as e:
                 logger.warning(f"MCP disconnect failed: {name} error={e}")
 
+    async def _connect(self, slot: _PooledServer) -> None:
+        """Start the owner task for ``slot`` and wait until it is connected (or failed).
+
+        Must be called with ``slot.lock`` held.
+        """
+
+        if slot.task is not None and not slot.task.done() and self.is_available(slot.key):
+            return
+        await self._disconnect(slot)
+
+        slot.ready, slot.stop = asyncio.Event(), asyncio.Event()
+        slot.task = asyncio.create_task(
+            self._owner(slot, slot.ready, slot.stop), name=f"mcp-owner-{slot.key}"
+        )
+        await slot.ready.wait()
+        if self.is_available(slot.key):
+            slot.last_used = time.monotonic()
+            await self._refresh_tool_catalog(slot)
+
+    async def _disconnect(self, slot: _PooledServer) -> None:
+        if slot.task is None:
+            return
+        if slot.stop is not None:
+            slot.stop.set()
+        try:
+            await slot.task
+        except Exception as e:
+            logger.warning(f"MCP owner task failed: {slot.key} error={e}")
+        slot.task = None
+
+    async def _refresh_tool_catalog(self, slot: _PooledServer) -> None:
+        server = slot.server
+        if hasattr(server, "invalidate_tools_cache"):
+            server.invalidate_tools_cache()
+        try:
+            tools = await server.list_tools()
+        except Exception as e:
+            logger.warning(f"MCP list_tools failed: {slot.key} error={e}")
+            return
+
+        fingerprint = _tools_fingerprint(tools)
+        if slot.tools_fingerprint is not None and fingerprint != slot.tools_fingerprint:
+            logger.info(
+                f"MCP tool catalog changed: {slot.key} tools={slot.tool_count}->{len(tools)}"
+            )
+        slot.tools_fingerprint = fingerprint
+        slot.tool_count = len(tools)
+        if isinstance(server, _CachedToolCallsMixin):
+            server.tools_fingerprint = fingerprint
+
+    async def _is_healthy(self, slot: _PooledServer) -> bool:
+        cassette = get_cassette()
+        if cassette is not None and cassette.replaying:
+            return True
+        session = getattr(slot.server, "session", None)
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout=self._ping_timeout_seconds)
+        except Exception as e:
+            logger.warning(f"MCP health check failed: {slot.key} error={e}")
+            return False
+        return True
+
+    async def _acquire(self, slot: _PooledServer) -> bool:
+        async with slot.lock:
+            idle_for = time.monotonic() - slot.last_used
+            if (
+                self.is_available(slot.key)
+                and slot.leases == 0
+                and idle_for > self._idle_ping_seconds
+                and not await self._is_healthy(slot)
+            ):
+                logger.info(f"MCP reconnecting idle session: {slot.key}")
+                await self._disconnect(slot)
+
+            await self._connect(slot)
+            if not self.is_available(slot.key):
+                return False
+            slot.leases += 1
+            return True
+
+    def _release(self, slot: _PooledServer) -> None:
+        slot.leases = max(0, slot.leases - 1)
+        slot.last_used = time.monotonic()
+
+    async def connect_enabled(self) -> None:
+        """Attempt to connect all enabled servers concurrently; do not raise if some fail."""
+
+        async def _connect_locked(slot: _PooledServer) -> None:
+            async with slot.lock:
+                await self._connect(slot)
+
+        self._build()
+        await asyncio.gather(*(_connect_locked(s) for s in self._slots.values()))
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[list[MCPServerSse | MCPServerStreamableHttp]]:
+        """Lease the connected servers for one research run.
+
+        Sessions stay open after the lease ends so the next run skips the
+        handshake; call ``cleanup_all`` once at process shutdown.
+        """
+
+        self._build()
+        slots = list(self._slots.values())
+        acquired = await asyncio.gather(*(self._acquire(s) for s in slots))
+        leased = [s for s, ok in zip(slots, acquired, strict=True) if ok]
+        try:
+            yield [s.server for s in leased]
+        finally:
+            for slot in leased:
+                self._release(slot)
+
+    async def cleanup_all(self) -> None:
+        """Disconnect all pooled servers; ignore errors."""
+
+        async def _disconnect_locked(slot: _PooledServer) -> None:
+            async with slot.lock:
+                await self._disconnect(slot)
+
+        await asyncio.gather(*(_disconnect_locked(s) for s in self._slots.values()))
+
     def get_available_servers(self) -> Sequence[MCPServerSse | MCPServerStreamableHttp]:
         return [self._servers[n] for n, ok in self._available.items() if ok]
 
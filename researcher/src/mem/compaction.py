@@ -0,0 +1,139 @@
+"""Compaction strategies that fold trimmed session items into a rolling summary.
+
+Two strategies are available:
+
+- ``FactExtractor``: deterministic and instant; keeps the companies and URLs
+  seen so far so the agent does not repeat the same searches.
+- ``summarize_items``: asks a cheap registered model to merge the trimmed
+  items into the previous summary, falling back to the extractor on failure.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import re
+from typing import Callable, Iterable
+
+from agents import Agent, Runner
+
+from src.models.model_register import LMModelSpec, get_model_from_spec
+
+logger = logging.getLogger("startup_researcher.mem.compaction")
+
+_URL_RE = re.compile(r"https?://[^\s\\\"'<>)\]}]+")
+_COMPANY_KEYS = frozenset({"company", "company_name"})
+
+_SUMMARY_INSTRUCTIONS = """
+You maintain a rolling summary of a startup funding research session.
+You are given the previous summary and older messages that no longer fit in the context window.
+Merge them into one updated summary: companies found (name, round, amount, date, lead investor),
+sources already visited, searches already run, and open questions.
+Be terse, use bullet points, keep every company and URL, and drop chit-chat.
+"""
+
+
+def _walk_companies(payload: object) -> Iterable[str]:
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if key in _COMPANY_KEYS and isinstance(value, str):
+                yield value
+            elif key in _COMPANY_KEYS and isinstance(value, dict) and isinstance(value.get("name"), str):
+                yield value["name"]
+            else:
+                yield from _walk_companies(value)
+    elif isinstance(payload, list):
+        for value in payload:
+            yield from _walk_companies(value)
+    elif isinstance(payload, str) and payload[:1] in "[{":
+        # Tool outputs are often JSON documents embedded in a string field.
+        try:
+            yield from _walk_companies(json.loads(payload))
+        except ValueError:
+            return
+
+
+class FactExtractor:
+    """Deterministic summary of the companies and URLs seen so far (insertion ordered)."""
+
+    def __init__(self) -> None:
+        self.companies: dict[str, str] = {}
+        self.urls: dict[str, None] = {}
+
+    def update(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            for url in _URL_RE.findall(text):
+                self.urls.setdefault(url.rstrip(".,;"), None)
+            try:
+                payload = json.loads(text)
+            except ValueError:
+                continue
+            for name in _walk_companies(payload):
+                name = name.strip()
+                if name:
+                    self.companies.setdefault(name.casefold(), name)
+
+    def render(self, max_tokens: int, count_tokens: Callable[[str], int]) -> str:
+        """Render the facts, dropping the oldest URLs (then companies) to fit ``max_tokens``."""
+
+        companies = list(self.companies.values())
+        urls = list(self.urls)
+        while True:
+            text = (
+                "Earlier research (compacted).\n"
+                f"Companies already found: {', '.join(companies) or 'none'}\n"
+                f"Sources already visited:\n" + "\n".join(urls)
+            )
+            if count_tokens(text) <= max_tokens or not (companies or urls):
+                return text
+            if urls:
+                urls = urls[max(1, len(urls) // 4) :]
+            else:
+                companies = companies[max(1, len(companies) // 4) :]
+
+
+async def summarize_items(
+    spec: LMModelSpec,
+    previous_summary: str,
+    texts: list[str],
+    *,
+    max_summary_tokens: int,
+    count_tokens: Callable[[str], int],
+) -> str:
+    """Fold ``texts`` into ``previous_summary`` with ``spec``, fitting its context window."""
+
+    budget = spec.max_context_length - max_summary_tokens - count_tokens(_SUMMARY_INSTRUCTIONS)
+    budget -= count_tokens(previous_summary)
+    kept: list[str] = []
+    for text in reversed(texts):
+        tokens = count_tokens(text)
+        if tokens > budget:
+            break
+        kept.append(text)
+        budget -= tokens
+    kept.reverse()
+
+    agent = Agent(
+        name="SessionCompactor",
+        instructions=_SUMMARY_INSTRUCTIONS,
+        model=get_model_from_spec(spec),
+        # no tools, so parallel_tool_calls must be unset (see condense agent)
+        model_settings=dataclasses.replace(spec.model_settings, parallel_tool_calls=None),
+    )
+    prompt = (
+        f"<previous_summary>\n{previous_summary}\n</previous_summary>\n"
+        "<older_messages>\n" + "\n".join(kept) + "\n</older_messages>\n"
+        f"Return the updated summary in at most {max_summary_tokens} tokens."
+    )
+    result = await Runner.run(agent, input=prompt, max_turns=1)
+    return str(result.final_output or "")
+
+
+def truncate_to_tokens(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> str:
+    while text and count_tokens(text) > max_tokens:
+        text = text[: int(len(text) * 0.8)]
+    return text
+
+
+__all__ = ["FactExtractor", "summarize_items", "truncate_to_tokens"]
@@ -4,19 +4,30 @@ The session keeps a rolling window of messages while ensuring the total
 token footprint stays within the model's effective context budget. Older
 messages are trimmed first, but we always preserve a small tail of the most
 recent turns so the agent maintains short-term memory.
+
+With ``compaction="extract"`` or ``"summarize"`` trimmed messages are folded
+into a rolling summary in a background task instead of being forgotten; the
+summary is served as the first item of the history.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 from collections import deque
-from typing import Deque, List, Optional
+from typing import Deque, List, Literal, Optional
 
 from agents import SessionABC
 from agents.items import TResponseInputItem
 
-from src.mem.tokens import get_encoder
-from src.models.model_register import LMModelSpec
+from src.mem.compaction import FactExtractor, summarize_items, truncate_to_tokens
+from src.mem.tokens import get_token_counter
+from src.models.model_register import LMModelSpec, model_registry
+
+logger = logging.getLogger("startup_researcher.mem.short_ctx")
+
+CompactionMode = Literal["drop", "extract", "summarize"]
 
 
 def _item_to_serialisable(item: TResponseInputItem) -> str:
@@ -43,48 +54,137 @@ class ResearchSession(SessionABC):
         max_tokens: Optional[int] = None,
         max_items: int = 64,
         tail_reserve: int = 6,
+        compaction: CompactionMode = "drop",
+        summary_model: Optional[LMModelSpec] = None,
+        summary_max_tokens: Optional[int] = None,
     ) -> None:
         self.session_id = session_id
-        self._encoder = get_encoder(model_spec)
+        self._count_tokens = get_token_counter(model_spec)
         self._max_tokens = max_tokens or model_spec.max_context_length or 4096
         self._max_items = max(1, max_items)
         self._tail_reserve = max(1, tail_reserve)
+
+        self._compaction = compaction
+        if compaction == "summarize" and summary_model is None:
+            summary_model = model_registry.get_model("azure.gpt-5-nano")
+        self._summary_model = summary_model
+        # The summary is part of the context, so it gets a slice of the token budget.
+        self._summary_max_tokens = summary_max_tokens or max(64, self._max_tokens // 10)
+        self._summary = ""
+        self._summary_tokens = 0
+        self._facts = FactExtractor()
+        self._pending_compaction: list[str] = []
+        self._compaction_task: Optional[asyncio.Task[None]] = None
         self._items: Deque[TResponseInputItem] = deque()
+        # Token count per item (parallel to _items) and their running sum, so
+        # each item is serialised and tokenised exactly once.
+        self._item_tokens: Deque[int] = deque()
+        self._total_tokens = 0
 
     async def get_items(self, limit: int | None = None) -> List[TResponseInputItem]:
-        if limit is None or limit >= len(self._items):
-            return list(self._items)
-        return list(self._items)[-limit:]
+        items = list(self._items)
+        if limit is not None and limit < len(items):
+            return items[-limit:]
+        if self._summary:
+            summary_item: TResponseInputItem = {  # type: ignore[assignment]
+                "role": "system",
+                "content": f"<earlier_research_summary>\n{self._summary}\n</earlier_research_summary>",
+            }
+            return [summary_item, *items]
+        return items
 
     async def add_items(self, items: List[TResponseInputItem]) -> None:
         for item in items:
+            tokens = self._count_item(item)
             self._items.append(item)
+            self._item_tokens.append(tokens)
+            self._total_tokens += tokens
         await self._trim()
 
     async def pop_item(self) -> Optional[TResponseInputItem]:
         if not self._items:
             return None
+        self._total_tokens -= self._item_tokens.pop()
         return self._items.pop()
 
     async def clear_session(self) -> None:
         self._items.clear()
+        self._item_tokens.clear()
+        self._total_tokens = 0
+        if self._compaction_task is not None:
+            self._compaction_task.cancel()
+            self._compaction_task = None
+        self._pending_compaction.clear()
+        self._facts = FactExtractor()
+        self._summary = ""
+        self._summary_tokens = 0
 
     async def _trim(self) -> None:
         """Trim history to respect item count and token budget constraints."""
 
+        dropped: list[TResponseInputItem] = []
         while len(self._items) > self._max_items:
-            self._items.popleft()
+            dropped.append(self._drop_oldest())
 
         # Always keep at least tail_reserve items
-        while len(self._items) > self._tail_reserve and self._token_count() > self._max_tokens:
-            self._items.popleft()
+        while (
+            len(self._items) > self._tail_reserve
+            and self._total_tokens + self._summary_tokens > self._max_tokens
+        ):
+            dropped.append(self._drop_oldest())
+
+        if dropped and self._compaction != "drop":
+            self._pending_compaction.extend(_item_to_serialisable(item) for item in dropped)
+            if self._compaction_task is None or self._compaction_task.done():
+                self._compaction_task = asyncio.create_task(self._compact())
+
+    def _drop_oldest(self) -> TResponseInputItem:
+        self._total_tokens -= self._item_tokens.popleft()
+        return self._items.popleft()
+
+    async def _compact(self) -> None:
+        """Fold pending trimmed items into the rolling summary (runs in the background)."""
+
+        while self._pending_compaction:
+            texts, self._pending_compaction = self._pending_compaction, []
+            self._facts.update(texts)
+            summary = ""
+            if self._compaction == "summarize" and self._summary_model is not None:
+                try:
+                    summary = await summarize_items(
+                        self._summary_model,
+                        self._summary,
+                        texts,
+                        max_summary_tokens=self._summary_max_tokens,
+                        count_tokens=self._count_tokens,
+                    )
+                except Exception as exc:
+                    logger.warning("Session summary failed, using extracted facts: %s", exc)
+            if summary:
+                summary = truncate_to_tokens(summary, self._summary_max_tokens, self._count_tokens)
+            else:
+                summary = self._facts.render(self._summary_max_tokens, self._count_tokens)
+
+            self._summary = summary
+            self._summary_tokens = self._count_tokens(summary)
+            logger.debug(
+                "Session %s compacted %d item(s) into %d summary tokens",
+                self.session_id,
+                len(texts),
+                self._summary_tokens,
+            )
+
+    async def wait_for_compaction(self) -> None:
+        """Wait until background compaction has caught up (for shutdown and tests)."""
+
+        while self._compaction_task is not None and not self._compaction_task.done():
+            await self._compaction_task
+
+    def _count_item(self, item: TResponseInputItem) -> int:
+        return self._count_tokens(_item_to_serialisable(item))
 
     def _token_count(self) -> int:
-        total = 0
-        for item in self._items:
-            text = _item_to_serialisable(item)
-            total += len(self._encoder(text))
-        return total
+        return self._total_tokens
 
 
 __all__ = ["ResearchSession"]
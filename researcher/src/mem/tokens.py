@@ -1,13 +1,23 @@
 from __future__ import annotations
 
-from typing import Callable, List, Optional
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
 
 try:
     from tiktoken import Encoding, get_encoding
 except ImportError:  # pragma: no cover - optional dependency
     Encoding = None  # type: ignore[assignment]
     get_encoding = None  # type: ignore[assignment]
-from src.models.model_register import LMModelSpec
+from src.models.model_register import LMModelSpec, model_registry
+
+logger = logging.getLogger("startup_researcher.mem.tokens")
+
+# Texts shorter than this are cheaper to tokenize than to hash and look up.
+_CACHE_MIN_CHARS = 256
+_CACHE_MAX_ENTRIES = 4096
 
 
 def get_encoder(model_spec: LMModelSpec) -> Callable[[str], List[int]]:
@@ -15,26 +25,144 @@ def get_encoder(model_spec: LMModelSpec) -> Callable[[str], List[int]]:
     Return a tokenizer encoder based on LMModelSpec. Prefers tokenizer_name,
     falls back to model_name. Uses tiktoken when available, otherwise
     an approximate encoder (1 token ~= 4 chars).
+
+    Callers that only need counts should use ``get_token_counter`` instead.
     """
 
+    encoding = _get_encoding(model_spec)
+    return encoding.encode_ordinary if encoding else approx
+
+
+def _get_encoding(model_spec: LMModelSpec) -> Optional[Encoding]:
     if model_spec.tokenizer_name == "approximate":
-        return approx
+        return None
 
     if get_encoding is None or Encoding is None:
-        return approx
+        return None
 
     if model_spec.tokenizer_name == "o200k_harmony":
-        tokenizer = _get_gpt_oss_tokenizer()
-        return tokenizer.encode if tokenizer else approx
+        return _get_gpt_oss_tokenizer()
 
     try:
-        return get_encoding(model_spec.tokenizer_name).encode  # type: ignore[union-attr]
+        return get_encoding(model_spec.tokenizer_name)  # type: ignore[misc]
     except Exception:
-        return approx
+        return None
+
+
+# ** Token counting (count-only, cached, batched)
+class _CountCache:
+    """Thread-safe LRU of token counts keyed by (encoding, content hash)."""
+
+    def __init__(self, max_entries: int = _CACHE_MAX_ENTRIES) -> None:
+        self._entries: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(encoding_name: str, text: str) -> tuple[str, bytes]:
+        return encoding_name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: tuple[str, bytes]) -> Optional[int]:
+        with self._lock:
+            count = self._entries.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def put(self, key: tuple[str, bytes], count: int) -> None:
+        with self._lock:
+            self._entries[key] = count
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+_count_cache = _CountCache()
+
+
+def _count_with(encoding: Encoding, text: str) -> int:
+    if len(text) < _CACHE_MIN_CHARS:
+        return len(encoding.encode_ordinary(text))
+    key = _CountCache.key(encoding.name, text)
+    count = _count_cache.get(key)
+    if count is None:
+        count = len(encoding.encode_ordinary(text))
+        _count_cache.put(key, count)
+    return count
+
+
+def get_token_counter(model_spec: LMModelSpec) -> Callable[[str], int]:
+    """Return a ``str -> int`` token counter for ``model_spec``.
+
+    Uses ``encode_ordinary`` (special-token strings in tool output are counted
+    as text instead of raising) and caches counts of large texts by content hash.
+    """
+
+    encoding = _get_encoding(model_spec)
+    if encoding is None:
+        return approx_count
+    return lambda text: _count_with(encoding, text)
+
+
+def count_tokens(text: str, model_spec: LMModelSpec) -> int:
+    return get_token_counter(model_spec)(text)
+
+
+def count_tokens_batch(
+    texts: Iterable[str], model_spec: LMModelSpec, *, num_threads: int = 8
+) -> list[int]:
+    """Count tokens of many texts, tokenizing cache misses in parallel threads."""
+
+    texts = list(texts)
+    encoding = _get_encoding(model_spec)
+    if encoding is None:
+        return [approx_count(t) for t in texts]
+
+    counts: list[Optional[int]] = [None] * len(texts)
+    keys: dict[int, tuple[str, bytes]] = {}
+    missing: list[int] = []
+    for i, text in enumerate(texts):
+        if len(text) >= _CACHE_MIN_CHARS:
+            keys[i] = _CountCache.key(encoding.name, text)
+            counts[i] = _count_cache.get(keys[i])
+        if counts[i] is None:
+            missing.append(i)
+
+    if missing:
+        encoded = encoding.encode_ordinary_batch([texts[i] for i in missing], num_threads=num_threads)
+        for i, tokens in zip(missing, encoded, strict=True):
+            counts[i] = len(tokens)
+            if i in keys:
+                _count_cache.put(keys[i], len(tokens))
+
+    return counts  # type: ignore[return-value]
+
+
+def warm_tokenizers(model_specs: Optional[Iterable[LMModelSpec]] = None) -> None:
+    """Build (and, on first use, download) the encodings up front; call at startup.
+
+    Defaults to every registered model. Safe to call from a worker thread;
+    failures are logged and the tokenizer is built lazily on first use instead.
+    """
+
+    specs = model_specs if model_specs is not None else model_registry.models.values()
+    for spec in specs:
+        try:
+            encoding = _get_encoding(spec)
+            if encoding is not None:
+                encoding.encode_ordinary("warm up")
+        except Exception as exc:
+            logger.warning("Failed to warm tokenizer %s: %s", spec.tokenizer_name, exc)
 
 
 # ** GPT-OSS 20B tokenizer
 _gpt_oss_20b_tokenizer: Optional[Encoding] = None
+_gpt_oss_20b_tokenizer_lock = threading.Lock()
 
 
 def _get_gpt_oss_tokenizer() -> Optional[Encoding]:
@@ -46,38 +174,52 @@ def _get_gpt_oss_tokenizer() -> Optional[Encoding]:
     if get_encoding is None or Encoding is None:
         return None
 
-    o200k_base = get_encoding("o200k_base")
-    _gpt_oss_20b_tokenizer = Encoding(
-        name="o200k_harmony",
-        pat_str=o200k_base._pat_str,
-        mergeable_ranks=o200k_base._mergeable_ranks,
-        special_tokens={
-            **o200k_base._special_tokens,
-            "<|startoftext|>": 199998,
-            "<|endoftext|>": 199999,
-            "<|reserved_200000|>": 200000,
-            "<|reserved_200001|>": 200001,
-            "<|return|>": 200002,
-            "<|constrain|>": 200003,
-            "<|reserved_200004|>": 200004,
-            "<|channel|>": 200005,
-            "<|start|>": 200006,
-            "<|end|>": 200007,
-            "<|message|>": 200008,
-            "<|reserved_200009|>": 200009,
-            "<|reserved_200010|>": 200010,
-            "<|reserved_200011|>": 200011,
-            "<|call|>": 200012,
-        }
-        | {f"<|reserved_{i}|>": i for i in range(200013, 201088)},
-    )
+    # Building the Encoding is expensive; make sure concurrent callers share one.
+    with _gpt_oss_20b_tokenizer_lock:
+        if _gpt_oss_20b_tokenizer is not None:
+            return _gpt_oss_20b_tokenizer
+
+        o200k_base = get_encoding("o200k_base")
+        _gpt_oss_20b_tokenizer = Encoding(
+            name="o200k_harmony",
+            pat_str=o200k_base._pat_str,
+            mergeable_ranks=o200k_base._mergeable_ranks,
+            special_tokens={
+                **o200k_base._special_tokens,
+                "<|startoftext|>": 199998,
+                "<|endoftext|>": 199999,
+                "<|reserved_200000|>": 200000,
+                "<|reserved_200001|>": 200001,
+                "<|return|>": 200002,
+                "<|constrain|>": 200003,
+                "<|reserved_200004|>": 200004,
+                "<|channel|>": 200005,
+                "<|start|>": 200006,
+                "<|end|>": 200007,
+                "<|message|>": 200008,
+                "<|reserved_200009|>": 200009,
+                "<|reserved_200010|>": 200010,
+                "<|reserved_200011|>": 200011,
+                "<|call|>": 200012,
+            }
+            | {f"<|reserved_{i}|>": i for i in range(200013, 201088)},
+        )
     return _gpt_oss_20b_tokenizer
 
 
 # ** Fallback tokenizer (approximate)
+def approx_count(s: str) -> int:
+    return max(len(s) // 4, 1) if s else 0
+
+
 def approx(s: str) -> List[int]:
-    n = max(len(s) // 4, 1) if s else 0
-    return list(range(n))
+    return list(range(approx_count(s)))
 
 
-__all__ = ["get_encoder"]
+__all__ = [
+    "count_tokens",
+    "count_tokens_batch",
+    "get_encoder",
+    "get_token_counter",
+    "warm_tokenizers",
+]
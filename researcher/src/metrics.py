@@ -0,0 +1,263 @@
+"""In-process metrics for phases, model token usage, MCP calls and DB writes.
+
+Series are kept in a process-wide registry and rendered in the Prometheus
+text exposition format, either served over HTTP (``METRICS_PORT``) or written
+to a file (``METRICS_FILE``, e.g. for the node_exporter textfile collector).
+
+Every series is tagged with the run id bound via ``bind_run``; the binding is
+a context variable, so concurrent runs in batch mode keep their own labels and
+tasks spawned inside a run inherit it.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+
+_LOGGER = logging.getLogger("startup_researcher.metrics")
+
+_PREFIX = "researcher"
+# Seconds; sized for everything from a DB write to a long manager phase.
+_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_current_run: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "researcher_run_id", default="none"
+)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass(slots=True)
+class _Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(_BUCKETS) + 1))
+    total: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._help: dict[str, tuple[str, str]] = {}
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._gauges: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], _Histogram] = {}
+
+    @staticmethod
+    def _labels(labels: dict[str, str]) -> Labels:
+        labels = {"run_id": _current_run.get(), **labels}
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Set a process-wide gauge; unlike counters it is not tagged with the run id."""
+
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(value)
+
+    def counter_value(self, name: str, **labels: str) -> float:
+        """Sum of ``name`` over all series whose labels include ``labels``."""
+
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(
+                v for (n, ls), v in self._counters.items() if n == name and wanted <= set(ls)
+            )
+
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+
+        lines: list[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items(), key=lambda kv: kv[0])
+
+        seen: set[str] = set()
+
+        def _header(name: str, kind: str) -> None:
+            if name in seen:
+                return
+            seen.add(name)
+            help_text = self._help.get(name, (kind, name))[1]
+            lines.append(f"# HELP {_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {_PREFIX}_{name} {kind}")
+
+        for (name, labels), value in counters:
+            _header(name, "counter")
+            lines.append(f"{_PREFIX}_{name}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), value in gauges:
+            _header(name, "gauge")
+            lines.append(f"{_PREFIX}_{name}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), histogram in histograms:
+            _header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip((*_BUCKETS, float("inf")), histogram.counts, strict=True):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _format_labels((*labels, ("le", le)))
+                lines.append(f"{_PREFIX}_{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{_PREFIX}_{name}_sum{_format_labels(labels)} {histogram.total:.6f}")
+            lines.append(f"{_PREFIX}_{name}_count{_format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+metrics = MetricsRegistry()
+metrics.describe("phase_seconds", "histogram", "Wall-clock time per research phase")
+metrics.describe("lm_requests_total", "counter", "Model requests by agent and model")
+metrics.describe("lm_request_seconds", "histogram", "Model request latency")
+metrics.describe("lm_input_tokens_total", "counter", "Prompt tokens by agent and model")
+metrics.describe("lm_cached_input_tokens_total", "counter", "Prompt tokens served from cache")
+metrics.describe("lm_output_tokens_total", "counter", "Completion tokens by agent and model")
+metrics.describe("lm_reasoning_tokens_total", "counter", "Reasoning tokens by agent and model")
+metrics.describe("mcp_calls_total", "counter", "MCP tool calls by server, tool and status")
+metrics.describe("mcp_call_seconds", "histogram", "MCP tool call latency")
+metrics.describe("db_write_seconds", "histogram", "Database write latency")
+metrics.describe("db_read_seconds", "histogram", "Database read latency")
+
+
+def current_run_id() -> str:
+    return _current_run.get()
+
+
+@contextmanager
+def bind_run(run_id: Optional[str]) -> Iterator[None]:
+    """Tag every metric recorded inside the block (and its child tasks) with ``run_id``."""
+
+    if not run_id:
+        yield
+        return
+    token = _current_run.set(run_id)
+    try:
+        yield
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def timed(name: str, **labels: str) -> Iterator[None]:
+    """Observe the block's wall-clock time in histogram ``name``, even when it raises."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(name, time.perf_counter() - started, **labels)
+
+
+def timed_phase(phase: str) -> AbstractContextManager[None]:
+    return timed("phase_seconds", phase=phase)
+
+
+def record_lm_usage(
+    agent: str,
+    model: str,
+    *,
+    input_tokens: int,
+    cached_tokens: int,
+    output_tokens: int,
+    reasoning_tokens: int,
+) -> None:
+    metrics.inc("lm_input_tokens_total", input_tokens, agent=agent, model=model)
+    metrics.inc("lm_cached_input_tokens_total", cached_tokens, agent=agent, model=model)
+    metrics.inc("lm_output_tokens_total", output_tokens, agent=agent, model=model)
+    metrics.inc("lm_reasoning_tokens_total", reasoning_tokens, agent=agent, model=model)
+
+
+def prompt_cache_hit_rate(**labels: str) -> float:
+    """Share of prompt tokens served from the backend's prompt cache."""
+
+    total = metrics.counter_value("lm_input_tokens_total", **labels)
+    if not total:
+        return 0.0
+    return metrics.counter_value("lm_cached_input_tokens_total", **labels) / total
+
+
+def write_metrics_file(path: str) -> None:
+    """Atomically write the current metrics to ``path``."""
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(metrics.render())
+    os.replace(tmp_path, path)
+    _LOGGER.info("Wrote metrics to %s", path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        _LOGGER.debug(format, *args)
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread; returns the server for ``shutdown()``."""
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    _LOGGER.info("Serving metrics on http://%s:%d/metrics", host, port)
+    return server
+
+
+__all__ = [
+    "MetricsRegistry",
+    "bind_run",
+    "current_run_id",
+    "metrics",
+    "prompt_cache_hit_rate",
+    "record_lm_usage",
+    "serve_metrics",
+    "timed",
+    "timed_phase",
+    "write_metrics_file",
+]
@@ -0,0 +1,184 @@
+"""Opt-in on-disk cache for deterministic model completions.
+
+``CachedModel`` wraps any Agents SDK ``Model`` and replays a stored
+``ModelResponse`` when the same model sees the same settings, instructions,
+input, tools, handoffs and output schema again. Only deterministic calls
+(``temperature == 0``, no server-side conversation state) are cached;
+everything else, including streaming, goes straight to the wrapped model.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+from typing import Any, AsyncIterator, Optional
+
+from agents import ModelSettings
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputItem
+from pydantic import TypeAdapter
+
+from src.setup import settings
+from src.utils.disk_cache import SQLiteCache
+
+logger = logging.getLogger("startup_researcher.models.cache")
+
+_OUTPUT_ADAPTER: TypeAdapter[list[ResponseOutputItem]] = TypeAdapter(list[ResponseOutputItem])
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return repr(value)
+
+
+def _describe_tool(tool: Any) -> dict[str, Any]:
+    return {
+        "type": type(tool).__name__,
+        "name": getattr(tool, "name", None),
+        "description": getattr(tool, "description", None),
+        "params": getattr(tool, "params_json_schema", None),
+        "strict": getattr(tool, "strict_json_schema", None),
+    }
+
+
+def _describe_output_schema(output_schema: Any) -> Any:
+    if output_schema is None or output_schema.is_plain_text():
+        return None
+    return {"name": output_schema.name(), "schema": output_schema.json_schema()}
+
+
+def _settings_dict(model_settings: ModelSettings) -> dict[str, Any]:
+    if hasattr(model_settings, "to_json_dict"):
+        return model_settings.to_json_dict()
+    return json.loads(json.dumps(dataclasses.asdict(model_settings), default=_jsonable))
+
+
+def is_deterministic(model_settings: ModelSettings) -> bool:
+    return model_settings.temperature is not None and model_settings.temperature == 0
+
+
+def make_completion_key(
+    model_name: str,
+    system_instructions: Optional[str],
+    input: Any,
+    model_settings: ModelSettings,
+    tools: list[Any],
+    output_schema: Any,
+    handoffs: list[Any],
+) -> str:
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "settings": _settings_dict(model_settings),
+            "instructions": system_instructions,
+            "input": input,
+            "tools": [_describe_tool(t) for t in tools],
+            "output_schema": _describe_output_schema(output_schema),
+            "handoffs": [
+                [getattr(h, "tool_name", None), getattr(h, "input_json_schema", None)]
+                for h in handoffs
+            ],
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=_jsonable,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedModel(Model):
+    def __init__(self, model: Model, model_name: str, store: SQLiteCache) -> None:
+        self._model = model
+        self._model_name = model_name
+        self._store = store
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        def _call() -> Any:
+            return self._model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            )
+
+        stateful = any(kwargs.get(k) for k in ("previous_response_id", "conversation_id"))
+        if stateful or not is_deterministic(model_settings):
+            return await _call()
+
+        key = make_completion_key(
+            self._model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+        )
+        cached = await self._store.aget(key)
+        if cached is not None:
+            try:
+                record = json.loads(cached)
+                logger.debug("LM cache hit: %s", self._model_name)
+                # A replayed response costs nothing, so report zero usage.
+                return ModelResponse(
+                    output=_OUTPUT_ADAPTER.validate_python(record["output"]),
+                    usage=Usage(),
+                    response_id=record.get("response_id"),
+                )
+            except Exception as exc:
+                logger.warning("LM cache entry unreadable, refetching: %s", exc)
+
+        response = await _call()
+        record = {
+            "output": [
+                item.model_dump(mode="json", exclude_unset=True) for item in response.output
+            ],
+            "response_id": response.response_id,
+        }
+        await self._store.aset(key, json.dumps(record, separators=(",", ":")).encode("utf-8"))
+        return response
+
+    def stream_response(self, *args, **kwargs) -> AsyncIterator[Any]:
+        return self._model.stream_response(*args, **kwargs)
+
+
+_completion_store: Optional[SQLiteCache] = None
+
+
+def get_completion_store() -> SQLiteCache:
+    global _completion_store
+
+    if _completion_store is None:
+        _completion_store = SQLiteCache(
+            os.path.join(settings.CACHE_DIR, "lm_completions.sqlite3"),
+            namespace="lm_completions",
+            max_entries=settings.LM_CACHE_MAX_ENTRIES,
+            max_bytes=settings.LM_CACHE_MAX_BYTES,
+        )
+    return _completion_store
+
+
+__all__ = ["CachedModel", "get_completion_store", "is_deterministic", "make_completion_key"]
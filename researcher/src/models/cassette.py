@@ -0,0 +1,136 @@
+"""Record/replay wrapper for Agents SDK models.
+
+``CassetteModel`` sends every ``get_response`` and ``stream_response`` call
+through the active ``Cassette``: recorded while the cassette records, answered
+from it (without calling the wrapped model) while it replays. Requests are
+keyed like the LM cache, on model, settings, instructions, input, tools,
+handoffs and output schema.
+"""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator
+
+from agents.items import ModelResponse, TResponseStreamEvent
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+from pydantic import TypeAdapter
+
+from src.models.cache import _OUTPUT_ADAPTER, make_completion_key
+from src.utils.cassette import Cassette
+
+_EVENT_ADAPTER: TypeAdapter[TResponseStreamEvent] = TypeAdapter(TResponseStreamEvent)
+
+
+def _encode_response(response: ModelResponse) -> dict[str, Any]:
+    usage = response.usage
+    return {
+        "output": [item.model_dump(mode="json", exclude_unset=True) for item in response.output],
+        "usage": {
+            "requests": usage.requests,
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "total_tokens": usage.total_tokens,
+            "cached_tokens": usage.input_tokens_details.cached_tokens,
+            "reasoning_tokens": usage.output_tokens_details.reasoning_tokens,
+        },
+        "response_id": response.response_id,
+    }
+
+
+def _decode_response(record: dict[str, Any]) -> ModelResponse:
+    usage = record["usage"]
+    return ModelResponse(
+        output=_OUTPUT_ADAPTER.validate_python(record["output"]),
+        usage=Usage(
+            requests=usage["requests"],
+            input_tokens=usage["input_tokens"],
+            input_tokens_details=InputTokensDetails(cached_tokens=usage["cached_tokens"]),
+            output_tokens=usage["output_tokens"],
+            output_tokens_details=OutputTokensDetails(reasoning_tokens=usage["reasoning_tokens"]),
+            total_tokens=usage["total_tokens"],
+        ),
+        response_id=record.get("response_id"),
+    )
+
+
+class CassetteModel(Model):
+    def __init__(self, model: Model, model_name: str, cassette: Cassette) -> None:
+        self._model = model
+        self._model_name = model_name
+        self._cassette = cassette
+
+    def _key(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs
+    ) -> str:
+        return make_completion_key(
+            self._model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+        )
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        key = self._key(system_instructions, input, model_settings, tools, output_schema, handoffs)
+        return await self._cassette.exchange(
+            "model",
+            key,
+            lambda: self._model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            ),
+            _encode_response,
+            _decode_response,
+        )
+
+    def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        key = self._key(system_instructions, input, model_settings, tools, output_schema, handoffs)
+        return self._cassette.stream(
+            "model_stream",
+            key,
+            lambda: self._model.stream_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            ),
+            lambda event: event.model_dump(mode="json", exclude_unset=True),
+            _EVENT_ADAPTER.validate_python,
+        )
+
+
+__all__ = ["CassetteModel"]
@@ -0,0 +1,267 @@
+"""Per-backend concurrency and rate limits for model requests.
+
+A ``BackendLimiter`` caps the requests in flight to one backend (e.g. the
+number of llama.cpp server slots) and spends two token buckets refilled per
+minute: requests (RPM) and tokens (TPM). A request is charged its estimated
+prompt tokens when it starts and corrected with the reported usage when it
+ends, so the TPM bucket follows what the provider counts.
+
+Waiting requests queue per run and runs are served round-robin, so one run
+with many parallel research calls cannot starve another in batch mode.
+Queue depth and in-flight requests are gauges, wait time a histogram.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional
+
+from agents.items import ModelResponse, TResponseStreamEvent
+from agents.models.interface import Model
+
+from src.metrics import current_run_id, metrics
+
+logger = logging.getLogger("startup_researcher.models.limits")
+
+metrics.describe("lm_queue_depth", "gauge", "Model requests waiting for a backend slot")
+metrics.describe("lm_in_flight", "gauge", "Model requests in flight per backend")
+metrics.describe("lm_queue_wait_seconds", "histogram", "Time model requests waited for a slot")
+
+
+def prompt_text(system_instructions: Optional[str], input: Any, tools: list[Any]) -> str:
+    """The parts of a request that count towards its prompt tokens."""
+
+    parts = [system_instructions or ""]
+    parts.append(input if isinstance(input, str) else json.dumps(input, default=str))
+    parts.extend(json.dumps(getattr(t, "params_json_schema", None) or {}) for t in tools)
+    return "\n".join(parts)
+
+
+@dataclass(slots=True)
+class _TokenBucket:
+    per_minute: float
+    level: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        self.level = self.per_minute
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.level = min(self.per_minute, self.level + elapsed * self.per_minute / 60)
+        self.updated = now
+
+    def wait_seconds(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # Larger requests than the bucket holds go once it is full, not never.
+        needed = min(amount, self.per_minute)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) * 60 / self.per_minute
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+
+@dataclass(slots=True)
+class _Waiter:
+    tokens: int
+    future: asyncio.Future[None]
+
+
+@dataclass(slots=True)
+class Lease:
+    """A granted request slot; ``charge`` reports the tokens actually used."""
+
+    limiter: BackendLimiter
+    tokens: int
+
+    def charge(self, tokens: int) -> None:
+        if self.limiter._tokens is not None:
+            self.limiter._tokens.take(tokens - self.tokens)
+        self.tokens = tokens
+
+
+class BackendLimiter:
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_in_flight: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self._max_in_flight = max_in_flight
+        self._requests = _TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._in_flight = 0
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._max_in_flight or self._requests or self._tokens)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _publish(self) -> None:
+        metrics.set_gauge("lm_queue_depth", self.queue_depth, backend=self.name)
+        metrics.set_gauge("lm_in_flight", self._in_flight, backend=self.name)
+
+    def _wait_seconds(self, tokens: int, now: float) -> float:
+        wait = 0.0
+        if self._requests is not None:
+            wait = max(wait, self._requests.wait_seconds(1, now))
+        if self._tokens is not None:
+            wait = max(wait, self._tokens.wait_seconds(tokens, now))
+        return wait
+
+    def _dispatch(self) -> None:
+        """Grant waiting requests, one run at a time in round-robin order."""
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queues:
+            if self._max_in_flight and self._in_flight >= self._max_in_flight:
+                break
+            run, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            wait = self._wait_seconds(waiter.tokens, time.monotonic())
+            if wait > 0:
+                loop = asyncio.get_running_loop()
+                self._timer = loop.call_later(wait, self._dispatch)
+                break
+
+            queue.popleft()
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(waiter.tokens)
+            self._in_flight += 1
+            waiter.future.set_result(None)
+            # Move the run to the back so the next grant goes to another run.
+            del self._queues[run]
+            if queue:
+                self._queues[run] = queue
+
+        self._publish()
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tokens: int) -> AsyncIterator[Lease]:
+        """Wait for a slot for a request of about ``tokens`` tokens."""
+
+        lease = Lease(self, tokens)
+        if not self.enabled:
+            yield lease
+            return
+
+        run = current_run_id()
+        waiter = _Waiter(tokens, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(run, deque()).append(waiter)
+        started = time.perf_counter()
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release()  # granted just before the cancellation
+                raise
+            queue = self._queues.get(run)
+            if queue is not None and waiter in queue:
+                queue.remove(waiter)
+                if not queue:
+                    del self._queues[run]
+            self._dispatch()
+            raise
+
+        waited = time.perf_counter() - started
+        metrics.observe("lm_queue_wait_seconds", waited, backend=self.name)
+        if waited > 1.0:
+            logger.debug("Waited %.1fs for backend %s", waited, self.name)
+        try:
+            yield lease
+        finally:
+            self._release()
+
+
+def _usage_tokens(usage: Any) -> int:
+    return (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+
+
+class LimitedModel(Model):
+    """Run every request of ``model`` inside a slot of its backend's limiter."""
+
+    def __init__(self, model: Model, limiter: BackendLimiter) -> None:
+        self._model = model
+        self._limiter = limiter
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        estimate = len(prompt_text(system_instructions, input, tools)) // 4
+        async with self._limiter.slot(estimate) as lease:
+            response = await self._model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            )
+            lease.charge(_usage_tokens(response.usage))
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        estimate = len(prompt_text(system_instructions, input, tools)) // 4
+        async with self._limiter.slot(estimate) as lease:
+            async for event in self._model.stream_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            ):
+                if event.type == "response.completed" and event.response.usage is not None:
+                    lease.charge(_usage_tokens(event.response.usage))
+                yield event
+
+
+__all__ = ["BackendLimiter", "Lease", "LimitedModel", "prompt_text"]
@@ -0,0 +1,95 @@
+"""Model wrapper that records request latency and token usage in ``src.metrics``.
+
+Usage is attributed to the agent whose span is current when the request is
+made, and to the registry model name.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, AsyncIterator
+
+from agents.items import ModelResponse, TResponseStreamEvent
+from agents.models.interface import Model
+from agents.tracing import get_current_span
+
+from src.metrics import metrics, record_lm_usage
+
+
+def current_agent_name() -> str:
+    """Name of the agent whose span is current, or ``"unknown"`` outside one."""
+
+    span = get_current_span()
+    data = getattr(span, "span_data", None)
+    if getattr(data, "type", None) == "agent":
+        return data.name
+    return "unknown"
+
+
+def _details(usage: Any, name: str, field: str) -> int:
+    return getattr(getattr(usage, name, None), field, 0) or 0
+
+
+class MeteredModel(Model):
+    def __init__(self, model: Model, model_name: str) -> None:
+        self._model = model
+        self._model_name = model_name
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        agent = current_agent_name()
+        status = "error"
+        started = time.perf_counter()
+        try:
+            response = await self._model.get_response(*args, **kwargs)
+            status = "ok"
+        finally:
+            metrics.inc("lm_requests_total", agent=agent, model=self._model_name, status=status)
+            metrics.observe(
+                "lm_request_seconds",
+                time.perf_counter() - started,
+                agent=agent,
+                model=self._model_name,
+            )
+
+        usage = response.usage
+        record_lm_usage(
+            agent,
+            self._model_name,
+            input_tokens=usage.input_tokens,
+            cached_tokens=_details(usage, "input_tokens_details", "cached_tokens"),
+            output_tokens=usage.output_tokens,
+            reasoning_tokens=_details(usage, "output_tokens_details", "reasoning_tokens"),
+        )
+        return response
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator[TResponseStreamEvent]:
+        agent = current_agent_name()
+        status = "error"
+        started = time.perf_counter()
+        try:
+            async for event in self._model.stream_response(*args, **kwargs):
+                if event.type == "response.completed" and event.response.usage is not None:
+                    usage = event.response.usage
+                    record_lm_usage(
+                        agent,
+                        self._model_name,
+                        input_tokens=usage.input_tokens,
+                        cached_tokens=_details(usage, "input_tokens_details", "cached_tokens"),
+                        output_tokens=usage.output_tokens,
+                        reasoning_tokens=_details(
+                            usage, "output_tokens_details", "reasoning_tokens"
+                        ),
+                    )
+                yield event
+            status = "ok"
+        finally:
+            metrics.inc("lm_requests_total", agent=agent, model=self._model_name, status=status)
+            metrics.observe(
+                "lm_request_seconds",
+                time.perf_counter() - started,
+                agent=agent,
+                model=self._model_name,
+            )
+
+
+__all__ = ["MeteredModel", "current_agent_name"]
@@ -1,23 +1,93 @@
 from __future__ import annotations
 
-from typing import Dict, List, Literal, Optional
+import importlib.util
+import logging
+import threading
+import time
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, TypeVar
 
+import httpx
 from pydantic import BaseModel, ConfigDict
-from agents import AsyncOpenAI, OpenAIChatCompletionsModel, ModelSettings, OpenAIResponsesModel
-from agents.extensions.models.litellm_model import LitellmModel
+from agents import AsyncOpenAI, Model, ModelSettings, OpenAIChatCompletionsModel
+from openai import DefaultAsyncHttpxClient
 from openai.types.shared.reasoning import Reasoning
 
+from src.models.cache import CachedModel, get_completion_store
+from src.models.cassette import CassetteModel
+from src.models.limits import BackendLimiter, LimitedModel
+from src.models.metered import MeteredModel
+from src.models.prompt_cache import PromptCacheModel, SlotAffinity
+from src.metrics import metrics
 from src.setup import settings
+from src.utils.cassette import get_cassette
+
+logger = logging.getLogger("startup_researcher.models.registry")
 
 # Type alias for strict schema typing
 TokenizerName = Literal["cl100k_base", "o200k_base", "o200k_harmony", "approximate"]
 
+DEFAULT_REGISTRY_PATH = Path(__file__).with_name("models.toml")
+
+T = TypeVar("T")
+
+metrics.describe("lm_route_total", "counter", "Routing decisions by route, model and reason")
+metrics.describe("lm_failovers_total", "counter", "Model calls that failed over to the next model")
+
+
+class BackendConfig(BaseModel):
+    """One OpenAI-compatible endpoint and the HTTP pool used to reach it."""
+
+    kind: Literal["openai", "litellm"] = "openai"
+    base_url: Optional[str] = None
+    base_url_setting: Optional[str] = None
+    api_key_setting: str = "OPENAI_API_KEY"
+    max_connections: int = 32
+    max_keepalive_connections: int = 16
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    timeout: Optional[float] = None  # seconds; None keeps the OpenAI client default
+    # Request limits shared by every model and run on this backend; unset means none.
+    max_in_flight: Optional[int] = None
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    # Prompt caching (see src/models/prompt_cache.py): llama.cpp slot pinning, or
+    # the OpenAI ``prompt_cache_key`` routing hint.
+    llamacpp_slots: Optional[int] = None
+    prompt_cache_key: bool = False
+
+    def resolve_base_url(self) -> Optional[str]:
+        if self.base_url:
+            return self.base_url
+        if self.base_url_setting:
+            return getattr(settings, self.base_url_setting, None) or None
+        return None
+
+    def resolve_api_key(self) -> str:
+        return str(getattr(settings, self.api_key_setting, "") or "dummy")
+
+
+class RouteEntry(BaseModel):
+    """One candidate model of a route, in order of preference."""
+
+    model: str
+    max_prompt_tokens: Optional[int] = None  # skip for larger prompts
+    max_latency_seconds: Optional[float] = None  # demote while recent calls are slower
+
+
+class RouterConfig(BaseModel):
+    failure_threshold: int = 2  # consecutive failures before a model is benched
+    cooldown_seconds: float = 60.0
+    latency_alpha: float = 0.3  # weight of the latest call in the latency average
+
 
 class LMModelSpec(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     model_name: str
+    backend: str
     tokenizer_name: TokenizerName = "approximate"
-    client: AsyncOpenAI | Literal["litellm"]
     max_context_length: int
     max_output_tokens: Optional[int] = None
     supports_streaming: bool
@@ -26,14 +96,71 @@ class LMModelSpec(BaseModel):
     model_settings: ModelSettings
 
 
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
 class ModelRegistry:
-    def __init__(self):
-        self.models: Dict[str, LMModelSpec] = {}
+    """Registry of model specs and the backends that serve them.
+
+    ``loader`` registers backends and models on first access, so importing this
+    module does not read settings or files. Clients are built per backend on
+    first use; backends with the same base URL share one ``httpx`` pool.
+    """
+
+    def __init__(self, loader: Optional[Callable[[ModelRegistry], None]] = None):
+        self._models: Dict[str, LMModelSpec] = {}
+        self._backends: Dict[str, BackendConfig] = {}
+        self._routes: Dict[str, List[RouteEntry]] = {}
+        self.router_config = RouterConfig()
+        self._clients: Dict[str, AsyncOpenAI] = {}
+        self._default_client: Optional[AsyncOpenAI] = None
+        self._limiters: Dict[str, BackendLimiter] = {}
+        self._slot_affinity: Dict[str, SlotAffinity] = {}
+        self._pools: Dict[str, httpx.AsyncClient] = {}
+        self._loader = loader
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        if self._loader is None:
+            return
+        with self._lock:
+            if self._loader is not None:
+                loader, self._loader = self._loader, None
+                loader(self)
+
+    @property
+    def models(self) -> Dict[str, LMModelSpec]:
+        self._load()
+        return self._models
+
+    @property
+    def backends(self) -> Dict[str, BackendConfig]:
+        self._load()
+        return self._backends
+
+    @property
+    def routes(self) -> Dict[str, List[RouteEntry]]:
+        self._load()
+        return self._routes
+
+    def register_route(self, name: str, entries: List[RouteEntry]) -> None:
+        for entry in entries:
+            if entry.model not in self._models:
+                raise ValueError(f"Route {name} uses unregistered model {entry.model}")
+        self._routes[name] = entries
+
+    def register_backend(self, name: str, backend: BackendConfig) -> None:
+        if name in self._backends:
+            raise ValueError(f"Backend {name} already registered")
+        self._backends[name] = backend
 
     def register_model(self, model: LMModelSpec):
-        if model.model_name in self.models:
+        if model.model_name in self._models:
             raise ValueError(f"Model {model.model_name} already registered")
-        self.models[model.model_name] = model
+        if model.backend not in self._backends:
+            raise ValueError(f"Model {model.model_name} uses unknown backend {model.backend}")
+        self._models[model.model_name] = model
 
     def get_model(self, model_name: str) -> LMModelSpec:
         if model_name not in self.models:
@@ -45,102 +172,374 @@ class ModelRegistry:
     def list_models(self) -> List[str]:
         return list(self.models.keys())
 
+    def http_client(self, base_url: Optional[str]) -> httpx.AsyncClient:
+        """Shared connection pool for ``base_url``.
+
+        Pool limits come from the first registered backend with that URL, or
+        the ``BackendConfig`` defaults when no backend uses it.
+        """
+
+        key = (base_url or "").rstrip("/")
+        pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+
+        backend_name = self.backend_for_url(key)
+        config = self.backends[backend_name] if backend_name else BackendConfig()
+        http2 = config.http2
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested for %s but h2 is not installed; using HTTP/1.1", key)
+            http2 = False
+
+        options: dict[str, Any] = {
+            "limits": httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            "http2": http2,
+        }
+        if config.timeout is not None:
+            options["timeout"] = httpx.Timeout(config.timeout, connect=5.0)
+        pool = self._pools[key] = DefaultAsyncHttpxClient(**options)
+        logger.debug(
+            "HTTP pool for %s: max_connections=%d keepalive=%d http2=%s",
+            key,
+            config.max_connections,
+            config.max_keepalive_connections,
+            http2,
+        )
+        return pool
+
+    def get_client(self, backend_name: str) -> AsyncOpenAI:
+        client = self._clients.get(backend_name)
+        if client is None:
+            backend = self.backends[backend_name]
+            base_url = backend.resolve_base_url()
+            client = self._clients[backend_name] = AsyncOpenAI(
+                base_url=base_url,
+                api_key=backend.resolve_api_key(),
+                http_client=self.http_client(base_url),
+            )
+        return client
+
+    def default_client(self) -> AsyncOpenAI:
+        """Client for ``OPENAI_BASE_URL`` (e.g. an unregistered ``PARSE_LM``).
+
+        Shares the connection pool of any registered backend on the same base URL.
+        """
+
+        if self._default_client is None:
+            self._default_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                http_client=self.http_client(settings.OPENAI_BASE_URL),
+            )
+        return self._default_client
+
+    def backend_for_url(self, base_url: Optional[str]) -> Optional[str]:
+        key = (base_url or "").rstrip("/")
+        for name, backend in self.backends.items():
+            if (backend.resolve_base_url() or "").rstrip("/") == key:
+                return name
+        return None
+
+    def limiter(self, backend_name: str) -> BackendLimiter:
+        limiter = self._limiters.get(backend_name)
+        if limiter is None:
+            backend = self.backends[backend_name]
+            limiter = self._limiters[backend_name] = BackendLimiter(
+                backend_name,
+                max_in_flight=backend.max_in_flight,
+                requests_per_minute=backend.requests_per_minute,
+                tokens_per_minute=backend.tokens_per_minute,
+            )
+        return limiter
+
+    def slot_affinity(self, backend_name: str) -> Optional[SlotAffinity]:
+        slots = self.backends[backend_name].llamacpp_slots
+        if not slots:
+            return None
+        affinity = self._slot_affinity.get(backend_name)
+        if affinity is None:
+            affinity = self._slot_affinity[backend_name] = SlotAffinity(slots)
+        return affinity
+
+    async def aclose(self) -> None:
+        """Close the HTTP pools; clients are rebuilt on next use."""
+
+        pools = list(self._pools.values())
+        self._pools.clear()
+        self._clients.clear()
+        self._default_client = None
+        for pool in pools:
+            await pool.aclose()
+
+
+def _model_settings(table: dict[str, Any]) -> ModelSettings:
+    table = dict(table)
+    if isinstance(table.get("reasoning"), dict):
+        table["reasoning"] = Reasoning(**table["reasoning"])
+    return ModelSettings(**table)
+
+
+def load_registry_config(registry: ModelRegistry, path: Path | str) -> None:
+    """Register the ``[backends.*]`` and ``[models.*]`` tables of a TOML file."""
+
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+
+    for name, table in config.get("backends", {}).items():
+        registry.register_backend(name, BackendConfig(**table))
+    for name, table in config.get("models", {}).items():
+        table = dict(table)
+        table["model_settings"] = _model_settings(table.get("model_settings", {}))
+        registry.register_model(LMModelSpec(model_name=name, **table))
+    if "router" in config:
+        registry.router_config = RouterConfig(**config["router"])
+    for name, entries in config.get("routes", {}).items():
+        registry.register_route(name, [RouteEntry(**entry) for entry in entries])
+
+
+def _load_default_registry(registry: ModelRegistry) -> None:
+    path = settings.MODEL_REGISTRY_PATH or DEFAULT_REGISTRY_PATH
+    load_registry_config(registry, path)
+    logger.debug("Loaded model registry from %s: %s", path, registry.list_models())
+
 
 def get_model_from_spec(
     spec: LMModelSpec,
-) -> OpenAIChatCompletionsModel | LitellmModel | OpenAIResponsesModel:
-    if spec.client == "litellm":
-        return LitellmModel(
+    *,
+    cache: Optional[bool] = None,
+) -> Model:
+    """Build the SDK model for ``spec``.
+
+    ``PromptCacheModel`` keeps prompt prefixes cacheable (tool order, llama.cpp
+    slot affinity). Requests to the network go through the backend's
+    ``BackendLimiter`` when it has limits configured, so cache hits and replays
+    never wait for a slot.
+    With ``cache`` (default: ``settings.ENABLE_LM_CACHE``) the model is wrapped in
+    a ``CachedModel`` that replays deterministic completions from disk. When a
+    cassette is active (``settings.CASSETTE_MODE``) it wraps the result so every
+    request is recorded or replayed. The outermost ``MeteredModel`` records
+    latency and token usage per agent in ``src.metrics``.
+    """
+
+    backend = model_registry.backends[spec.backend]
+    if backend.kind == "litellm":
+        # litellm takes seconds to import, so only pay for it when a spec uses it.
+        from agents.extensions.models.litellm_model import LitellmModel
+
+        model = LitellmModel(
+            model=spec.model_name,
+            base_url=backend.resolve_base_url(),
+            api_key=backend.resolve_api_key(),
+        )
+    else:
+        model = OpenAIChatCompletionsModel(
+            openai_client=model_registry.get_client(spec.backend),
             model=spec.model_name,
-            base_url=settings.LLM_PROXY_BASE_URL,
-            api_key="dummy",
         )
 
-    model = OpenAIChatCompletionsModel(
-        openai_client=spec.client,
-        model=spec.model_name,
+    model = PromptCacheModel(
+        model,
+        spec.backend,
+        slots=model_registry.slot_affinity(spec.backend),
+        prompt_cache_key=backend.prompt_cache_key,
     )
+    limiter = model_registry.limiter(spec.backend)
+    if limiter.enabled:
+        model = LimitedModel(model, limiter)
 
-    return model
-
-
-# ** Model registry **
-# *** clients to be registered.
-llamacpp_client = AsyncOpenAI(base_url=settings.LLAMACPP_BASE_URL, api_key=settings.OPENAI_API_KEY)
-azure_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
-
-
-model_registry = ModelRegistry()
-
-# *** models to be registered. (TODO: perhaps we create a db for this? or a yaml?)
-OSS_CAP_TOTAL_TOKENS = 0.2  # 10%
-CAP_TOTAL_TOKENS = 0.1  # 10%
-
-model_registry.register_model(
-    LMModelSpec(
-        model_name="gpt-oss:20b",
-        client=llamacpp_client,
-        max_context_length=int(131_072 * OSS_CAP_TOTAL_TOKENS),
-        max_output_tokens=int(131_072 * OSS_CAP_TOTAL_TOKENS),
-        tokenizer_name="o200k_harmony",
-        supports_streaming=True,
-        supports_tool_calling=True,
-        supports_structured_output=True,
-        model_settings=ModelSettings(
-            temperature=0.0,
-            max_tokens=20_000,
-            reasoning=Reasoning(
-                effort="high",
-                summary=None,
-            ),
-        ),
-    )
-)
-
-model_registry.register_model(
-    LMModelSpec(
-        model_name="azure.gpt-5",
-        client=azure_client,
-        max_context_length=int(400_000 * CAP_TOTAL_TOKENS),
-        max_output_tokens=int(128_000 * CAP_TOTAL_TOKENS),
-        tokenizer_name="o200k_base",
-        supports_streaming=True,
-        supports_tool_calling=True,
-        supports_structured_output=True,
-        model_settings=ModelSettings(
-            parallel_tool_calls=False,
-            temperature=1.0,
-            # max_completion_tokens=4000, # needed for Azure gpt5
-            reasoning=Reasoning(
-                effort="low",
-                summary="auto",
-            ),
-        ),
-    )
-)
-
-
-model_registry.register_model(
-    LMModelSpec(
-        model_name="azure.gpt-5-nano",
-        client=azure_client,
-        max_context_length=int(400_000 * CAP_TOTAL_TOKENS),
-        max_output_tokens=int(400_000 * CAP_TOTAL_TOKENS),
-        tokenizer_name="o200k_base",
-        supports_streaming=True,
-        supports_tool_calling=True,
-        supports_structured_output=True,
-        model_settings=ModelSettings(
-            parallel_tool_calls=False,
-            temperature=1.0,
-            # max_completion_tokens=4000, # needed for Azure gpt5
-            reasoning=Reasoning(
-                effort="low",
-                summary="auto",
-            ),
-        ),
-    )
-)
+    if cache is None:
+        cache = settings.ENABLE_LM_CACHE
+    if cache:
+        model = CachedModel(model, spec.model_name, get_completion_store())
+
+    cassette = get_cassette()
+    if cassette is not None:
+        model = CassetteModel(model, spec.model_name, cassette)
+
+    return MeteredModel(model, spec.model_name)
+
+
+@dataclass(slots=True)
+class _ModelHealth:
+    latency: Optional[float] = None  # moving average of successful calls, seconds
+    failures: int = 0
+    benched_until: float = 0.0
+
+
+class ModelRouter:
+    """Pick the model for each call of a route, and fail over between them.
+
+    A route (``[[routes.<name>]]`` in the registry file) lists candidate models
+    in order of preference; the caller's default model is always appended as
+    the last resort. For every call, candidates that cannot serve it (prompt
+    too large, no structured output or tool calling) are dropped, and models
+    that recently failed or are slower than their ``max_latency_seconds`` are
+    moved to the back. Decisions are counted in ``lm_route_total``.
+    """
+
+    def __init__(self, registry: ModelRegistry) -> None:
+        self._registry = registry
+        self._health: Dict[str, _ModelHealth] = {}
+
+    def _state(self, model_name: str) -> _ModelHealth:
+        health = self._health.get(model_name)
+        if health is None:
+            health = self._health[model_name] = _ModelHealth()
+        return health
+
+    def has_route(self, route: str, default_model: str) -> bool:
+        """Whether calls of ``route`` are routed; else callers use ``default_model`` directly.
+
+        Routing needs a configured route and a registered default, so a default
+        that is not in the registry (e.g. any PARSE_LM the endpoint serves)
+        keeps working as before.
+        """
+
+        if not self._registry.routes.get(route):
+            return False
+        if default_model not in self._registry.models:
+            logger.debug("Not routing %s: %s is not registered", route, default_model)
+            return False
+        return True
+
+    def candidates(
+        self,
+        route: str,
+        default_model: str,
+        *,
+        prompt_tokens: int,
+        structured: bool = False,
+        tools: bool = False,
+        stream: bool = False,
+    ) -> list[tuple[LMModelSpec, str]]:
+        """Models to try in order, each with the reason it is in that position."""
+
+        entries = [*self._registry.routes.get(route, []), RouteEntry(model=default_model)]
+        # Latency varies between recording and replay, so a cassette routes on size only.
+        latency_aware = get_cassette() is None
+        now = time.monotonic()
+
+        preferred: list[tuple[LMModelSpec, str]] = []
+        demoted: list[tuple[LMModelSpec, str]] = []
+        skipped: Optional[str] = None
+        seen: set[str] = set()
+        for entry in entries:
+            if entry.model in seen:
+                continue
+            seen.add(entry.model)
+            spec = self._registry.get_model(entry.model)
+            is_default = entry.model == default_model
+
+            if (structured and not spec.supports_structured_output) or (
+                tools and not spec.supports_tool_calling
+            ) or (stream and not spec.supports_streaming):
+                skipped = skipped or "capability"
+                if not is_default:
+                    continue
+            limit = min(entry.max_prompt_tokens or spec.max_context_length, spec.max_context_length)
+            if prompt_tokens > limit and not is_default:
+                skipped = skipped or "size"
+                continue
+
+            health = self._state(entry.model)
+            demotion: Optional[str] = None
+            if health.benched_until > now:
+                demotion = "unhealthy"
+            elif (
+                latency_aware
+                and entry.max_latency_seconds is not None
+                and health.latency is not None
+                and health.latency > entry.max_latency_seconds
+            ):
+                demotion = "slow"
+            if demotion is None:
+                preferred.append((spec, skipped or "preferred"))
+            else:
+                demoted.append((spec, demotion))
+                if not preferred:
+                    skipped = skipped or demotion
+
+        return preferred + demoted
+
+    def record_success(self, model_name: str, seconds: float) -> None:
+        health = self._state(model_name)
+        alpha = self._registry.router_config.latency_alpha
+        health.latency = (
+            seconds if health.latency is None else alpha * seconds + (1 - alpha) * health.latency
+        )
+        health.failures = 0
+        health.benched_until = 0.0
+
+    def record_failure(self, route: str, model_name: str, exc: BaseException) -> None:
+        config = self._registry.router_config
+        health = self._state(model_name)
+        health.failures += 1
+        metrics.inc("lm_failovers_total", route=route, model=model_name)
+        if health.failures >= config.failure_threshold:
+            health.benched_until = time.monotonic() + config.cooldown_seconds
+            logger.warning(
+                "Model %s failed %d times; benched for %.0fs: %s",
+                model_name,
+                health.failures,
+                config.cooldown_seconds,
+                exc,
+            )
+        else:
+            logger.warning("Model %s failed on route %s: %s", model_name, route, exc)
+
+    async def call(
+        self,
+        route: str,
+        default_model: str,
+        fn: Callable[[LMModelSpec], Awaitable[T]],
+        *,
+        prompt_tokens: int,
+        structured: bool = False,
+        tools: bool = False,
+    ) -> T:
+        """Call ``fn`` with the routed model, failing over to the next on errors."""
+
+        candidates = self.candidates(
+            route, default_model, prompt_tokens=prompt_tokens, structured=structured, tools=tools
+        )
+        for i, (spec, reason) in enumerate(candidates):
+            metrics.inc(
+                "lm_route_total",
+                route=route,
+                model=spec.model_name,
+                reason="failover" if i else reason,
+            )
+            started = time.monotonic()
+            try:
+                result = await fn(spec)
+            except Exception as exc:
+                self.record_failure(route, spec.model_name, exc)
+                if i == len(candidates) - 1:
+                    raise
+                continue
+            self.record_success(spec.model_name, time.monotonic() - started)
+            return result
+        raise AssertionError("unreachable: a route always has its default model")
+
+
+def get_routed_model(route: str, default_model: str) -> Model:
+    """SDK model for an agent: routed when ``route`` is configured, else ``default_model``."""
+
+    default_spec = model_registry.get_model(default_model)
+    if not model_router.has_route(route, default_model):
+        return get_model_from_spec(default_spec)
+
+    from src.models.routed import RoutedModel  # imports src.mem.tokens, which imports us
+
+    return RoutedModel(route, default_spec, model_router, get_model_from_spec)
+
+
+model_registry = ModelRegistry(loader=_load_default_registry)
+model_router = ModelRouter(model_registry)
 
 
-__all__ = ["model_registry"]
+__all__ = ["get_routed_model", "model_registry", "model_router"]
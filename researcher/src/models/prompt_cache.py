@@ -0,0 +1,174 @@
+"""Keep prompt prefixes reusable by the backend's prompt cache.
+
+Every agent resends the same large prefix (instructions and tool schemas) on
+each turn. ``PromptCacheModel`` keeps that prefix byte-stable by sending tools
+in name order, and tells the backend where the prefix was cached before:
+
+- llama.cpp (``llamacpp_slots`` on the backend): requests carry
+  ``cache_prompt`` and an ``id_slot`` from ``SlotAffinity``, which keeps a
+  run's requests for one agent on the slot whose KV cache already holds that
+  conversation, or else on a free slot that last served the same agent.
+- OpenAI-style providers (``prompt_cache_key`` on the backend): requests
+  carry the agent name as ``prompt_cache_key`` so they are routed to the
+  cache holding that agent's prefix.
+
+Hit rates follow from ``lm_cached_input_tokens_total`` over
+``lm_input_tokens_total``; slot choices are counted in ``lm_prompt_slot_total``.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from agents import ModelSettings
+from agents.items import ModelResponse, TResponseStreamEvent
+from agents.models.interface import Model
+
+from src.metrics import current_run_id, metrics
+from src.models.metered import current_agent_name
+
+metrics.describe("lm_prompt_slot_total", "counter", "llama.cpp slot choices by affinity")
+
+
+class SlotAffinity:
+    """Assign llama.cpp slots so requests land where their prefix is cached.
+
+    A slot's KV cache holds the last prompt it processed, so a request goes,
+    in order of preference, to: the free slot that last served the same run
+    and agent (``sticky``), a free slot that last served the same agent
+    (``agent``), the least recently used free slot (``lru``), or, when all are
+    busy, the slot it would have been sticky to or the least loaded (``busy``).
+    """
+
+    def __init__(self, slots: int) -> None:
+        self._slots = slots
+        self._in_use = [0] * slots
+        self._owner: list[Optional[tuple[str, str]]] = [None] * slots
+        self._last_used = [0.0] * slots
+
+    def acquire(self, run_id: str, agent: str) -> tuple[int, str]:
+        key = (run_id, agent)
+        slots = range(self._slots)
+        free = [i for i in slots if not self._in_use[i]]
+        sticky = [i for i in slots if self._owner[i] == key]
+
+        if free:
+            same_run = [i for i in free if i in sticky]
+            same_agent = [i for i in free if (self._owner[i] or ("", ""))[1] == agent]
+            if same_run:
+                slot, affinity = same_run[0], "sticky"
+            elif same_agent:
+                slot, affinity = max(same_agent, key=lambda i: self._last_used[i]), "agent"
+            else:
+                slot, affinity = min(free, key=lambda i: self._last_used[i]), "lru"
+        elif sticky:
+            slot, affinity = sticky[0], "busy"
+        else:
+            slot, affinity = min(slots, key=lambda i: self._in_use[i]), "busy"
+
+        self._in_use[slot] += 1
+        self._owner[slot] = key
+        self._last_used[slot] = time.monotonic()
+        return slot, affinity
+
+    def release(self, slot: int) -> None:
+        self._in_use[slot] -= 1
+
+
+def _by_name(tools: list[Any]) -> list[Any]:
+    return sorted(tools, key=lambda t: getattr(t, "name", ""))
+
+
+class PromptCacheModel(Model):
+    def __init__(
+        self,
+        model: Model,
+        backend: str,
+        *,
+        slots: Optional[SlotAffinity] = None,
+        prompt_cache_key: bool = False,
+    ) -> None:
+        self._model = model
+        self._backend = backend
+        self._slots = slots
+        self._prompt_cache_key = prompt_cache_key
+
+    @contextmanager
+    def _request_settings(self, model_settings: ModelSettings) -> Iterator[ModelSettings]:
+        extra: dict[str, Any] = {}
+        agent = current_agent_name()
+        if self._prompt_cache_key:
+            extra["prompt_cache_key"] = agent
+        if self._slots is None:
+            yield _with_extra_body(model_settings, extra)
+            return
+
+        slot, affinity = self._slots.acquire(current_run_id(), agent)
+        metrics.inc(
+            "lm_prompt_slot_total", backend=self._backend, slot=str(slot), affinity=affinity
+        )
+        extra.update(cache_prompt=True, id_slot=slot)
+        try:
+            yield _with_extra_body(model_settings, extra)
+        finally:
+            self._slots.release(slot)
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        with self._request_settings(model_settings) as request_settings:
+            return await self._model.get_response(
+                system_instructions,
+                input,
+                request_settings,
+                _by_name(tools),
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            )
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        with self._request_settings(model_settings) as request_settings:
+            async for event in self._model.stream_response(
+                system_instructions,
+                input,
+                request_settings,
+                _by_name(tools),
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            ):
+                yield event
+
+
+def _with_extra_body(model_settings: ModelSettings, extra: dict[str, Any]) -> ModelSettings:
+    if not extra:
+        return model_settings
+    body = model_settings.extra_body if isinstance(model_settings.extra_body, dict) else {}
+    return dataclasses.replace(model_settings, extra_body={**body, **extra})
+
+
+__all__ = ["PromptCacheModel", "SlotAffinity"]
@@ -0,0 +1,160 @@
+"""Model that routes each request of an agent through ``ModelRouter``.
+
+The agent is built with its default model's settings. When a request is routed
+to another model, that model's own settings (temperature, reasoning, token
+limits) are used, and only the fields describing the request itself (tool
+choice, extra headers/body, ...) are carried over from the agent.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable
+
+from agents import ModelSettings
+from agents.items import ModelResponse, TResponseStreamEvent
+from agents.models.interface import Model
+
+from src.mem.tokens import count_tokens
+from src.metrics import metrics
+from src.models.limits import prompt_text
+
+if TYPE_CHECKING:
+    from src.models.model_register import LMModelSpec, ModelRouter
+
+# ModelSettings fields that describe the request rather than the model.
+_REQUEST_FIELDS = (
+    "tool_choice",
+    "parallel_tool_calls",
+    "metadata",
+    "store",
+    "include_usage",
+    "response_include",
+    "extra_query",
+    "extra_body",
+    "extra_headers",
+    "extra_args",
+)
+
+
+class RoutedModel(Model):
+    def __init__(
+        self,
+        route: str,
+        default_spec: LMModelSpec,
+        router: ModelRouter,
+        build: Callable[[LMModelSpec], Model],
+    ) -> None:
+        self._route = route
+        self._default = default_spec
+        self._router = router
+        self._build = build
+        self._models: dict[str, Model] = {}
+
+    def _model(self, spec: LMModelSpec) -> Model:
+        model = self._models.get(spec.model_name)
+        if model is None:
+            model = self._models[spec.model_name] = self._build(spec)
+        return model
+
+    def _settings(
+        self, spec: LMModelSpec, requested: ModelSettings, tools: list[Any]
+    ) -> ModelSettings:
+        if spec.model_name == self._default.model_name:
+            return requested
+        overrides = {f: getattr(requested, f) for f in _REQUEST_FIELDS}
+        overrides = {f: v for f, v in overrides.items() if v is not None}
+        if not tools:
+            # Chat Completions rejects parallel_tool_calls without tools.
+            overrides["parallel_tool_calls"] = None
+        return dataclasses.replace(spec.model_settings, **overrides)
+
+    def _route_args(self, system_instructions, input, tools, output_schema) -> dict[str, Any]:
+        text = prompt_text(system_instructions, input, tools)
+        return {
+            "prompt_tokens": count_tokens(text, self._default),
+            "structured": output_schema is not None and not output_schema.is_plain_text(),
+            "tools": bool(tools),
+        }
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        async def _call(spec: LMModelSpec) -> ModelResponse:
+            return await self._model(spec).get_response(
+                system_instructions,
+                input,
+                self._settings(spec, model_settings, tools),
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            )
+
+        return await self._router.call(
+            self._route,
+            self._default.model_name,
+            _call,
+            **self._route_args(system_instructions, input, tools, output_schema),
+        )
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        candidates = self._router.candidates(
+            self._route,
+            self._default.model_name,
+            stream=True,
+            **self._route_args(system_instructions, input, tools, output_schema),
+        )
+        for i, (spec, reason) in enumerate(candidates):
+            metrics.inc(
+                "lm_route_total",
+                route=self._route,
+                model=spec.model_name,
+                reason="failover" if i else reason,
+            )
+            started = time.monotonic()
+            streamed = False
+            try:
+                async for event in self._model(spec).stream_response(
+                    system_instructions,
+                    input,
+                    self._settings(spec, model_settings, tools),
+                    tools,
+                    output_schema,
+                    handoffs,
+                    tracing,
+                    **kwargs,
+                ):
+                    streamed = True
+                    yield event
+            except Exception as exc:
+                self._router.record_failure(self._route, spec.model_name, exc)
+                # Once events reached the caller the request cannot be retried elsewhere.
+                if streamed or i == len(candidates) - 1:
+                    raise
+                continue
+            self._router.record_success(spec.model_name, time.monotonic() - started)
+            return
+
+
+__all__ = ["RoutedModel"]
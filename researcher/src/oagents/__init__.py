@@ -5,6 +5,8 @@ from typing import Optional
 from agents import Agent
 from agents.mcp import MCPServer
 
+from src.flows.budget import with_budget
+
 from .startup_funding_agent import get_startup_funding_agent
 from .manager import get_manager_agent
 from .condense_agent import get_condense_agent
@@ -12,10 +14,10 @@ from .input_parser import parse_input
 
 
 def get_agents(mcp_servers: Optional[list[MCPServer]] = None) -> tuple[Agent, Agent, Agent]:
-    """Yields the agents necessary for the research flow"""
-    research_agent = get_startup_funding_agent(mcp_servers=mcp_servers)
-    manager_agent = get_manager_agent(research_agent=research_agent)
-    condense_agent = get_condense_agent()
+    """Yields the agents necessary for the research flow, each charging the run budget"""
+    research_agent = with_budget(get_startup_funding_agent(mcp_servers=mcp_servers))
+    manager_agent = with_budget(get_manager_agent(research_agent=research_agent))
+    condense_agent = with_budget(get_condense_agent())
 
     return research_agent, manager_agent, condense_agent
 
@@ -2,14 +2,12 @@ from __future__ import annotations
 
 from agents import Agent
 
-from src.models.model_register import get_model_from_spec, model_registry
+from src.models.model_register import get_routed_model, model_registry
 from src.setup import settings
 from src.types import CompanyFundingSearchResults
 
 __all__ = ["get_condense_agent"]
 
-model = model_registry.get_model(settings.RESEARCH_LM)
-
 
 CONDENSE_INSTRUCTIONS = """
 You are specifically given the task of condensely researching startup firms, particularly related to funding activities.
@@ -26,13 +24,14 @@ def get_condense_agent() -> Agent:
     """
     Get condense agent, which is responsible for condensing the research process.
     """
+    model = model_registry.get_model(settings.RESEARCH_LM)
     # set parallel tool calls to none, when no tools are provided
     model_settings = model.model_settings
     model_settings.parallel_tool_calls = None
     return Agent(
         name="CondenseAgent",
         instructions=CONDENSE_INSTRUCTIONS,
-        model=get_model_from_spec(model),
+        model=get_routed_model("condense", model.model_name),
         model_settings=model_settings,
         output_type=CompanyFundingSearchResults,
     )
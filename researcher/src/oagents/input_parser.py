@@ -1,17 +1,23 @@
+import functools
+import hashlib
+import json
 import logging
+import os
+from contextlib import nullcontext
+from typing import Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
+from src.metrics import record_lm_usage
+from src.mem.tokens import approx_count
+from src.models.model_register import LMModelSpec, model_registry, model_router
 from src.types import SearchInput
 from src.setup import settings
+from src.utils.cassette import get_cassette
+from src.utils.disk_cache import SQLiteCache
 
 logger = logging.getLogger("startup_researcher.input_parser")
 
-client = OpenAI(
-    api_key=settings.OPENAI_API_KEY,
-    base_url=settings.OPENAI_BASE_URL,
-)
-
 
 _PARSE_INSTRUCTIONS = """
 You are an input parser for a startup funding research flow.
@@ -19,19 +25,130 @@ You are given a user input and you need to parse it into a SearchInput object.
 This object is used to guide the search agents later on in the process.
 """
 
+_parse_cache: Optional[SQLiteCache] = None
 
-def parse_input(input: str) -> SearchInput:
-    try:
-        response = client.chat.completions.parse(
-            model=settings.PARSE_LM,
-            messages=[
-                {"role": "system", "content": _PARSE_INSTRUCTIONS},
-                {"role": "user", "content": input},
-            ],
-            response_format=SearchInput,
+
+def _get_parse_cache() -> SQLiteCache:
+    global _parse_cache
+
+    if _parse_cache is None:
+        _parse_cache = SQLiteCache(
+            os.path.join(settings.CACHE_DIR, "parsed_queries.sqlite3"),
+            namespace="parsed_queries",
+            ttl_seconds=settings.PARSE_CACHE_TTL_SECONDS,
+            max_entries=10_000,
         )
+    return _parse_cache
+
+
+@functools.cache
+def _parser_version() -> str:
+    """Hash of the instructions and the SearchInput schema the parser fills in."""
+
+    schema = json.dumps(SearchInput.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(f"{_PARSE_INSTRUCTIONS}\x1f{schema}".encode("utf-8")).hexdigest()
+
+
+def _parse_cache_key(input: str) -> str:
+    # Edits to the parser model, instructions or SearchInput invalidate old entries, so
+    # e.g. entries parsed before a field was added are not served without it.
+    normalized = " ".join(input.split()).casefold()
+    payload = f"{settings.PARSE_LM}\x1f{_parser_version()}\x1f{normalized}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _request_parse(input: str) -> SearchInput:
+    prompt_tokens = approx_count(_PARSE_INSTRUCTIONS) + approx_count(input)
+    if not model_router.has_route("parse", settings.PARSE_LM):
+        backend = model_registry.backend_for_url(settings.OPENAI_BASE_URL)
+        client = model_registry.default_client()
+        return await _parse_with(client, settings.PARSE_LM, backend, input, prompt_tokens)
+
+    async def _call(spec: LMModelSpec) -> SearchInput:
+        client = model_registry.get_client(spec.backend)
+        return await _parse_with(client, spec.model_name, spec.backend, input, prompt_tokens)
+
+    return await model_router.call(
+        "parse", settings.PARSE_LM, _call, prompt_tokens=prompt_tokens, structured=True
+    )
+
+
+async def _parse_with(
+    client: AsyncOpenAI,
+    model_name: str,
+    backend: Optional[str],
+    input: str,
+    prompt_tokens: int,
+) -> SearchInput:
+    # Parsing shares the backend's request limits with the agents.
+    limiter = model_registry.limiter(backend) if backend else None
+    try:
+        async with limiter.slot(prompt_tokens) if limiter else nullcontext() as lease:
+            response = await client.chat.completions.parse(
+                model=model_name,
+                messages=[
+                    {"role": "system", "content": _PARSE_INSTRUCTIONS},
+                    {"role": "user", "content": input},
+                ],
+                response_format=SearchInput,
+            )
+            if lease is not None and response.usage is not None:
+                lease.charge(response.usage.total_tokens)
     except Exception as exc:
         logger.exception("Error parsing input: %s", exc)
         raise
 
-    return response.choices[0].message.parsed
+    if response.usage is not None:
+        usage = response.usage
+        prompt_details, completion_details = (
+            usage.prompt_tokens_details,
+            usage.completion_tokens_details,
+        )
+        record_lm_usage(
+            "InputParser",
+            model_name,
+            input_tokens=usage.prompt_tokens,
+            cached_tokens=getattr(prompt_details, "cached_tokens", None) or 0,
+            output_tokens=usage.completion_tokens,
+            reasoning_tokens=getattr(completion_details, "reasoning_tokens", None) or 0,
+        )
+
+    search_input = response.choices[0].message.parsed
+    if search_input is None:
+        msg = f"Input parser returned no SearchInput (refusal={response.choices[0].message.refusal!r})"
+        raise ValueError(msg)
+    return search_input
+
+
+async def parse_input(input: str, *, use_cache: bool = True) -> SearchInput:
+    cassette = get_cassette()
+    # A cassette must see every parse, so the local parse cache is skipped while one is active.
+    cache = _get_parse_cache() if use_cache and cassette is None else None
+    key = _parse_cache_key(input)
+
+    if cache is not None:
+        cached = await cache.aget(key)
+        if cached is not None:
+            try:
+                search_input = SearchInput.model_validate_json(cached)
+            except Exception as exc:
+                logger.warning("Parsed query cache entry invalid, re-parsing: %s", exc)
+            else:
+                logger.info("Parsed query cache hit")
+                return search_input
+
+    if cassette is None:
+        search_input = await _request_parse(input)
+    else:
+        # The key covers the SearchInput schema, so edits to it surface as cassette misses.
+        search_input = await cassette.exchange(
+            "parse",
+            key,
+            lambda: _request_parse(input),
+            lambda parsed: parsed.model_dump(mode="json"),
+            SearchInput.model_validate,
+        )
+
+    if cache is not None:
+        await cache.aset(key, search_input.model_dump_json().encode("utf-8"))
+    return search_input
@@ -2,14 +2,13 @@ from __future__ import annotations
 
 from agents import Agent
 
-from src.models.model_register import get_model_from_spec, model_registry
+from src.flows.budget import within_soft_budget
+from src.models.model_register import get_routed_model, model_registry
 from src.setup import settings
 from src.types import CompanyFundingSearchResults
 
 __all__ = ["get_manager_agent"]
 
-model = model_registry.get_model(settings.RESEARCH_LM)
-
 
 MANAGER_INSTRUCTIONS = """
 You are a manager agent that is responsible for delivering the final output to the user containing the research findings for a given query.
@@ -29,17 +28,20 @@ def get_manager_agent(research_agent: Agent) -> Agent:
     """
     Get manager agent, which is responsible for managing the research process.
     """
+    model = model_registry.get_model(settings.RESEARCH_LM)
 
     return Agent(
         name="ManagerAgent",
         instructions=MANAGER_INSTRUCTIONS,
         handoff_description="Manager agent that is responsible for delivering the final output to the user containing the research findings for a given query.",
-        model=get_model_from_spec(model),
+        model=get_routed_model("manager", model.model_name),
         model_settings=model.model_settings,
         tools=[
             research_agent.as_tool(
                 tool_name="research_agent",
                 tool_description="Research agent that is responsible for researching the given query.",
+                # Hidden once the run budget's soft limit is reached, so the manager finalizes.
+                is_enabled=within_soft_budget,
             )
         ],
         # handoffs=[research_agent],
@@ -7,7 +7,7 @@ from agents.mcp import MCPServer
 from pydantic import BaseModel
 
 from src.types import CompanyFundingDigest
-from src.models.model_register import get_model_from_spec, model_registry
+from src.models.model_register import get_routed_model, model_registry
 from src.setup import settings
 
 
@@ -43,9 +43,6 @@ Important, you will get more specific instructions from the manager agent on how
 """
 
 
-model = model_registry.get_model(settings.RESEARCH_LM)
-
-
 class FundingEvent(BaseModel):
     company: str
     lead_investor: str
@@ -60,11 +57,12 @@ class SimplifiedCompanyFundingSearchResults(BaseModel):
 
 
 def get_startup_funding_agent(mcp_servers: Optional[list[MCPServer]] = None):
+    model = model_registry.get_model(settings.RESEARCH_LM)
     startup_funding_agent = Agent(
         name="StartupFundingResearcher",
         handoff_description="Startup Funding Research agent with search tools and a strategic research plan.",
         instructions=_AGENT_INSTRUCTIONS,
-        model=get_model_from_spec(model),
+        model=get_routed_model("research", model.model_name),
         model_settings=model.model_settings,
         mcp_servers=mcp_servers,
         output_type=List[CompanyFundingDigest],
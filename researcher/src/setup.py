@@ -1,4 +1,5 @@
-from typing import Optional
+from functools import cache
+from typing import Any, Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -11,6 +12,8 @@ class Settings(BaseSettings):
 
     PARSE_LM: str
     RESEARCH_LM: str
+    # TOML model registry; defaults to src/models/models.toml
+    MODEL_REGISTRY_PATH: Optional[str] = None
 
     BRAINTRUST_PROJECT_NAME: str
     BRAINTRUST_API_KEY: str
@@ -20,9 +23,65 @@ class Settings(BaseSettings):
     EXA_API_KEY: str
 
     DATABASE_URL: str
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+
+    # Local on-disk caches (kept under data/ so they persist via the docker volume)
+    CACHE_DIR: str = "data/cache"
+    ENABLE_MCP_CACHE: bool = True
+    MCP_CACHE_TTL_SECONDS: float = 24 * 60 * 60
+    MCP_CACHE_MAX_ENTRIES: int = 5_000
+    MCP_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    PARSE_CACHE_TTL_SECONDS: float = 7 * 24 * 60 * 60
+    CHECKPOINT_TTL_SECONDS: float = 7 * 24 * 60 * 60
+    ENABLE_LM_CACHE: bool = False
+    LM_CACHE_MAX_ENTRIES: int = 2_000
+    LM_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # Record/replay of MCP and model traffic (see src/utils/cassette.py)
+    CASSETTE_MODE: Optional[Literal["record", "replay"]] = None
+    CASSETTE_PATH: str = "data/cassettes/run.jsonl.gz"
+    CASSETTE_REPLAY_LATENCY: Literal["original", "zero"] = "original"
+
+    # Research fan-out (see src/flows/fanout.py): long periods get wider shards beyond this
+    FANOUT_MAX_SHARDS: int = 8
+
+    # Per-run budget across all agents (see src/flows/budget.py); unset means unlimited
+    RUN_MAX_TOKENS: Optional[int] = None
+    RUN_MAX_TURNS: Optional[int] = None
+    RUN_MAX_SECONDS: Optional[float] = None
+    RUN_BUDGET_SOFT_FRACTION: float = 0.8
+
+    # Prometheus-style metrics export (see src/metrics.py)
+    METRICS_FILE: Optional[str] = None
+    METRICS_PORT: Optional[int] = None
 
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
+@cache
+def get_settings() -> Settings:
+    """Load ``Settings`` from the environment and ``.env`` once, on first use."""
+
+    return Settings()
+
+
+class _LazySettings:
+    """Module-level ``settings`` that defers loading until an attribute is read.
+
+    Importing a module that uses ``settings`` therefore costs nothing, and
+    ``--help`` works without a complete ``.env``.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
@@ -22,6 +22,14 @@ class SearchInput(BaseModel):
         ),
     ]
     max_count: Annotated[int, Field(..., strict=True, gt=1)]
+    period_start: Annotated[
+        Optional[date],
+        Field(default=None, description="First day of the reporting period, if the query names one"),
+    ]
+    period_end: Annotated[
+        Optional[date],
+        Field(default=None, description="Last day of the reporting period, if the query names one"),
+    ]
 
 
 class Investor(BaseModel):
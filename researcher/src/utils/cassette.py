@@ -0,0 +1,199 @@
+"""Record/replay cassettes for MCP and model traffic.
+
+In ``record`` mode every exchange that goes through ``Cassette.exchange`` (or
+``Cassette.stream`` for streamed model responses) is captured together with
+its latency; ``save`` writes them to a gzipped JSONL file. In ``replay`` mode
+the same calls are answered from the file without touching the network,
+either with the recorded latency (``original``) or none at all (``zero``).
+
+Exchanges are matched on a content key (tool name and arguments, or the full
+model request including instructions, tools and output schema), so editing
+``types.py`` or an agent's instructions shows up as a ``CassetteMiss`` rather
+than a silently different run. Identical requests are answered in recorded
+order; once a key's recordings are used up its last response is repeated.
+
+Enable it with ``CASSETTE_MODE=record|replay`` and ``CASSETTE_PATH``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Optional, TypeVar
+
+from src.setup import settings
+
+_LOGGER = logging.getLogger("startup_researcher.utils.cassette")
+
+T = TypeVar("T")
+CassetteMode = Literal["record", "replay"]
+ReplayLatency = Literal["original", "zero"]
+
+_FORMAT_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    def __init__(
+        self,
+        path: str | Path,
+        mode: CassetteMode,
+        *,
+        latency: ReplayLatency = "original",
+    ) -> None:
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.meta: dict[str, Any] = {}
+        self._entries: list[dict[str, Any]] = []
+        self._replay: dict[tuple[str, str], deque[dict[str, Any]]] = {}
+        self.misses = 0
+        if mode == "replay":
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != _FORMAT_VERSION:
+                msg = f"Unsupported cassette version {header.get('version')!r}: {self.path}"
+                raise ValueError(msg)
+            self.meta = header.get("meta", {})
+            self._entries = [json.loads(line) for line in f]
+        self.rewind()
+        _LOGGER.info("Loaded cassette %s (%d keys)", self.path, len(self._replay))
+
+    def rewind(self) -> None:
+        """Start replaying from the first recorded exchange again."""
+
+        replay: dict[tuple[str, str], deque[dict[str, Any]]] = defaultdict(deque)
+        for entry in self._entries:
+            replay[(entry["kind"], entry["key"])].append(entry)
+        self._replay = dict(replay)
+
+    def _take(self, kind: str, key: str) -> dict[str, Any]:
+        recorded = self._replay.get((kind, key))
+        if not recorded:
+            self.misses += 1
+            msg = (
+                f"No recorded {kind} exchange for key {key[:12]}; the request changed "
+                "(instructions, tools, output schema or arguments) since the cassette was recorded"
+            )
+            raise CassetteMiss(msg)
+        return recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+    async def _sleep(self, seconds: float) -> None:
+        if self.latency == "original" and seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def exchange(
+        self,
+        kind: str,
+        key: str,
+        fetch: Callable[[], Awaitable[T]],
+        encode: Callable[[T], Any],
+        decode: Callable[[Any], T],
+    ) -> T:
+        """Run ``fetch`` (recording its result) or answer it from the cassette."""
+
+        if self.replaying:
+            entry = self._take(kind, key)
+            await self._sleep(entry["elapsed"])
+            return decode(entry["response"])
+
+        started = time.perf_counter()
+        result = await fetch()
+        self._entries.append(
+            {
+                "kind": kind,
+                "key": key,
+                "elapsed": round(time.perf_counter() - started, 4),
+                "response": encode(result),
+            }
+        )
+        return result
+
+    async def stream(
+        self,
+        kind: str,
+        key: str,
+        fetch: Callable[[], AsyncIterator[T]],
+        encode: Callable[[T], Any],
+        decode: Callable[[Any], T],
+    ) -> AsyncIterator[T]:
+        """Streaming counterpart of ``exchange``; event timing is kept per event."""
+
+        if self.replaying:
+            entry = self._take(kind, key)
+            previous = 0.0
+            for offset, event in entry["events"]:
+                await self._sleep(offset - previous)
+                previous = offset
+                yield decode(event)
+            return
+
+        started = time.perf_counter()
+        events: list[tuple[float, Any]] = []
+        async for event in fetch():
+            events.append((round(time.perf_counter() - started, 4), encode(event)))
+            yield event
+        self._entries.append({"kind": kind, "key": key, "events": events})
+
+    def save(self) -> None:
+        if self.replaying:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": _FORMAT_VERSION, "meta": self.meta}) + "\n")
+            for entry in self._entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        _LOGGER.info("Saved cassette %s (%d exchanges)", self.path, len(self._entries))
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the process-wide cassette configured in settings, or ``None``."""
+
+    global _cassette
+
+    if _cassette is None and settings.CASSETTE_MODE:
+        _cassette = Cassette(
+            settings.CASSETTE_PATH,
+            settings.CASSETTE_MODE,
+            latency=settings.CASSETTE_REPLAY_LATENCY,
+        )
+    return _cassette
+
+
+def set_cassette(cassette: Optional[Cassette]) -> None:
+    global _cassette
+    _cassette = cassette
+
+
+def close_cassette() -> None:
+    """Write a recording cassette to disk; safe to call when none is active."""
+
+    if _cassette is not None:
+        _cassette.save()
+
+
+__all__ = [
+    "Cassette",
+    "CassetteMiss",
+    "close_cassette",
+    "get_cassette",
+    "set_cassette",
+]
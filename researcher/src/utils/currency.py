@@ -1,3 +1,4 @@
+import functools
 import json
 from pathlib import Path
 from pydantic import BaseModel
@@ -25,13 +26,17 @@ def generate_currency_dict() -> dict[str, str]:
     return currency_dict
 
 
-def _load_currency_codes() -> set[str]:
+@functools.cache
+def _load_currency_codes() -> frozenset[str]:
     currency_path = Path("data/currency/currency_dict.json")
     if not currency_path.exists():
-        generate_currency_dict()
-    else:
-        data = json.loads(currency_path.read_text())
-        return set(data.keys())
+        return frozenset(generate_currency_dict())
+    data = json.loads(currency_path.read_text())
+    return frozenset(data.keys())
 
 
-CURRENCY_CODES = _load_currency_codes()
+def __getattr__(name: str):
+    # ``CURRENCY_CODES`` reads data files, so it is loaded on first access.
+    if name == "CURRENCY_CODES":
+        return _load_currency_codes()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
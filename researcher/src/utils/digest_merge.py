@@ -0,0 +1,210 @@
+"""Deterministic dedup/merge of ``CompanyFundingDigest`` records.
+
+Digests describe the same company when their website domains match or, if a
+domain is missing, when their normalised names match. Merged digests keep the
+first non-empty company fields, merge funding events that share a round and
+an announcement date (within ``EVENT_DATE_TOLERANCE``), and union investors,
+source documents and related links.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from datetime import timedelta
+from typing import Iterable, Optional, Sequence
+from urllib.parse import urlsplit
+
+from src.types import (
+    Company,
+    CompanyFundingDigest,
+    FundingEvent,
+    Investor,
+    SourceDocument,
+)
+
+# Outlets report the same round a few days apart; treat those as one event.
+EVENT_DATE_TOLERANCE = timedelta(days=7)
+
+_LEGAL_SUFFIXES = (
+    "aps",
+    "a/s",
+    "as",
+    "ivs",
+    "p/s",
+    "ab",
+    "oy",
+    "gmbh",
+    "bv",
+    "sas",
+    "ltd",
+    "limited",
+    "inc",
+    "llc",
+    "corp",
+    "corporation",
+    "plc",
+)
+_SUFFIX_RE = re.compile(r"[\s,]+(?:" + "|".join(re.escape(s) for s in _LEGAL_SUFFIXES) + r")\.?$")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+_CRITERIA_RANK = {"yes": 2, "unknown": 1, "no": 0}
+
+
+def normalize_company_name(name: str) -> str:
+    text = unicodedata.normalize("NFKC", name).casefold().strip()
+    previous = None
+    while previous != text:
+        previous, text = text, _SUFFIX_RE.sub("", text)
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def normalize_domain(url: Optional[str]) -> Optional[str]:
+    if not url or not url.strip():
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = f"//{url}"
+    host = (urlsplit(url).hostname or "").casefold()
+    if host.startswith("www."):
+        host = host[4:]
+    return host or None
+
+
+def _normalize_url(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    parts = urlsplit(url.strip() if "://" in url else f"//{url.strip()}")
+    host = (parts.hostname or "").casefold().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{parts.query}" if parts.query else "")
+
+
+def _source_key(doc: SourceDocument) -> str:
+    return _normalize_url(doc.url) or f"title:{(doc.title or '').strip().casefold()}"
+
+
+def _union_sources(*groups: Iterable[SourceDocument]) -> list[SourceDocument]:
+    merged: dict[str, SourceDocument] = {}
+    for group in groups:
+        for doc in group:
+            key = _source_key(doc)
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = doc
+            else:
+                merged[key] = existing.model_copy(
+                    update={
+                        field: getattr(doc, field)
+                        for field in ("title", "publisher", "published_at", "snippet")
+                        if getattr(existing, field) is None and getattr(doc, field) is not None
+                    }
+                )
+    return list(merged.values())
+
+
+def _union_investors(*groups: Iterable[Investor]) -> list[Investor]:
+    merged: dict[str, Investor] = {}
+    for group in groups:
+        for investor in group:
+            key = normalize_company_name(investor.name)
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = investor
+            elif existing.website is None and investor.website is not None:
+                merged[key] = existing.model_copy(update={"website": investor.website})
+    return list(merged.values())
+
+
+def _merge_events(a: FundingEvent, b: FundingEvent) -> FundingEvent:
+    amount = a.amount if a.amount.value is not None or b.amount.value is None else b.amount
+    return FundingEvent(
+        round=a.round,
+        announced_date=min(a.announced_date, b.announced_date),
+        amount=amount,
+        investors=_union_investors(a.investors, b.investors),
+        lead_investor=a.lead_investor or b.lead_investor,
+        source_documents=_union_sources(a.source_documents, b.source_documents),
+    )
+
+
+def merge_funding_events(events: Iterable[FundingEvent]) -> list[FundingEvent]:
+    merged: list[FundingEvent] = []
+    for event in sorted(events, key=lambda e: (e.round, e.announced_date)):
+        last = merged[-1] if merged else None
+        if (
+            last is not None
+            and last.round == event.round
+            and event.announced_date - last.announced_date <= EVENT_DATE_TOLERANCE
+        ):
+            merged[-1] = _merge_events(last, event)
+        else:
+            merged.append(event)
+    return sorted(merged, key=lambda e: e.announced_date)
+
+
+def _merge_companies(a: Company, b: Company) -> Company:
+    owners = list(dict.fromkeys([*(a.owners or []), *(b.owners or [])])) or None
+    briefs = [x for x in (a.brief, b.brief) if x]
+    return a.model_copy(
+        update={
+            "website": a.website or b.website,
+            "location": a.location if a.location.country else b.location,
+            "industry": a.industry or b.industry,
+            "owners": owners,
+            "num_employees": a.num_employees or b.num_employees,
+            "brief": max(briefs, key=len) if briefs else None,
+        }
+    )
+
+
+def _merge_pair(a: CompanyFundingDigest, b: CompanyFundingDigest) -> CompanyFundingDigest:
+    criteria = max(
+        (a.satisfies_search_criteria, b.satisfies_search_criteria), key=_CRITERIA_RANK.__getitem__
+    )
+    return CompanyFundingDigest(
+        company=_merge_companies(a.company, b.company),
+        funding_events=merge_funding_events([*a.funding_events, *b.funding_events]),
+        related_links=_union_sources(a.related_links, b.related_links),
+        satisfies_search_criteria=criteria,
+    )
+
+
+def merge_digests(digests: Sequence[CompanyFundingDigest]) -> list[CompanyFundingDigest]:
+    """Merge digests that describe the same company, preserving first-seen order."""
+
+    merged: list[CompanyFundingDigest] = []
+    by_domain: dict[str, int] = {}
+    by_name: dict[str, int] = {}
+
+    for digest in digests:
+        domain = normalize_domain(digest.company.website)
+        name = normalize_company_name(digest.company.name)
+        index = by_domain.get(domain) if domain else None
+        if index is None:
+            index = by_name.get(name)
+            # Same name but two different known domains: keep them apart.
+            if index is not None and domain:
+                other = normalize_domain(merged[index].company.website)
+                if other and other != domain:
+                    index = None
+
+        if index is None:
+            index = len(merged)
+            merged.append(
+                digest.model_copy(
+                    update={"funding_events": merge_funding_events(digest.funding_events)}
+                )
+            )
+        else:
+            merged[index] = _merge_pair(merged[index], digest)
+
+        merged_domain = normalize_domain(merged[index].company.website)
+        for key in (domain, merged_domain):
+            if key:
+                by_domain.setdefault(key, index)
+        by_name.setdefault(name, index)
+
+    return merged
+
+
+__all__ = ["merge_digests", "merge_funding_events", "normalize_company_name", "normalize_domain"]
@@ -0,0 +1,43 @@
+"""Shared fixtures for the unit tests; run ``python -m pytest`` from ``researcher/``."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Any
+
+# Settings are read lazily, so these only need to be in place before the first test runs.
+_TEST_SETTINGS = {
+    "OPENAI_BASE_URL": "http://127.0.0.1:9/v1",
+    "OPENAI_API_KEY": "test",
+    "LLAMACPP_BASE_URL": "http://127.0.0.1:9/v1",
+    "PARSE_LM": "azure.gpt-5-nano",
+    "RESEARCH_LM": "azure.gpt-5-nano",
+    "BRAINTRUST_PROJECT_NAME": "test",
+    "BRAINTRUST_API_KEY": "test",
+    "ENABLE_EXA_MCP": "false",
+    "EXA_MCP_URL": "http://127.0.0.1:9/mcp",
+    "EXA_API_KEY": "test",
+    "DATABASE_URL": "postgresql://test@127.0.0.1:9/test",
+    "CACHE_DIR": tempfile.mkdtemp(prefix="researcher-tests-"),
+}
+for _name, _value in _TEST_SETTINGS.items():
+    os.environ.setdefault(_name, _value)
+
+import pytest  # noqa: E402
+from agents import set_tracing_disabled  # noqa: E402
+
+from src.bench.fakes import canned_digest  # noqa: E402
+from src.types import CompanyFundingDigest  # noqa: E402
+
+set_tracing_disabled(True)
+
+
+@pytest.fixture
+def digest():
+    def _digest(index: int, **company: Any) -> CompanyFundingDigest:
+        data = canned_digest(index)
+        data["company"].update(company)
+        return CompanyFundingDigest.model_validate(data)
+
+    return _digest
@@ -0,0 +1,152 @@
+"""Test doubles shared by the unit tests."""
+
+from __future__ import annotations
+
+import itertools
+import json
+from typing import Any, Optional, Union
+
+from agents import ModelSettings
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+from src.models.model_register import LMModelSpec
+
+
+class StubModel(Model):
+    """Answers every request with ``text`` and records the settings it was called with."""
+
+    def __init__(self, text: str = "ok", usage: Optional[Usage] = None) -> None:
+        self.text = text
+        self.usage = usage or Usage()
+        self.calls: list[dict[str, Any]] = []
+
+    def _response(self) -> ModelResponse:
+        message = ResponseOutputMessage(
+            id="msg_stub",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=self.text, annotations=[])],
+        )
+        return ModelResponse(output=[message], usage=self.usage, response_id=None)
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ) -> ModelResponse:
+        self._record(system_instructions, input, model_settings, tools)
+        return self._response()
+
+    async def stream_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        **kwargs,
+    ):
+        self._record(system_instructions, input, model_settings, tools)
+        response = self._response()
+        usage = ResponseUsage(
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            total_tokens=response.usage.total_tokens,
+            input_tokens_details=InputTokensDetails(cached_tokens=0),
+            output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+        )
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=0,
+            response=Response(
+                id="resp_stub",
+                created_at=0,
+                model="stub",
+                object="response",
+                output=response.output,
+                parallel_tool_calls=False,
+                tool_choice="auto",
+                tools=[],
+                usage=usage,
+            ),
+        )
+
+    def _record(self, system_instructions, input, model_settings, tools) -> None:
+        self.calls.append(
+            {
+                "system_instructions": system_instructions,
+                "input": input,
+                "model_settings": model_settings,
+                "tools": tools,
+            }
+        )
+
+
+ToolCall = tuple[str, dict[str, Any]]
+
+
+class ScriptedModel(StubModel):
+    """Answers with ``outputs`` in turn: a str is a message, a ``(tool, arguments)`` a tool call.
+
+    Every response reports ``usage``; the last output repeats once the script runs out.
+    """
+
+    _call_ids = itertools.count(1)
+
+    def __init__(self, *outputs: Union[str, ToolCall], usage: Optional[Usage] = None) -> None:
+        super().__init__(usage=usage or Usage(requests=1, input_tokens=100, output_tokens=20))
+        self.outputs = list(outputs)
+
+    def _response(self) -> ModelResponse:
+        output = self.outputs.pop(0) if len(self.outputs) > 1 else self.outputs[0]
+        if isinstance(output, str):
+            self.text = output
+            return super()._response()
+        name, arguments = output
+        call_id = f"call_{next(self._call_ids)}"
+        call = ResponseFunctionToolCall(
+            id=f"fc_{call_id}",
+            call_id=call_id,
+            type="function_call",
+            name=name,
+            arguments=json.dumps(arguments),
+            status="completed",
+        )
+        return ModelResponse(output=[call], usage=self.usage, response_id=None)
+
+
+def approx_spec(max_context_length: int = 40_000, **overrides: Any) -> LMModelSpec:
+    """Spec of an unregistered model counted with the approximate (4 chars/token) tokenizer."""
+
+    fields: dict[str, Any] = {
+        "model_name": "test-model",
+        "backend": "local",
+        "tokenizer_name": "approximate",
+        "max_context_length": max_context_length,
+        "supports_streaming": True,
+        "supports_tool_calling": True,
+        "supports_structured_output": True,
+        "model_settings": ModelSettings(),
+        **overrides,
+    }
+    return LMModelSpec(**fields)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.batch import BatchQuery, load_queries
+
+
+def _write(tmp_path, *lines: str) -> str:
+    path = tmp_path / "queries.jsonl"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_load_queries_reads_each_record_shape(tmp_path):
+    path = _write(
+        tmp_path,
+        json.dumps({"id": "dk-2025-08", "q": "danish startups funded in August 2025"}),
+        "",
+        json.dumps({"query": "swedish seed rounds"}),
+        json.dumps("norwegian series A rounds"),
+        json.dumps({"request_id": "user-001", "title": "Finnish rounds", "body": "finnish rounds"}),
+        json.dumps({"request_id": "user-002", "title": "icelandic rounds"}),
+    )
+
+    assert load_queries(path) == [
+        BatchQuery("dk-2025-08", "danish startups funded in August 2025"),
+        BatchQuery("line-3", "swedish seed rounds"),
+        BatchQuery("line-4", "norwegian series A rounds"),
+        BatchQuery("user-001", "finnish rounds"),
+        BatchQuery("user-002", "icelandic rounds"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("line", "error"),
+    [
+        (json.dumps(["danish startups"]), "expected a JSON object or string"),
+        ("42", "expected a JSON object or string"),
+        (json.dumps({"id": "dk", "q": ""}), "missing 'q' field"),
+        ('{"q": "danish', "invalid JSON"),
+    ],
+)
+def test_load_queries_rejects_bad_lines_with_their_location(tmp_path, line, error):
+    path = _write(tmp_path, json.dumps({"q": "fine"}), line)
+
+    with pytest.raises(ValueError, match=f"queries.jsonl:2: {error}"):
+        load_queries(path)
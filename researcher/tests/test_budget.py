@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from src.bench.fakes import canned_digest
+from src.flows.budget import FINALIZE_NOTICE, BudgetExceeded, RunBudget
+from src.flows.research_flow import BUDGET_SUMMARY, result_status, run_research_flow
+from src.oagents import condense_agent, manager, startup_funding_agent
+from src.types import CompanyFundingSearchResults, SearchInput
+from tests.stubs import ScriptedModel
+
+SEARCH = SearchInput(query="Danish startups funded in August 2025", criteria=[], max_count=10)
+
+RESEARCH_CALL = ("research_agent", {"input": "Find seed rounds"})
+RESEARCH_ANSWER = json.dumps({"response": [canned_digest(1), canned_digest(2)]})
+MANAGER_ANSWER = CompanyFundingSearchResults.model_validate(
+    {"company_funding_digests": [canned_digest(1)], "summary": "One seed round."}
+).model_dump_json()
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """Stub models for the real agents, scripted per test through ``models[agent].outputs``."""
+
+    stubs = {
+        "manager": ScriptedModel(RESEARCH_CALL, MANAGER_ANSWER),
+        "research": ScriptedModel(RESEARCH_ANSWER),
+        "condense": ScriptedModel(MANAGER_ANSWER),
+    }
+    for module in (manager, startup_funding_agent, condense_agent):
+        monkeypatch.setattr(module, "get_routed_model", lambda route, _model: stubs[route])
+    return stubs
+
+
+def _tool_names(call: dict) -> list[str]:
+    return [tool.name for tool in call["tools"]]
+
+
+def _run(budget: RunBudget) -> CompanyFundingSearchResults:
+    return asyncio.run(run_research_flow(SEARCH, mcp_servers=[], budget=budget))
+
+
+def test_budget_soft_and_hard_limits():
+    budget = RunBudget(max_tokens=1_000, max_turns=10, soft_fraction=0.5)
+
+    budget.tokens = 499
+    assert not budget.soft_exceeded
+    budget.check()
+
+    budget.tokens = 500
+    assert budget.soft_exceeded
+    budget.check()
+
+    budget.turns = 10
+    with pytest.raises(BudgetExceeded, match="turns"):
+        budget.check()
+    assert budget.stopped == "turns"
+
+
+def test_soft_limit_finalizes_the_manager_without_the_research_tool(models):
+    # The manager's call and the research agent's answer spend the soft limit (2 of 4 turns).
+    budget = RunBudget(max_turns=4, soft_fraction=0.5)
+
+    result = _run(budget)
+
+    first, second = models["manager"].calls
+    assert _tool_names(first) == ["research_agent"]
+    assert not first["system_instructions"].endswith(FINALIZE_NOTICE)
+    assert _tool_names(second) == []
+    assert second["system_instructions"].endswith(FINALIZE_NOTICE)
+    assert result.summary == "One seed round."
+    assert result_status(result) == "complete"
+    assert budget.turns == 3 and budget.stopped is None
+
+
+def test_hard_limit_returns_the_digests_found_so_far(models):
+    budget = RunBudget(max_turns=2, soft_fraction=1.0)
+
+    result = _run(budget)
+
+    # Stopped before the manager's second call, keeping what the research agent returned.
+    assert len(models["manager"].calls) == 1
+    assert result.summary == BUDGET_SUMMARY
+    assert result_status(result) == "stopped"
+    assert [d.company.name for d in result.company_funding_digests] == [
+        "Fake Startup 1",
+        "Fake Startup 2",
+    ]
+    assert budget.stopped == "turns"
+
+
+def test_token_limit_stops_the_run_inside_the_research_tool(models):
+    # The research agent is never allowed to answer; the manager stops on its next call.
+    budget = RunBudget(max_tokens=120, soft_fraction=1.0)
+
+    result = _run(budget)
+
+    assert models["research"].calls == []
+    assert len(models["manager"].calls) == 1
+    assert result.summary == BUDGET_SUMMARY
+    assert result.company_funding_digests == []
+    assert budget.stopped == "tokens"
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import src.db
+import src.flows.research_flow
+import src.oagents.input_parser
+from src import main
+from src.flows.checkpoint import RunCheckpoint, get_checkpoint_store
+from src.types import CompanyFundingSearchResults, SearchInput
+
+SEARCH = SearchInput(query="Danish seed rounds", criteria=[], max_count=10)
+
+
+@pytest.fixture
+def flow(monkeypatch):
+    """Stub the parser, research flow and database around ``main.run_query``."""
+
+    stored: list[str] = []
+    searches = {"Danish seed rounds": SEARCH}
+
+    async def _parse_input(q: str, **kwargs) -> SearchInput:
+        return searches.get(q) or SearchInput(query=q, criteria=[], max_count=10)
+
+    async def _run_research_flow(search, **kwargs) -> CompanyFundingSearchResults:
+        return CompanyFundingSearchResults(company_funding_digests=[], summary="done")
+
+    async def _insert_digest(result, run_id=None, **kwargs) -> str:
+        stored.append(run_id)
+        return run_id
+
+    monkeypatch.setattr(src.oagents.input_parser, "parse_input", _parse_input)
+    monkeypatch.setattr(src.flows.research_flow, "run_research_flow", _run_research_flow)
+    monkeypatch.setattr(src.db, "insert_digest", _insert_digest)
+    return stored
+
+
+def _checkpoint(run_id: str) -> RunCheckpoint:
+    checkpoint = RunCheckpoint(run_id=run_id, search=SEARCH, phase="manager", turns=3)
+    asyncio.run(get_checkpoint_store().save(checkpoint))
+    return checkpoint
+
+
+def test_checkpoint_round_trip():
+    store = get_checkpoint_store()
+    _checkpoint("run-roundtrip")
+
+    loaded = asyncio.run(store.load("run-roundtrip"))
+    assert loaded is not None
+    assert (loaded.phase, loaded.turns, loaded.search) == ("manager", 3, SEARCH)
+
+    asyncio.run(store.delete("run-roundtrip"))
+    assert asyncio.run(store.load("run-roundtrip")) is None
+
+
+def test_resume_deletes_the_checkpoint_once_stored(flow):
+    _checkpoint("run-done")
+
+    run_id = asyncio.run(main.run_query(None, mcp_servers=[], resume="run-done"))
+
+    assert run_id == "run-done"
+    assert flow == ["run-done"]
+    assert asyncio.run(get_checkpoint_store().load("run-done")) is None
+    with pytest.raises(ValueError, match="No checkpoint"):
+        asyncio.run(main.run_query(None, mcp_servers=[], resume="run-done"))
+
+
+def test_resume_with_another_query_is_refused(flow):
+    _checkpoint("run-other")
+
+    with pytest.raises(ValueError, match="another query"):
+        asyncio.run(main.run_query("Swedish series A", mcp_servers=[], resume="run-other"))
+    asyncio.run(main.run_query("  danish SEED rounds ", mcp_servers=[], resume="run-other"))
+
+    assert flow == ["run-other"]
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from src.mem import compaction
+from src.mem.compaction import FactExtractor, truncate_to_tokens
+from src.mem.short_ctx import ResearchSession
+from src.mem.tokens import approx_count
+from tests.stubs import StubModel, approx_spec
+
+
+def _tool_output(*companies: str) -> str:
+    results = [
+        {"company": {"name": name, "website": f"https://{i}.example.com"}}
+        for i, name in enumerate(companies)
+    ]
+    # Tool outputs carry JSON documents as strings inside the item.
+    return json.dumps({"type": "function_call_output", "output": json.dumps(results)})
+
+
+def test_fact_extractor_collects_companies_and_urls_once():
+    facts = FactExtractor()
+
+    facts.update([_tool_output("Acme ApS", "Nordic AI")])
+    facts.update(
+        [
+            _tool_output("acme aps"),
+            json.dumps({"company_name": "Fjord Labs"}),
+            "Read https://news.example.com/funding/1. Then search again.",
+        ]
+    )
+
+    assert list(facts.companies.values()) == ["Acme ApS", "Nordic AI", "Fjord Labs"]
+    assert list(facts.urls) == [
+        "https://0.example.com",
+        "https://1.example.com",
+        "https://news.example.com/funding/1",
+    ]
+
+
+def test_fact_extractor_render_drops_oldest_urls_first():
+    facts = FactExtractor()
+    facts.update([f"see https://example.com/{i:03d}" for i in range(100)])
+    facts.update([json.dumps({"company": "Acme"})])
+
+    text = facts.render(120, approx_count)
+
+    assert approx_count(text) <= 120
+    assert "Companies already found: Acme" in text
+    assert "https://example.com/099" in text
+    assert "https://example.com/000" not in text
+
+
+def test_truncate_to_tokens():
+    text = "word " * 500
+
+    assert truncate_to_tokens(text, 1_000, approx_count) == text
+    assert approx_count(truncate_to_tokens(text, 50, approx_count)) <= 50
+    assert truncate_to_tokens(text, 0, approx_count) == ""
+
+
+def test_extract_compaction_summarizes_trimmed_items():
+    session = ResearchSession(
+        "s", approx_spec(), max_tokens=120, tail_reserve=2, compaction="extract"
+    )
+
+    async def _run() -> list:
+        await session.add_items(
+            [{"role": "tool", "content": _tool_output(f"Startup {i}")} for i in range(6)]
+        )
+        await session.wait_for_compaction()
+        return await session.get_items()
+
+    items = asyncio.run(_run())
+
+    summary = items[0]
+    assert summary["role"] == "system"
+    assert "Startup 0" in summary["content"]
+    assert "Startup 5" not in summary["content"]  # still in the window
+    assert session._summary_tokens == approx_count(session._summary)
+
+
+def _summarizing_session(monkeypatch, model, summary_max_tokens: int = 20) -> ResearchSession:
+    monkeypatch.setattr(compaction, "get_model_from_spec", lambda spec: model)
+    return ResearchSession(
+        "s",
+        approx_spec(),
+        max_tokens=120,
+        tail_reserve=2,
+        compaction="summarize",
+        summary_model=approx_spec(),
+        summary_max_tokens=summary_max_tokens,
+    )
+
+
+def _fill(session: ResearchSession) -> list:
+    async def _run() -> list:
+        await session.add_items(
+            [{"role": "tool", "content": _tool_output(f"Startup {i}")} for i in range(6)]
+        )
+        await session.wait_for_compaction()
+        return await session.get_items()
+
+    return asyncio.run(_run())
+
+
+def test_summarize_compaction_uses_the_model_within_its_budget(monkeypatch):
+    model = StubModel("- Startup 0: seed, Example Ventures. " * 10)
+    session = _summarizing_session(monkeypatch, model)
+
+    items = _fill(session)
+
+    assert model.calls
+    assert "Startup 0: seed" in items[0]["content"]
+    assert session._summary_tokens <= 20
+
+
+def test_summarize_compaction_falls_back_to_extracted_facts(monkeypatch):
+    class _Failing(StubModel):
+        async def get_response(self, *args, **kwargs):
+            raise ConnectionError("summary model down")
+
+    session = _summarizing_session(monkeypatch, _Failing(), summary_max_tokens=40)
+
+    items = _fill(session)
+
+    assert "Companies already found: Startup 0" in items[0]["content"]
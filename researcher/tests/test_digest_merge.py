@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from src.types import FundingEvent
+from src.utils.digest_merge import (
+    merge_digests,
+    merge_funding_events,
+    normalize_company_name,
+    normalize_domain,
+)
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [
+        ("Fake Startup ApS", "fake startup"),
+        ("  FAKE-Startup A/S. ", "fake startup"),
+        ("Nordic Holdings Ltd, Inc.", "nordic holdings"),
+        ("Søstrene Grene", "søstrene grene"),
+    ],
+)
+def test_normalize_company_name(name, expected):
+    assert normalize_company_name(name) == expected
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://www.Example.com/about", "example.com"),
+        ("example.com", "example.com"),
+        ("  ", None),
+        (None, None),
+    ],
+)
+def test_normalize_domain(url, expected):
+    assert normalize_domain(url) == expected
+
+
+def _event(digest, **update) -> FundingEvent:
+    return digest.funding_events[0].model_copy(update=update)
+
+
+def test_same_domain_merges_company_events_and_sources(digest):
+    a = digest(1)
+    b = digest(2, name="Fake Startup 1 ApS", website="www.fake-startup-1.example.com/")
+    b = b.model_copy(
+        update={
+            "funding_events": [_event(b, announced_date=date(2025, 8, 4), investors=[])],
+            "satisfies_search_criteria": "yes",
+        }
+    )
+    a = a.model_copy(update={"satisfies_search_criteria": "unknown"})
+
+    (merged,) = merge_digests([a, b])
+
+    assert merged.company.name == "Fake Startup 1"
+    assert merged.satisfies_search_criteria == "yes"
+    (event,) = merged.funding_events
+    # Three days apart, same round: one event, dated by its first report.
+    assert event.announced_date == date(2025, 8, 2)
+    assert [d.url for d in event.source_documents] == [
+        "https://news.example.com/funding/1",
+        "https://news.example.com/funding/2",
+    ]
+    assert [i.name for i in event.investors] == ["Example Ventures 1"]
+
+
+def test_same_name_with_different_domains_stays_apart(digest):
+    a = digest(1, name="Acme")
+    b = digest(2, name="ACME ApS")
+
+    assert [d.company.website for d in merge_digests([a, b])] == [
+        "https://fake-startup-1.example.com",
+        "https://fake-startup-2.example.com",
+    ]
+
+
+def test_missing_domain_falls_back_to_the_name(digest):
+    a = digest(1, website=None)
+    b = digest(1, name="Fake Startup 1 A/S")
+
+    (merged,) = merge_digests([a, b])
+
+    assert merged.company.website == "https://fake-startup-1.example.com"
+
+
+def test_merge_preserves_first_seen_order_and_is_idempotent(digest):
+    digests = [digest(3), digest(1), digest(2), digest(1)]
+
+    merged = merge_digests(digests)
+
+    names = [d.company.name for d in merged]
+    assert names == ["Fake Startup 3", "Fake Startup 1", "Fake Startup 2"]
+    assert merge_digests(merged) == merged
+
+
+def test_events_in_other_rounds_or_weeks_stay_separate(digest):
+    base = digest(1)
+    seed = _event(base)
+    later_seed = _event(base, announced_date=date(2025, 8, 20))
+    series_a = _event(base, round="series-a")
+
+    events = merge_funding_events([later_seed, series_a, seed])
+
+    assert [(e.round, e.announced_date) for e in events] == [
+        ("seed", date(2025, 8, 2)),
+        ("series-a", date(2025, 8, 2)),
+        ("seed", date(2025, 8, 20)),
+    ]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from src.flows.fanout import partition_search
+from src.types import SearchInput
+
+
+def _search(start: date, end: date) -> SearchInput:
+    return SearchInput(
+        query="Danish seed rounds", criteria=[], max_count=10, period_start=start, period_end=end
+    )
+
+
+def _periods(shards: list[SearchInput]) -> list[tuple[date, date]]:
+    return [(s.period_start, s.period_end) for s in shards]
+
+
+def test_month_is_split_into_weeks():
+    shards = partition_search(_search(date(2025, 8, 1), date(2025, 8, 31)), "week")
+
+    assert _periods(shards) == [
+        (date(2025, 8, 1), date(2025, 8, 7)),
+        (date(2025, 8, 8), date(2025, 8, 14)),
+        (date(2025, 8, 15), date(2025, 8, 21)),
+        (date(2025, 8, 22), date(2025, 8, 28)),
+        (date(2025, 8, 29), date(2025, 8, 31)),
+    ]
+    assert "2025-08-29 and 2025-08-31" in shards[-1].criteria[-1].description
+
+
+def test_long_periods_are_capped_and_still_covered():
+    search = _search(date(2022, 1, 1), date(2025, 12, 31))
+
+    shards = partition_search(search, "auto", max_shards=8)
+
+    assert len(shards) <= 8
+    periods = _periods(shards)
+    assert periods[0][0] == search.period_start
+    assert periods[-1][1] == search.period_end
+    for (_, end), (start, _) in zip(periods, periods[1:], strict=False):
+        assert start == end + timedelta(days=1)
+
+
+def test_default_cap_comes_from_settings():
+    shards = partition_search(_search(date(2020, 1, 1), date(2025, 12, 31)), "week")
+
+    assert len(shards) <= 8
+
+
+def test_round_shards_without_a_period():
+    search = SearchInput(query="Danish seed rounds", criteria=[], max_count=10)
+
+    assert len(partition_search(search, "week")) == 3
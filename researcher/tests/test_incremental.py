@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+
+from src.db.digests import search_key
+from src.db.reads import Page
+from src.flows import incremental
+from src.flows.research_flow import BUDGET_SUMMARY, PARTIAL_SUMMARY, result_status
+from src.types import CompanyFundingSearchResults, SearchInput
+
+
+def _search(query: str, *criteria: str, **period: date) -> SearchInput:
+    return SearchInput(
+        query=query,
+        criteria=[{"description": c} for c in criteria],
+        max_count=10,
+        **period,
+    )
+
+
+def test_search_key_ignores_case_spacing_order_and_period():
+    a = _search("Danish  seed rounds", "Fintech", "Raised over 1M EUR")
+    b = _search(
+        "danish seed rounds",
+        "raised over 1m eur",
+        "fintech",
+        period_start=date(2025, 8, 1),
+        period_end=date(2025, 8, 31),
+    )
+
+    assert search_key(a) == search_key(b)
+    assert search_key(a) != search_key(_search("Swedish seed rounds", "Fintech"))
+
+
+def test_previous_digests_only_from_complete_runs_of_the_same_search(monkeypatch, digest):
+    search = _search(
+        "Danish seed rounds", period_start=date(2025, 8, 1), period_end=date(2025, 8, 10)
+    )
+    requests = []
+
+    async def _list_runs(**kwargs):
+        requests.append(kwargs)
+        return Page(
+            items=[
+                {"run_id": "new", "company_funding_digests": [digest(20).model_dump(mode="json")]},
+                {"run_id": "old", "company_funding_digests": [digest(1).model_dump(mode="json")]},
+            ]
+        )
+
+    monkeypatch.setattr(incremental, "list_runs", _list_runs)
+    digests = asyncio.run(incremental.load_previous_digests(search))
+
+    assert requests[0]["contains"] == {
+        "run": {"status": "complete", "search_key": search_key(search)}
+    }
+    # Fake Startup 20 announced on 2025-08-21, outside the period.
+    assert [d.company.name for d in digests] == ["Fake Startup 1"]
+
+
+def test_no_matching_run_means_no_previous_digests(monkeypatch):
+    async def _list_runs(**kwargs):
+        return Page()
+
+    monkeypatch.setattr(incremental, "list_runs", _list_runs)
+
+    assert asyncio.run(incremental.load_previous_digests(_search("Danish seed rounds"))) == []
+
+
+def test_result_status():
+    def _results(summary: str) -> CompanyFundingSearchResults:
+        return CompanyFundingSearchResults(company_funding_digests=[], summary=summary)
+
+    assert result_status(_results(PARTIAL_SUMMARY)) == "partial"
+    assert result_status(_results(BUDGET_SUMMARY)) == "stopped"
+    assert result_status(_results("Five Danish fintechs raised seed rounds.")) == "complete"
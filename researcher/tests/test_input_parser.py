@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import pytest
+
+from src.oagents import input_parser
+from src.setup import get_settings
+from src.types import SearchInput
+
+
+def test_parse_cache_key_normalizes_whitespace_and_case():
+    key = input_parser._parse_cache_key("Danish  seed rounds\nin August")
+
+    assert key == input_parser._parse_cache_key("danish seed rounds in august")
+    assert key != input_parser._parse_cache_key("Swedish seed rounds in August")
+
+
+def test_parse_cache_key_changes_with_the_parse_model(monkeypatch):
+    key = input_parser._parse_cache_key("Danish seed rounds")
+    monkeypatch.setenv("PARSE_LM", "gpt-4o-mini")
+    get_settings.cache_clear()
+    try:
+        assert input_parser._parse_cache_key("Danish seed rounds") != key
+    finally:
+        get_settings.cache_clear()
+
+
+@pytest.mark.parametrize("change", ["instructions", "schema"])
+def test_parse_cache_key_changes_with_the_parser(monkeypatch, change):
+    key = input_parser._parse_cache_key("Danish seed rounds")
+    input_parser._parser_version.cache_clear()
+    if change == "instructions":
+        monkeypatch.setattr(input_parser, "_PARSE_INSTRUCTIONS", "Parse the query.")
+    else:
+        # As when period_start/period_end were added to SearchInput.
+        schema = SearchInput.model_json_schema()
+        schema["properties"].pop("period_start")
+        monkeypatch.setattr(SearchInput, "model_json_schema", classmethod(lambda cls: schema))
+    try:
+        assert input_parser._parse_cache_key("Danish seed rounds") != key
+    finally:
+        monkeypatch.undo()
+        input_parser._parser_version.cache_clear()
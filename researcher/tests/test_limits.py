@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from agents.usage import Usage
+
+from src.metrics import bind_run
+from src.models.limits import BackendLimiter, LimitedModel, _TokenBucket
+from tests.stubs import StubModel
+
+
+def test_token_bucket_refills_per_minute():
+    bucket = _TokenBucket(60)  # one token per second
+    now = bucket.updated
+
+    assert bucket.wait_seconds(60, now) == 0.0
+    bucket.take(60)
+    assert bucket.wait_seconds(1, now) == pytest.approx(1.0)
+    assert bucket.wait_seconds(1, now + 1) == 0.0
+    # Refills never overflow the bucket.
+    assert bucket.wait_seconds(60, now + 3600) == 0.0
+    assert bucket.level == 60
+
+
+def test_token_bucket_admits_oversized_requests_once_full():
+    bucket = _TokenBucket(100)
+    now = bucket.updated
+
+    assert bucket.wait_seconds(500, now) == 0.0
+    bucket.take(500)
+    # The next one waits until the overdraft is repaid and the bucket is full again.
+    assert bucket.wait_seconds(500, now) == pytest.approx(5 * 60)
+
+
+def test_disabled_limiter_does_not_queue():
+    limiter = BackendLimiter("local")
+
+    async def _run() -> None:
+        async with limiter.slot(10):
+            assert limiter.queue_depth == 0
+
+    assert not limiter.enabled
+    asyncio.run(_run())
+
+
+def test_max_in_flight_caps_concurrent_requests():
+    limiter = BackendLimiter("local", max_in_flight=2)
+    peak = 0
+
+    async def _request() -> None:
+        nonlocal peak
+        async with limiter.slot(10):
+            peak = max(peak, limiter._in_flight)
+            await asyncio.sleep(0.01)
+
+    async def _run() -> None:
+        await asyncio.gather(*(_request() for _ in range(6)))
+
+    asyncio.run(_run())
+
+    assert peak == 2
+    assert limiter._in_flight == 0
+    assert limiter.queue_depth == 0
+
+
+def test_runs_are_served_round_robin():
+    limiter = BackendLimiter("local", max_in_flight=1)
+    order: list[str] = []
+
+    async def _request(run: str) -> None:
+        with bind_run(run):
+            async with limiter.slot(10):
+                order.append(run)
+                await asyncio.sleep(0)
+
+    async def _run() -> None:
+        # Hold the only slot while both runs queue, "a" with three requests first.
+        async with limiter.slot(10):
+            tasks = [asyncio.create_task(_request(r)) for r in ("a", "a", "a", "b", "b")]
+            await asyncio.sleep(0)
+            assert limiter.queue_depth == 5
+        await asyncio.gather(*tasks)
+
+    asyncio.run(_run())
+
+    assert order == ["a", "b", "a", "b", "a"]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = BackendLimiter("local", max_in_flight=1)
+    granted: list[str] = []
+
+    async def _request(name: str) -> None:
+        async with limiter.slot(10):
+            granted.append(name)
+
+    async def _run() -> None:
+        async with limiter.slot(10):
+            cancelled = asyncio.create_task(_request("cancelled"))
+            waiting = asyncio.create_task(_request("waiting"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await asyncio.gather(cancelled, return_exceptions=True)
+            assert limiter.queue_depth == 1
+        await waiting
+
+    asyncio.run(_run())
+
+    assert granted == ["waiting"]
+    assert limiter._in_flight == 0
+
+
+def test_lease_charge_corrects_the_token_bucket():
+    limiter = BackendLimiter("local", tokens_per_minute=1_000)
+
+    async def _run() -> None:
+        async with limiter.slot(100) as lease:
+            assert limiter._tokens.level == pytest.approx(900, abs=1)
+            lease.charge(400)
+            assert limiter._tokens.level == pytest.approx(600, abs=1)
+
+    asyncio.run(_run())
+
+
+def test_limited_model_charges_reported_usage():
+    limiter = BackendLimiter("local", tokens_per_minute=10_000)
+    model = LimitedModel(
+        StubModel(usage=Usage(requests=1, input_tokens=1_500, output_tokens=500)), limiter
+    )
+
+    async def _run() -> None:
+        await model.get_response("be brief", "hi", None, [], None, [], None)
+
+    asyncio.run(_run())
+
+    assert limiter._tokens.level == pytest.approx(8_000, abs=1)
+    assert limiter._in_flight == 0
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from typing import Any
+
+import pytest
+from agents import AgentOutputSchema, ModelSettings, function_tool
+from agents.usage import Usage
+
+from src.models.cache import CachedModel
+from src.types import CompanyFundingSearchResults
+from src.utils.disk_cache import SQLiteCache
+from tests.stubs import StubModel
+
+
+@function_tool
+def web_search(query: str) -> str:
+    """Search the web."""
+    return query
+
+
+@function_tool
+def web_search_paged(query: str, page: int) -> str:
+    """Search the web."""
+    return query
+
+
+DETERMINISTIC = ModelSettings(temperature=0)
+
+REQUEST: dict[str, Any] = {
+    "system_instructions": "Research Danish startups.",
+    "input": "Seed rounds in August 2025",
+    "model_settings": DETERMINISTIC,
+    "tools": [web_search],
+    "output_schema": None,
+    "handoffs": [],
+    "tracing": None,
+}
+
+
+@pytest.fixture
+def models(tmp_path) -> tuple[StubModel, CachedModel]:
+    inner = StubModel("cached answer", Usage(requests=1, input_tokens=100, output_tokens=10))
+    store = SQLiteCache(tmp_path / "lm.sqlite3", namespace="lm_completions")
+    return inner, CachedModel(inner, "test-model", store)
+
+
+def _ask(model: CachedModel, **changes: Any):
+    return asyncio.run(model.get_response(**{**REQUEST, **changes}))
+
+
+def test_identical_requests_hit_the_cache(models):
+    inner, model = models
+
+    first = _ask(model)
+    second = _ask(model, tools=[web_search])
+
+    assert len(inner.calls) == 1
+    assert second.output == first.output
+    assert second.usage.total_tokens == 0  # replays cost nothing
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"input": "Seed rounds in September 2025"},
+        {"system_instructions": "Research Swedish startups."},
+        {"tools": [web_search_paged]},
+        {"tools": []},
+        {"model_settings": dataclasses.replace(DETERMINISTIC, max_tokens=500)},
+        {"output_schema": AgentOutputSchema(CompanyFundingSearchResults)},
+    ],
+    ids=["input", "instructions", "tool schema", "no tools", "settings", "output schema"],
+)
+def test_changed_requests_miss_the_cache(models, changes):
+    inner, model = models
+    _ask(model)
+
+    _ask(model, **changes)
+
+    assert len(inner.calls) == 2
+
+
+@pytest.mark.parametrize("temperature", [None, 0.7])
+def test_non_deterministic_requests_are_not_cached(models, temperature):
+    inner, model = models
+    settings = ModelSettings(temperature=temperature)
+
+    _ask(model, model_settings=settings)
+    _ask(model, model_settings=settings)
+
+    assert len(inner.calls) == 2
+
+
+def test_stateful_requests_are_not_cached(models):
+    inner, model = models
+
+    _ask(model, previous_response_id="resp_1")
+    _ask(model, previous_response_id="resp_1")
+
+    assert len(inner.calls) == 2
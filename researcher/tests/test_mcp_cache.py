@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from mcp.types import CallToolResult, TextContent, Tool
+
+from src.mcp.cache import ToolCallCache, make_tool_call_key
+from src.mcp.general import MCPRegistry, _CachedToolCallsMixin, _PooledServer
+from src.utils import disk_cache
+from src.utils.disk_cache import SQLiteCache
+
+
+class _Server:
+    """Remote MCP server stand-in counting the ``call_tool`` requests that reach it."""
+
+    name = "Exa"
+
+    def __init__(self, *, is_error: bool = False, delay: float = 0.0) -> None:
+        self.requests = 0
+        self.is_error = is_error
+        self.delay = delay
+        self.tools = [Tool(name="web_search_exa", inputSchema={"type": "object"})]
+
+    async def list_tools(self) -> list[Tool]:
+        return self.tools
+
+    async def call_tool(self, tool_name, arguments) -> CallToolResult:
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        text = f"{tool_name} result {self.requests}"
+        return CallToolResult(content=[TextContent(type="text", text=text)], isError=self.is_error)
+
+
+class _CachedServer(_CachedToolCallsMixin, _Server):
+    pass
+
+
+@pytest.fixture
+def cache(tmp_path) -> ToolCallCache:
+    return ToolCallCache(
+        SQLiteCache(tmp_path / "mcp.sqlite3", namespace="mcp_call_tool", ttl_seconds=3600)
+    )
+
+
+def _server(cache: ToolCallCache, **kwargs) -> _CachedServer:
+    server = _CachedServer(**kwargs)
+    server.tool_call_cache = cache
+    server.tools_fingerprint = "catalog-1"
+    return server
+
+
+def _search(server: _CachedServer, query: str = "Danish seed rounds") -> CallToolResult:
+    return asyncio.run(server.call_tool("web_search_exa", {"query": query, "numResults": 5}))
+
+
+def test_key_normalizes_arguments():
+    key = make_tool_call_key("Exa", "web_search_exa", {"query": "Danish  Seed", "numResults": 5})
+
+    assert key == make_tool_call_key(
+        "Exa", "web_search_exa", {"query": "danish seed", "numResults": 5.0, "type": None}
+    )
+    assert key != make_tool_call_key("Exa", "web_search_exa", {"query": "danish seed"})
+    assert key != make_tool_call_key("Exa", "crawling_exa", {"query": "danish seed"})
+
+
+def test_repeated_calls_hit_the_cache(cache):
+    server = _server(cache)
+
+    first = _search(server)
+    second = _search(server, "danish   SEED rounds")
+
+    assert server.requests == 1
+    assert second.content == first.content
+    assert cache.stats()["hits"] == 1
+
+
+def test_concurrent_identical_calls_reach_the_server_once(cache):
+    server = _server(cache, delay=0.05)
+
+    async def _run() -> list[CallToolResult]:
+        args = {"query": "Danish seed rounds"}
+        return await asyncio.gather(*(server.call_tool("web_search_exa", args) for _ in range(3)))
+
+    results = asyncio.run(_run())
+
+    assert server.requests == 1
+    assert all(r.content == results[0].content for r in results)
+    assert cache.coalesced == 2
+
+
+def test_error_results_are_not_cached(cache):
+    server = _server(cache, is_error=True)
+
+    _search(server)
+    result = _search(server)
+
+    assert result.isError
+    assert server.requests == 2
+    assert cache.uncached_errors == 2
+
+
+def test_changed_tool_catalog_misses_the_cache(cache):
+    server = _server(cache)
+    _search(server)
+
+    server.tools_fingerprint = "catalog-2"
+    _search(server)
+    server.tools_fingerprint = "catalog-1"
+    _search(server)
+
+    assert server.requests == 2
+
+
+def test_expired_entries_are_refetched(cache, monkeypatch):
+    server = _server(cache)
+    _search(server)
+
+    now = disk_cache.time.time()
+    monkeypatch.setattr(disk_cache.time, "time", lambda: now + 3601)
+    _search(server)
+
+    assert server.requests == 2
+
+
+def test_registry_keys_calls_on_the_current_tool_catalog(cache):
+    server = _server(cache)
+    slot = _PooledServer(key="exa", server=server)  # type: ignore[arg-type]
+    registry = MCPRegistry()
+
+    asyncio.run(registry._refresh_tool_catalog(slot))
+    _search(server)
+    server.tools = [Tool(name="web_search_exa", inputSchema={"type": "object", "required": []})]
+    asyncio.run(registry._refresh_tool_catalog(slot))
+    _search(server)
+
+    assert server.tools_fingerprint == slot.tools_fingerprint
+    assert server.requests == 2
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from agents import ModelSettings
+
+from src.models.model_register import (
+    BackendConfig,
+    LMModelSpec,
+    ModelRegistry,
+    ModelRouter,
+    RouteEntry,
+)
+
+
+def _spec(name: str, *, context: int = 40_000, structured: bool = True) -> LMModelSpec:
+    return LMModelSpec(
+        model_name=name,
+        backend="local",
+        max_context_length=context,
+        supports_streaming=True,
+        supports_tool_calling=True,
+        supports_structured_output=structured,
+        model_settings=ModelSettings(),
+    )
+
+
+@pytest.fixture
+def router() -> ModelRouter:
+    registry = ModelRegistry()
+    registry.register_backend("local", BackendConfig(base_url="http://127.0.0.1:1/v1"))
+    registry.register_model(_spec("small", context=1_000))
+    registry.register_model(_spec("large"))
+    registry.register_model(_spec("plain", structured=False))
+    registry.register_route(
+        "parse", [RouteEntry(model="plain"), RouteEntry(model="small", max_prompt_tokens=500)]
+    )
+    return ModelRouter(registry)
+
+
+def _names(candidates) -> list[str]:
+    return [spec.model_name for spec, _ in candidates]
+
+
+def test_unregistered_default_is_not_routed(router):
+    assert router.has_route("parse", "large")
+    assert not router.has_route("parse", "gpt-4o-mini")
+    assert not router.has_route("condense", "large")
+
+
+def test_candidates_skip_models_that_cannot_serve_the_call(router):
+    small_prompt = router.candidates("parse", "large", prompt_tokens=100, structured=True)
+    large_prompt = router.candidates("parse", "large", prompt_tokens=800, structured=True)
+
+    assert _names(small_prompt) == ["small", "large"]
+    assert small_prompt[0][1] == "capability"
+    assert _names(large_prompt) == ["large"]
+
+
+def test_failing_model_is_benched_and_fails_over(router):
+    calls: list[str] = []
+
+    async def _call(spec: LMModelSpec) -> str:
+        calls.append(spec.model_name)
+        if spec.model_name == "small":
+            raise ConnectionError("backend down")
+        return spec.model_name
+
+    for _ in range(2):
+        call = router.call("parse", "large", _call, prompt_tokens=100, structured=True)
+        assert asyncio.run(call) == "large"
+
+    # Two consecutive failures bench "small", so it is now tried after the default.
+    candidates = router.candidates("parse", "large", prompt_tokens=100, structured=True)
+    assert _names(candidates) == ["large", "small"]
+    assert candidates[1][1] == "unhealthy"
+    assert calls == ["small", "large", "small", "large"]
+
+
+def test_default_client_is_rebuilt_after_aclose():
+    registry = ModelRegistry()
+    client = registry.default_client()
+    assert registry.default_client() is client
+
+    asyncio.run(registry.aclose())
+
+    assert client.is_closed()
+    rebuilt = registry.default_client()
+    assert rebuilt is not client
+    assert not rebuilt.is_closed()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from psycopg import errors
+
+from src.db.normalized import (
+    _NORMALIZED_TABLES_SQL,
+    _RUNS_SQL,
+    digest_rows,
+    ensure_schema,
+    replace_normalized_rows,
+)
+
+INIT_SQL = Path(__file__).resolve().parents[2] / "db" / "init.sql"
+
+
+class _Connection:
+    def __init__(self) -> None:
+        self.savepoints: list[str] = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        try:
+            yield
+        except Exception:
+            self.savepoints.append("rolled back")
+            raise
+        self.savepoints.append("released")
+
+
+class _Copy:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    async def write_row(self, row) -> None:
+        self._rows.append(row)
+
+
+class _Cursor:
+    """Cursor stand-in whose COPY fails for the tables in ``missing``."""
+
+    def __init__(self, missing: tuple[str, ...] = ()) -> None:
+        self.connection = _Connection()
+        self.missing = missing
+        self.copied: dict[str, list] = {}
+
+    async def execute(self, query, params=None, prepare=None) -> None:
+        pass
+
+    @asynccontextmanager
+    async def copy(self, statement: str):
+        table = statement.split()[1]
+        if table in self.missing:
+            raise errors.UndefinedTable(f'relation "{table}" does not exist')
+        yield _Copy(self.copied.setdefault(table, []))
+
+
+def test_digest_rows_flatten_events_investors_and_sources(digest):
+    rows = digest_rows("run-1", [digest(1), digest(2, name="Second Startup ApS")])
+
+    assert [r[:4] for r in rows["companies"]] == [
+        ("run-1", 0, "Fake Startup 1", "fake startup 1"),
+        ("run-1", 1, "Second Startup ApS", "second startup"),
+    ]
+    assert len(rows["funding_events"]) == 2
+    # The lead investor is also listed as an investor, so it is not added twice.
+    assert [(r[4], r[7]) for r in rows["investors"]] == [
+        ("Example Ventures 1", True),
+        ("Example Ventures 2", True),
+    ]
+    assert [r[3] for r in rows["source_documents"]] == [0, 0]
+
+
+def test_replace_normalized_rows_copies_in_a_savepoint(digest):
+    cur = _Cursor()
+
+    counts = asyncio.run(replace_normalized_rows(cur, "run-1", [digest(1)]))
+
+    assert counts == {"companies": 1, "funding_events": 1, "investors": 1, "source_documents": 1}
+    assert cur.connection.savepoints == ["released"]
+
+
+def test_missing_tables_do_not_fail_the_digest_write(digest):
+    cur = _Cursor(missing=("companies",))
+
+    counts = asyncio.run(replace_normalized_rows(cur, "run-1", [digest(1)]))
+
+    assert counts == {}
+    assert cur.connection.savepoints == ["rolled back"]
+
+
+def test_schema_matches_init_sql():
+    init_sql = INIT_SQL.read_text()
+
+    assert _RUNS_SQL.strip() in init_sql
+    assert _NORMALIZED_TABLES_SQL.strip() in init_sql
+
+
+def test_ensure_schema_updates_the_runs_table():
+    class _SchemaConnection(_Connection):
+        def __init__(self) -> None:
+            super().__init__()
+            self.executed: list[str] = []
+
+        async def execute(self, query) -> None:
+            self.executed.append(query)
+
+    conn = _SchemaConnection()
+
+    asyncio.run(ensure_schema(conn))
+
+    (ddl,) = conn.executed
+    assert "ADD COLUMN IF NOT EXISTS updated_at" in ddl
+    assert "CREATE INDEX IF NOT EXISTS idx_funding_digest_runs_keyset" in ddl
+    assert "USING GIN (data jsonb_path_ops)" in ddl
+    assert "CREATE TABLE IF NOT EXISTS companies" in ddl
+    assert conn.savepoints == ["released"]
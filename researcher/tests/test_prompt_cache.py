@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agents import ModelSettings
+
+from src.metrics import bind_run, metrics
+from src.models import prompt_cache
+from src.models.prompt_cache import PromptCacheModel, SlotAffinity
+from tests.stubs import StubModel
+
+
+def test_slot_affinity_prefers_sticky_then_agent_then_lru():
+    slots = SlotAffinity(3)
+
+    assert slots.acquire("run-1", "manager") == (0, "lru")
+    assert slots.acquire("run-1", "research") == (1, "lru")
+    slots.release(0)
+    slots.release(1)
+
+    assert slots.acquire("run-1", "manager") == (0, "sticky")
+    assert slots.acquire("run-2", "research") == (1, "agent")
+    assert slots.acquire("run-2", "condense") == (2, "lru")
+
+
+def test_slot_affinity_shares_slots_when_all_are_busy():
+    slots = SlotAffinity(2)
+    slots.acquire("run-1", "manager")
+    slots.acquire("run-2", "manager")
+
+    # Sticky to its own (busy) slot rather than evicting another run's prefix.
+    assert slots.acquire("run-2", "manager") == (1, "busy")
+    # No slot of its own: the least loaded one.
+    assert slots.acquire("run-3", "research") == (0, "busy")
+
+
+def test_slot_affinity_release_frees_the_slot():
+    slots = SlotAffinity(1)
+    slots.acquire("run-1", "manager")
+    slots.release(0)
+
+    assert slots.acquire("run-2", "manager") == (0, "agent")
+
+
+@pytest.fixture
+def agent_name(monkeypatch):
+    monkeypatch.setattr(prompt_cache, "current_agent_name", lambda: "research")
+
+
+def _tool(name: str) -> SimpleNamespace:
+    return SimpleNamespace(name=name)
+
+
+def _call(model: PromptCacheModel, settings: ModelSettings, tools: list) -> None:
+    asyncio.run(model.get_response("be brief", "hi", settings, tools, None, [], None))
+
+
+@pytest.mark.usefixtures("agent_name")
+def test_prompt_cache_model_sends_tools_in_name_order():
+    inner = StubModel()
+    model = PromptCacheModel(inner, "local")
+
+    _call(model, ModelSettings(), [_tool("web_search"), _tool("crawl"), _tool("fetch")])
+
+    assert [t.name for t in inner.calls[0]["tools"]] == ["crawl", "fetch", "web_search"]
+    assert inner.calls[0]["model_settings"].extra_body is None
+
+
+@pytest.mark.usefixtures("agent_name")
+def test_prompt_cache_model_sets_slot_and_cache_key():
+    inner = StubModel()
+    slots = SlotAffinity(2)
+    model = PromptCacheModel(inner, "llamacpp", slots=slots, prompt_cache_key=True)
+    settings = ModelSettings(extra_body={"top_k": 20})
+    sticky = metrics.counter_value("lm_prompt_slot_total", backend="llamacpp", affinity="sticky")
+
+    with bind_run("run-1"):
+        _call(model, settings, [])
+        _call(model, settings, [])
+
+    bodies = [call["model_settings"].extra_body for call in inner.calls]
+    assert bodies == [
+        {"top_k": 20, "prompt_cache_key": "research", "cache_prompt": True, "id_slot": 0},
+    ] * 2
+    assert settings.extra_body == {"top_k": 20}
+    assert slots._in_use == [0, 0]
+    assert (
+        metrics.counter_value("lm_prompt_slot_total", backend="llamacpp", affinity="sticky")
+        == sticky + 1
+    )
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from psycopg import sql
+
+from src.db import reads
+
+T0 = datetime(2025, 8, 31, 12, 0, tzinfo=timezone.utc)
+
+
+def _render(query: sql.Composable) -> str:
+    """SQL text of ``query``; identifiers and literals keep their repr (no connection)."""
+
+    if isinstance(query, sql.Composed):
+        return "".join(_render(part) for part in query)
+    if isinstance(query, sql.SQL):
+        return query.as_string(None)
+    return repr(query)
+
+
+class _Database:
+    """Stands in for the pool: records each query and returns the canned ``rows``."""
+
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.queries: list[tuple[str, list]] = []
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self
+
+    @asynccontextmanager
+    async def cursor(self):
+        yield self
+
+    async def execute(self, query, params) -> None:
+        self.queries.append((_render(query), list(params)))
+
+    async def fetchall(self) -> list[dict]:
+        return [dict(row) for row in self.rows]
+
+    async def fetchone(self):
+        return dict(self.rows[0]) if self.rows else None
+
+
+@pytest.fixture
+def database(monkeypatch):
+    db = _Database([])
+    monkeypatch.setattr(reads, "connection", db.connection)
+    return db
+
+
+def _runs(n: int) -> list[dict]:
+    return [
+        {
+            "id": 100 - i,
+            "run_id": f"run-{i}",
+            "created_at": T0 - timedelta(hours=i),
+            "updated_at": T0,
+            "data": {},
+        }
+        for i in range(n)
+    ]
+
+
+def test_list_runs_pages_with_a_keyset_cursor(database):
+    database.rows = _runs(3)
+
+    page = asyncio.run(reads.list_runs(limit=2))
+
+    assert [r["run_id"] for r in page.items] == ["run-0", "run-1"]
+    assert all("id" not in r for r in page.items)
+    query, params = database.queries[0]
+    assert "ORDER BY created_at DESC, id DESC LIMIT %s" in query
+    assert params == [3]  # one extra row tells whether there is a next page
+
+    database.rows = _runs(3)[2:]
+    page = asyncio.run(reads.list_runs(limit=2, cursor=page.next_cursor))
+
+    assert [r["run_id"] for r in page.items] == ["run-2"]
+    assert page.next_cursor is None
+    query, params = database.queries[1]
+    assert "WHERE (created_at, id) < (%s, %s)" in query
+    assert params == [T0 - timedelta(hours=1), 99, 3]
+
+
+def test_list_runs_filters_on_since_and_contains(database):
+    contains = {"run": {"status": "complete"}}
+
+    asyncio.run(reads.list_runs(contains=contains, since=T0))
+
+    query, params = database.queries[0]
+    assert "WHERE data @> %s::jsonb AND created_at >= %s" in query
+    assert params == [json.dumps(contains), T0, 21]
+
+
+def test_fields_project_json_paths(database):
+    database.rows = [{"run_id": "run-0", "created_at": T0, "updated_at": T0, "summary": "ok"}]
+
+    run = asyncio.run(reads.get_run("run-0", fields=["summary", "company_funding_digests.0"]))
+
+    assert run["summary"] == "ok"
+    query, params = database.queries[0]
+    assert (
+        "SELECT run_id, created_at, updated_at, "
+        "data #> Literal(['summary']) AS Identifier('summary'), "
+        "data #> Literal(['company_funding_digests', '0']) "
+        "AS Identifier('company_funding_digests.0') FROM funding_digest_runs"
+    ) in query
+    assert params == ["run-0"]
+
+
+@pytest.mark.parametrize("path", ["summary; DROP TABLE companies", "a..b", "data->>'x'"])
+def test_fields_reject_unsafe_paths(database, path):
+    with pytest.raises(ValueError, match="Invalid projection path"):
+        asyncio.run(reads.list_runs(fields=[path]))
+    assert database.queries == []
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        reads._encode_cursor(["2025-08-31T12:00:00+00:00"]),
+        reads._encode_cursor(["yesterday", 1]),
+        reads._encode_cursor(["2025-08-31T12:00:00+00:00", None]),
+        "eyJhIjogMX0=",  # {"a": 1}
+    ],
+)
+def test_bad_cursors_are_rejected(database, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        asyncio.run(reads.list_runs(cursor=cursor))
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        asyncio.run(reads.list_companies(cursor=cursor))
+    assert database.queries == []
+
+
+def test_list_companies_filters_on_events_and_pages_by_name(database):
+    database.rows = [
+        {"run_id": "run-0", "company_idx": i, "normalized_name": f"acme {i}"} for i in range(2)
+    ]
+
+    page = asyncio.run(
+        reads.list_companies(limit=1, name_prefix="Acme_", round="seed", lead_investor="X ApS")
+    )
+
+    assert page.next_cursor is not None
+    query, params = database.queries[0]
+    assert "c.normalized_name LIKE %s" in query
+    assert "EXISTS (SELECT 1 FROM funding_events e WHERE" in query
+    assert "e.round = %s AND e.lead_investor_normalized = %s" in query
+    assert params == ["acme\\_%", "seed", "x", 2]
+
+    asyncio.run(reads.list_companies(limit=1, cursor=page.next_cursor))
+
+    query, params = database.queries[1]
+    assert "(c.normalized_name, c.run_id, c.company_idx) > (%s, %s, %s)" in query
+    assert params == ["acme 0", "run-0", 0, 2]
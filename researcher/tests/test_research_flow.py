@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import List
+
+from agents import Agent
+from agents.tool_context import ToolContext
+
+from src.bench.fakes import canned_digest
+from src.flows.research_flow import _digests_from_tool_output
+from src.types import CompanyFundingDigest
+from tests.stubs import StubModel
+
+
+def _as_tool_output(text: str) -> str:
+    """What the manager sees from the research agent tool when the agent answers ``text``."""
+
+    agent = Agent(
+        name="StartupFundingResearcher",
+        model=StubModel(text),
+        output_type=List[CompanyFundingDigest],
+    )
+    tool = agent.as_tool("research", "Research startups")
+    args = json.dumps({"input": "Danish seed rounds"})
+    ctx = ToolContext(
+        context=None, tool_name="research", tool_call_id="call_1", tool_arguments=args
+    )
+    return asyncio.run(tool.on_invoke_tool(ctx, args))
+
+
+def test_digests_from_as_tool_output():
+    output = _as_tool_output(json.dumps({"response": [canned_digest(1), canned_digest(2)]}))
+
+    digests = _digests_from_tool_output(output)
+
+    assert [d.company.name for d in digests] == ["Fake Startup 1", "Fake Startup 2"]
+
+
+def test_digests_from_bare_list():
+    digests = _digests_from_tool_output([CompanyFundingDigest.model_validate(canned_digest(3))])
+
+    assert [d.company.name for d in digests] == ["Fake Startup 3"]
+
+
+def test_digests_from_unrelated_output():
+    assert _digests_from_tool_output("Search failed, try again later") == []
+    assert _digests_from_tool_output(json.dumps({"response": "nothing found"})) == []
+    assert _digests_from_tool_output(json.dumps({"response": [{"company": None}]})) == []
+    assert _digests_from_tool_output(None) == []
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+
+from src.mem.short_ctx import ResearchSession, _item_to_serialisable
+from src.mem.tokens import approx_count
+from tests.stubs import approx_spec
+
+
+def _message(index: int, size: int = 40) -> dict:
+    return {"role": "user", "content": f"{index:03d} " + "x" * size}
+
+
+def _recount(session: ResearchSession) -> int:
+    items = asyncio.run(session.get_items())
+    return sum(approx_count(_item_to_serialisable(i)) for i in items)
+
+
+def test_running_total_matches_a_full_recount():
+    session = ResearchSession("s", approx_spec(), max_tokens=10_000)
+
+    asyncio.run(session.add_items([_message(i, size=10 * i) for i in range(10)]))
+    assert session._token_count() == _recount(session)
+
+    popped = asyncio.run(session.pop_item())
+    assert popped == _message(9, size=90)
+    assert session._token_count() == _recount(session)
+
+    asyncio.run(session.clear_session())
+    assert session._token_count() == 0
+    assert asyncio.run(session.pop_item()) is None
+
+
+def test_each_item_is_tokenized_once(monkeypatch):
+    session = ResearchSession("s", approx_spec(), max_tokens=200, max_items=5)
+    counted: list[str] = []
+
+    def _count(text: str) -> int:
+        counted.append(text)
+        return approx_count(text)
+
+    monkeypatch.setattr(session, "_count_tokens", _count)
+    for i in range(20):
+        asyncio.run(session.add_items([_message(i)]))
+
+    assert len(counted) == 20
+    assert session._token_count() == _recount(session)
+
+
+def test_trim_respects_item_and_token_limits_and_keeps_the_tail():
+    session = ResearchSession("s", approx_spec(), max_tokens=60, max_items=8, tail_reserve=3)
+
+    asyncio.run(session.add_items([_message(i) for i in range(12)]))
+    items = asyncio.run(session.get_items())
+
+    assert session._token_count() <= 60
+    assert items[-1] == _message(11)
+    assert len(items) <= 8
+
+    # A single huge turn still leaves the last tail_reserve items in place.
+    asyncio.run(session.add_items([_message(100, size=4_000)]))
+    items = asyncio.run(session.get_items())
+    assert [i["content"][:3] for i in items] == ["010", "011", "100"]
+    assert session._token_count() == _recount(session)
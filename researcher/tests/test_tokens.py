@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+from tiktoken import Encoding
+
+from src.mem import tokens
+from src.mem.tokens import (
+    _CACHE_MIN_CHARS,
+    _CountCache,
+    approx_count,
+    count_tokens,
+    count_tokens_batch,
+    get_token_counter,
+    warm_tokenizers,
+)
+from tests.stubs import approx_spec
+
+LONG = "x" * _CACHE_MIN_CHARS
+
+
+@pytest.fixture
+def byte_encoding(monkeypatch) -> Encoding:
+    """One token per byte; built locally, so no tokenizer download is needed."""
+
+    encoding = Encoding(
+        name="bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(tokens, "_get_encoding", lambda spec: encoding)
+    monkeypatch.setattr(tokens, "_count_cache", _CountCache())
+    return encoding
+
+
+def test_approximate_counts():
+    texts = ["", "abc", "a" * 40, LONG]
+
+    assert count_tokens_batch(texts, approx_spec()) == [approx_count(t) for t in texts]
+    assert count_tokens("a" * 40, approx_spec()) == 10
+    assert get_token_counter(approx_spec())("") == 0
+
+
+@pytest.mark.usefixtures("byte_encoding")
+def test_batch_counts_match_single_counts():
+    texts = ["short", LONG + "a", "", LONG + "bb", "short", LONG + "a"]
+
+    counts = count_tokens_batch(texts, approx_spec(), num_threads=2)
+
+    assert counts == [count_tokens(t, approx_spec()) for t in texts]
+    assert counts == [len(t) for t in texts]
+
+
+def test_long_texts_are_counted_once(byte_encoding):
+    count = get_token_counter(approx_spec())
+    cache = tokens._count_cache
+
+    count("short")
+    count("short")
+    assert (cache.hits, cache.misses) == (0, 0)  # below the threshold nothing is cached
+
+    count(LONG)
+    count(LONG)
+    count_tokens_batch([LONG, LONG + "y"], approx_spec())
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_count_cache_evicts_least_recently_used():
+    cache = _CountCache(max_entries=2)
+    a, b, c = (_CountCache.key("bytes", text) for text in ("a", "b", "c"))
+
+    cache.put(a, 1)
+    cache.put(b, 2)
+    assert cache.get(a) == 1  # b is now the oldest
+    cache.put(c, 3)
+
+    assert cache.get(b) is None
+    assert (cache.get(a), cache.get(c)) == (1, 3)
+
+
+def test_count_cache_keys_depend_on_the_encoding():
+    assert _CountCache.key("o200k_base", LONG) != _CountCache.key("cl100k_base", LONG)
+
+
+def test_warm_tokenizers_logs_failures(monkeypatch, caplog):
+    def _fail(spec):
+        raise OSError("download blocked")
+
+    monkeypatch.setattr(tokens, "_get_encoding", _fail)
+
+    warm_tokenizers([approx_spec()])
+
+    assert "Failed to warm tokenizer approximate: download blocked" in caplog.text